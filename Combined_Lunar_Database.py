@@ -2,1071 +2,695 @@
 from email.quoprimime import quote
 from altair import value
 import streamlit as st
-import pandas as pd
-import numpy as np
-import plotly.express as px
-import plotly.graph_objects as go
-from PIL import Image
-import re
-import base64
-from io import BytesIO
 from urllib.parse import quote
 import importlib
 import os
 
-st.cache_data.clear()
+from lunar_regolith import metrics, perf, schema, warmup
+from lunar_regolith.backends import get_backend
+from lunar_regolith.data import (
+    column_stats, dataset_version, facet_index, load_dataset, load_datasets, memory_report, validation_report,
+)
+from lunar_regolith.export import EXPORT_FORMATS, MIME_TYPES, available_formats, export_file, with_derived_columns
+from lunar_regolith.figures import mission_scatter, moon_map, simulant_scatter
+from lunar_regolith.query import compute_facet_counts, facet_mask, numeric_range_mask, year_mask
+
+# Datasets, derived columns, statistics and facet indexes come from the lunar_regolith
+# package, cached per dataset version and shared with notebooks and batch jobs. With a
+# DuckDB or Polars backend (LUNAR_REGOLITH_BACKEND) the statistics, facet counts, tables
+# and plotted rows are queried from its Parquet files instead of the in-memory frames.
+
+def show_memory_report(dataset):
+    report, total_kb, loaded_kb = memory_report(dataset)
+    with st.expander("Memory usage"):
+        st.caption(f"{total_kb:.1f} KB in memory with derived columns ({loaded_kb:.1f} KB as parsed from CSV)")
+        st.dataframe(report)
+
+
+def show_validation_report(table):
+    report = validation_report(table)
+    with st.expander(f"Data validation ({len(report)} issues)"):
+        if report.empty:
+            st.caption("Every value of the source table matches the schema.")
+        else:
+            st.caption("Values that do not match the schema show as missing in the tables and plots.")
+            st.dataframe(report, hide_index=True)
+
+
+def show_export_panel(dataset, filters, columns, key):
+    """Download of the filtered selection (shown columns plus their derived _min/_max/_avg).
+
+    The file is only generated when the button is clicked, streamed to disk in chunks and
+    reused for the same dataset version, filters and columns.
+    """
+    export_columns = with_derived_columns(dataset, columns)
+    with st.expander("Download filtered data"):
+        fmt = st.selectbox("Format", available_formats(), format_func=str.upper, key=f"{key}_export_format")
+
+        def read_export():
+            with open(export_file(dataset, fmt, columns=export_columns, **filters), "rb") as f:
+                return f.read()
+
+        st.download_button(
+            f"Download {fmt.upper()}",
+            data=read_export,
+            file_name=f"{dataset}_filtered{EXPORT_FORMATS[fmt]}",
+            mime=MIME_TYPES[fmt],
+            on_click="ignore",
+            key=f"{key}_export_download",
+        )
 
 
-#Lunar Data Loading 
-@st.cache_data
-def load_database_data():
-    df = pd.read_csv(
-    "Dataset_Regolith.csv",
-    dtype=str,
-    header=0,
-    skip_blank_lines=False,
-    )
-    df.columns =  ["Mission", "Location", "Terrain","Year","Type of mission","Test", "Test location", "Bulk density (g/cm^3)", "Angle of internal friction (degree)", "Cohesion (kPa)", "Static bearing capacity (kPa)", "Source","Year of publication", "DOI / URL"]
-    df = df.apply(lambda col: col.str.strip() if col.dtype == "object" else col)
-    return df
-
-# Numerical data for plotting loading
-@st.cache_data
-def load_plot_data():
-    df = pd.read_csv("Dataset_Regolith_plots.csv")
-    df.columns =  [
-        "Mission", "Location", "Terrain","Year","Type of mission","Test", "Test location",
-        "Bulk density (g/cm^3)", "Angle of internal friction (degree)", 
-        "Cohesion (kPa)", "Static bearing capacity (kPa)", "Source","Year of publication", "DOI / URL"
-    ]
-    numeric_cols = ["Bulk density (g/cm^3)", "Angle of internal friction (degree)", 
-        "Cohesion (kPa)", "Static bearing capacity (kPa)"]
-    for col in numeric_cols:
-        df[col] = pd.to_numeric(df[col], errors="coerce")
-    return df
-
-lunar_db_df = load_database_data()
-lunar_plot_df = load_plot_data()
-
-
-#Simulants Data Loading
-@st.cache_data
-def load_Simulants_data():
-    df = pd.read_csv(
-    "Dataset_Simulants.csv",
-    dtype=str,
-    header=0,
-    skip_blank_lines=False,
-    )
-    df.columns =  ["Developer", "Agency", "Simulant", "Year", "Test", "Type of simulant",  "Bulk density (g/cm^3)", "Angle of internal friction (degree)", "Cohesion (kPa)", "Source","Year of publication","DOI / URL"]
-    df = df.apply(lambda col: col.str.strip() if col.dtype == "object" else col)
-    return df
-
-# Numerical data for plotting loading 
-@st.cache_data
-def load_Simulant_plot_data():
-    df = pd.read_csv("Dataset_Simulants_plots.csv")
-    df.columns =  [
-        "Developer", "Agency", "Simulant", "Year", "Test", "Type of simulant",  "Bulk density (g/cm^3)", "Angle of internal friction (degree)", "Cohesion (kPa)", "Source","Year of publication","DOI / URL"
-    ]
-    numeric_cols = ["Bulk density (g/cm^3)", "Angle of internal friction (degree)", 
-        "Cohesion (kPa)"]
-    for col in numeric_cols:
-        df[col] = pd.to_numeric(df[col], errors="coerce")
-    return df
-simulant_db_df = load_Simulants_data()
-simulant_plot_df = load_Simulant_plot_data()
-
-#All data loading
-@st.cache_data
-def load_database_data():
-    df = pd.read_csv(
-    "Dataset_All.csv",
-    dtype=str,
-    header=0,
-    skip_blank_lines=False,
-    )
-    df.columns =  ["Mission/Simulant", "Developer", "Agency", "Moon Location/Country", "Year", "Terrain type", "Type of mission", "Test", "Test location", "Bulk density (g/cm^3)", "Angle of internal friction (degree)", "Cohesion (kPa)", "Static bearing capacity (kPa)", "Source","Year of publication", "DOI / URL"]
-    df = df.apply(lambda col: col.str.strip() if col.dtype == "object" else col)
-    return df
+# --- Paged table ---
+# Above this many filtered rows the table starts in paged mode: only the visible page
+# (and only the selected columns) is queried from the backend and sent to the browser.
+PAGED_TABLE_ROWS = 1000
+PAGE_SIZES = [25, 50, 100, 250, 500]
+
+def show_table(dataset, filters, columns, key, rows=None):
+    # rows: the dataset already filtered by filters in this rerun, reused for the whole
+    # table (filtered rows are counted once, by the backend's filter)
+    backend = get_backend()
+    with perf.stage("filter"):
+        total = backend.count(dataset, **filters) if rows is None else len(rows)
+    paged = st.toggle("Paged table", value=total > PAGED_TABLE_ROWS, key=f"{key}_paged")
+    if not paged:
+        table = backend.filter(dataset, columns=columns, **filters) if rows is None else rows[list(columns)]
+        with perf.stage("table"):
+            st.dataframe(table)
+        return
+    sort_col, order_col, size_col, page_col = st.columns(4)
+    sort = sort_col.selectbox("Sort by", [None, *columns], format_func=lambda c: "(dataset order)" if c is None else c, key=f"{key}_sort")
+    descending = order_col.selectbox("Order", ["Ascending", "Descending"], key=f"{key}_order") == "Descending"
+    page_size = size_col.selectbox("Rows per page", PAGE_SIZES, index=1, key=f"{key}_page_size")
+    n_pages = max(1, -(-total // page_size))
+    page = page_col.number_input(f"Page (of {n_pages})", min_value=1, max_value=n_pages, value=1, key=f"{key}_page")
+    with perf.stage("filter"):
+        page_df, total = backend.page(
+            dataset, (page - 1) * page_size, page_size, sort=sort, descending=descending, columns=columns, **filters
+        )
+    with perf.stage("table"):
+        st.dataframe(page_df)
+    first = (page - 1) * page_size
+    st.caption(f"Rows {min(first + 1, total)}–{first + len(page_df)} of {total}")
+
+
+# --- Range sliders from the schema ---
+def range_slider(stats, col, key, bounds=True):
+    """Heading and range slider of a year or interval column, labelled from the schema.
+
+    Interval sliders span the column's _min/_max bounds, or the numeric column itself
+    with bounds=False. Returns None when the column has nothing to filter on.
+    """
+    spec = schema.column_spec(col)
+    st.markdown(f"### {spec['label']}")
+    full_range = schema.slider_range(stats, col, bounds)
+    if full_range is None:
+        return None
+    low, high = full_range
+    return st.slider(spec["slider"], min_value=low, max_value=high, value=(low, high), key=key)
+
+
+# --- Live facet counts ---
+def slider_default(stats, col, digits):
+    """Initial (full) range of a range slider, rounded the way the slider is."""
+    if digits is None:
+        return int(stats[col]["min"]), int(stats[col]["max"])
+    return round(float(stats[f"{col}_min"]["min"]), digits), round(float(stats[f"{col}_max"]["max"]), digits)
+
+@perf.timed("facet counts")
+def session_filter_masks(dataset, facet_keys, range_keys):
+    """Row masks of the filters currently set in the sidebar, read from st.session_state.
+
+    facet_keys maps facet column -> widget key, range_keys maps widget key -> (column, digits),
+    digits=None marking the exact year filter that drops NaN rows. Masks are kept in the
+    session and only rebuilt for the widgets whose value changed since the last rerun.
+    """
+    df, stats, facets = load_dataset(dataset), column_stats(dataset), facet_index(dataset)
+    version = dataset_version(dataset)
+    mask_cache = st.session_state.setdefault("_filter_masks", {})
+    masks, used = {}, set()
+    for col, key in facet_keys.items():
+        selected = tuple(st.session_state.get(key, ()))
+        if not selected:
+            continue
+        cache_key = (version, key, selected)
+        if cache_key not in mask_cache:
+            mask_cache[cache_key] = facet_mask(facets[col], selected)
+        masks[col] = mask_cache[cache_key]
+        used.add(cache_key)
+    for key, (col, digits) in range_keys.items():
+        bounds_col = col if digits is None else f"{col}_min"
+        if bounds_col not in stats or not stats[bounds_col]["count"]:
+            continue
+        value = tuple(st.session_state.get(key, slider_default(stats, col, digits)))
+        cache_key = (version, key, value)
+        if cache_key not in mask_cache:
+            if digits is None:
+                mask_cache[cache_key] = year_mask(df, *value, col=col)
+            else:
+                mask_cache[cache_key] = numeric_range_mask(df, f"{col}_min", f"{col}_max", *value)
+        masks[key] = mask_cache[cache_key]
+        used.add(cache_key)
+    # Forget masks of values that are no longer set, so the session does not grow
+    section_keys = set(facet_keys.values()) | set(range_keys)
+    for cache_key in list(mask_cache):
+        if cache_key[1] in section_keys and cache_key not in used:
+            del mask_cache[cache_key]
+    return masks
+
+def live_facet_counts(dataset, facet_keys, range_keys):
+    """Rows each facet option would keep under the other filters currently set in the sidebar.
+
+    Same keys as session_filter_masks. The pandas backend counts from the session's row
+    masks, the other backends count the filters read from st.session_state themselves.
+    """
+    backend = get_backend()
+    if backend.name == "pandas":
+        masks = session_filter_masks(dataset, facet_keys, range_keys)
+        return compute_facet_counts(facet_index(dataset), masks, len(load_dataset(dataset)))
+    with perf.stage("facet counts"):
+        stats = backend.column_stats(dataset)
+        facets = {col: list(st.session_state.get(key, ())) for col, key in facet_keys.items()}
+        ranges, year = {}, None
+        for key, (col, digits) in range_keys.items():
+            bounds_col = col if digits is None else f"{col}_min"
+            if bounds_col not in stats or not stats[bounds_col]["count"]:
+                continue
+            value = tuple(st.session_state.get(key, slider_default(stats, col, digits)))
+            if digits is None:
+                year = value
+            else:
+                ranges[col] = value
+        return backend.facet_counts(dataset, facets, ranges, year)
+
+def backend_rows(dataset, **filters):
+    """Rows for a figure from a Parquet backend, None with pandas (the figures then read the
+    in-memory frame they are cached by)."""
+    backend = get_backend()
+    return None if backend.name == "pandas" else backend.filter(dataset, **filters)
+
+def with_count(counts):
+    """format_func showing the live row count next to a multiselect option."""
+    return lambda option: f"{option} ({counts.get(option, 0)})"
+
+# Boot-time warm-up, once per server process: datasets, statistics, the moon map and the
+# default figures are prepared on a thread pool while the first page renders.
+@st.cache_resource
+def boot_warmup():
+    return warmup.start()
 
-all_db_df = load_database_data()
 # Sidebar to choose database (Lunar mission or Simulants)
 db_choice = st.sidebar.radio(
     "Select Database:",
     ["Moon Mission Database", "Lunar Regolith Simulants Database", "All Data", "Detailed Mission Pages"]
 )
 
-# --------------------------- Lunar Mission Database Section ---------------------------
-if db_choice == "Moon Mission Database":
-
-    st.title("Lunar Regolith Database")
-
-    # Mission categorization function
-    def categorize_mission(mission_name):
-        if pd.isna(mission_name):
-            return "Other"
-        name = mission_name.lower()
-        if "apollo" in name:
-            return "Apollo"
-        elif "luna" in name:
-            return "Luna"
-        elif "surveyor" in name:
-            return "Surveyor"
-        elif "chang'e" in name:
-            return "Chang'e"
-        elif "chandrayaan" in name: 
-            return "Chandrayaan"
-        else:
-            return "Other"
-        
-    def extract_range(value):
-        """Extracts min and max numeric values from strings"""
-        if pd.isna(value):
-            return (np.nan, np.nan)
-        if isinstance(value, (int, float)):
-            return (float(value), float(value))
-        match = re.findall(r"[-+]?\d*\.?\d+", str(value))
-        if len(match) == 0:
-            return (np.nan, np.nan)
-        elif len(match) == 1:
-            val = float(match[0])
-            return (val, val)
-        else:
-            return (float(match[0]), float(match[-1]))  # take first and last
-
-    # --- Columns that may contain ranges ---
-    range_columns = [
-        "Bulk density (g/cm^3)",
-        "Angle of internal friction (degree)",
-        "Cohesion (kPa)",
-        "Static bearing capacity (kPa)",
-    ]
-
-    # --- Apply extraction and create numeric columns ---
-    for col in range_columns:
-        if col in lunar_db_df.columns:
-            lunar_db_df[[f"{col}_min", f"{col}_max"]] = lunar_db_df[col].apply(
-                lambda x: pd.Series(extract_range(x))
-            )
-            lunar_db_df[f"{col}_avg"] = lunar_db_df[
-                [f"{col}_min", f"{col}_max"]
-            ].mean(axis=1)
-
-    lunar_db_df["Mission Group"] = lunar_db_df["Mission"].apply(categorize_mission)
-
-    # Sidebar Filters
-    with st.sidebar:
-        st.header("Filter Regolith Data")
-        #original filters 
-        soil_group_filter = st.multiselect("Select Terrain type", ["Mare", "Highland"])
-        test_filter = st.multiselect("Select Test Type", lunar_db_df["Test"].dropna().unique())
-        # --- Text / Categorical Filters ---
-        mission_type_filter = st.multiselect(
-            "Select type of mission:",
-            options=sorted(lunar_db_df["Type of mission"].dropna().unique())
-        )
-
-        mission_group_filter = st.multiselect(
-            "Select Mission Group", 
-            options=["Apollo", "Luna", "Surveyor", "Chang'e", "Chandrayaan", "Other"]
+# Developer mode (hidden): with ?dev=1 or LUNAR_REGOLITH_PERF=1 the rerun's stages are
+# timed (see perf.py), logged and shown in a panel at the bottom of the page. With
+# metrics on (metrics.py) every rerun is timed and exported for Prometheus.
+@st.cache_resource
+def start_metrics():
+    return metrics.start()
+
+if metrics.ENABLED:
+    start_metrics()
+dev_mode = perf.ENABLED or st.query_params.get("dev") == "1"
+# the rerun is ended however the script exits, Streamlit stops it with an exception
+# when a widget changes mid-run
+with perf.recording(db_choice, enabled=dev_mode or metrics.ENABLED) as rerun:
+    if not boot_warmup().is_ready():
+        st.sidebar.caption("Warming up caches, the first views may take a moment.")
+
+    # --------------------------- Lunar Mission Database Section ---------------------------
+    if db_choice == "Moon Mission Database":
+
+        st.title("Lunar Regolith Database")
+
+        backend = get_backend()
+        with perf.stage("load"):
+            if backend.name == "pandas":
+                # the section's datasets are built concurrently on a cold start (see load_datasets)
+                load_datasets(["regolith", "regolith_plots", "simulant_plots"])
+            lunar_stats = backend.column_stats("regolith")
+
+        # Live facet counts: rows each option would keep under the other current filters
+        lunar_counts = live_facet_counts(
+            "regolith",
+            facet_keys={"Terrain": "moon_terrain", "Test": "moon_test", "Type of mission": "moon_mission_type", "Mission Group": "moon_mission_group"},
+            range_keys={
+                "moon_year": ("Year of publication", None),
+                "moon_density": ("Bulk density (g/cm^3)", 2),
+                "moon_cohesion": ("Cohesion (kPa)", 1),
+                "moon_angle": ("Angle of internal friction (degree)", 1),
+                "moon_sbc": ("Static bearing capacity (kPa)", 1),
+            },
         )
 
-        # --- Numeric Range Filters ---
-        st.markdown("### Publication Year")
-        if "Year of publication" in lunar_db_df.columns and lunar_db_df["Year of publication"].notna().any():
-            year_min, year_max = int(lunar_db_df["Year of publication"].min()), int(lunar_db_df["Year of publication"].max())
-            year_range = st.slider(
-                "Select Year of publication Range",
-                min_value=year_min,
-                max_value=year_max,
-                value=(year_min, year_max)
-            )
-        else:
-            year_range = None
-
-
-        st.markdown("### Density (g/cm³)")
-        if "Bulk density (g/cm^3)_min" in lunar_db_df.columns:
-            dens_min = float(lunar_db_df["Bulk density (g/cm^3)_min"].min(skipna=True))
-            dens_max = float(lunar_db_df["Bulk density (g/cm^3)_max"].max(skipna=True))
-            density_range = st.slider(
-                "Select Density Range",
-                min_value=round(dens_min, 2),
-                max_value=round(dens_max, 2),
-                value=(round(dens_min, 2), round(dens_max, 2))
-            )
-        else:
-            density_range = None
-
-        st.markdown("### Cohesion (kPa)")
-        if "Cohesion (kPa)_min" in lunar_db_df.columns:
-            coh_min = float(lunar_db_df["Cohesion (kPa)_min"].min(skipna=True))
-            coh_max = float(lunar_db_df["Cohesion (kPa)_max"].max(skipna=True))
-            cohesion_range = st.slider(
-                "Select Cohesion Range",
-                min_value=round(coh_min, 1),
-                max_value=round(coh_max, 1),
-                value=(round(coh_min, 1), round(coh_max, 1))
-            )
-        else:
-            cohesion_range = None
-        st.markdown("### Angle of Internal Friction (°)")
-        if "Angle of internal friction (degree)_min" in lunar_db_df.columns:
-            ang_min = float(lunar_db_df["Angle of internal friction (degree)_min"].min(skipna=True))
-            ang_max = float(lunar_db_df["Angle of internal friction (degree)_max"].max(skipna=True))
-            angle_range = st.slider(
-                "Select Angle Range",
-                min_value=round(ang_min, 1),
-                max_value=round(ang_max, 1),
-                value=(round(ang_min, 1), round(ang_max, 1))
+        # Sidebar Filters
+        with st.sidebar:
+            st.header("Filter Regolith Data")
+            #original filters 
+            soil_group_filter = st.multiselect("Select Terrain type", ["Mare", "Highland"], key="moon_terrain", format_func=with_count(lunar_counts["Terrain"]))
+            test_filter = st.multiselect("Select Test Type", lunar_stats["Test"]["values"], key="moon_test", format_func=with_count(lunar_counts["Test"]))
+            # --- Text / Categorical Filters ---
+            mission_type_filter = st.multiselect(
+                "Select type of mission:",
+                options=lunar_stats["Type of mission"]["sorted_values"],
+                key="moon_mission_type",
+                format_func=with_count(lunar_counts["Type of mission"])
             )
-        else:
-            angle_range = None
-        st.markdown("### Static Bearing Capacity (kPa)")
-        if "Static bearing capacity (kPa)_min" in lunar_db_df.columns:
-            sbc_min = float(lunar_db_df["Static bearing capacity (kPa)_min"].min(skipna=True))
-            sbc_max = float(lunar_db_df["Static bearing capacity (kPa)_max"].max(skipna=True))
-            sbc_range = st.slider(
-               "Select Static Bearing Capacity Range",
-               min_value=round(sbc_min, 1),
-               max_value=round(sbc_max, 1),
-               value=(round(sbc_min, 1), round(sbc_max, 1))
-           )
-        else:
-            sbc_range = None
-
-        # --- Column Selection ---
-        st.divider()
-        st.header("Display Options")
-        all_columns = lunar_db_df.columns.tolist()
-        default_columns = ["Mission", "Location", "Terrain","Year","Type of mission","Test", "Test location", "Bulk density (g/cm^3)", "Bulk density (g/cm^3)_min", "Bulk density (g/cm^3)_max", "Bulk density (g/cm^3)_avg", "Angle of internal friction (degree)", "Angle of internal friction (degree)_min", "Angle of internal friction (degree)_max", "Angle of internal friction (degree)_avg", "Cohesion (kPa)", "Cohesion (kPa)_min", "Cohesion (kPa)_max", "Cohesion (kPa)_avg", "Static bearing capacity (kPa)", "Static bearing capacity (kPa)_min", "Static bearing capacity (kPa)_max", "Static bearing capacity (kPa)_avg", "Source","Year of publication", "DOI / URL"]
-        selected_columns = st.multiselect(
-            "Select columns to display:",
-            options=all_columns,
-            default=[col for col in default_columns if col in all_columns]
-        )
 
+            mission_group_filter = st.multiselect(
+                "Select Mission Group", 
+                options=["Apollo", "Luna", "Surveyor", "Chang'e", "Chandrayaan", "Other"],
+                key="moon_mission_group",
+                format_func=with_count(lunar_counts["Mission Group"])
+            )
 
-    # --- Apply Filters ---
-    filtered_db_df = lunar_db_df.copy()
-    numeric_cols = [
-    "Year of publication",
-    "Bulk density (g/cm^3)",
-    "Angle of internal friction (degree)",
-    "Cohesion (kPa)",
-    "Static bearing capacity (kPa)",
-    "Year"
-    ]
-
-    for col in numeric_cols:
-        if col in filtered_db_df.columns:
-            filtered_db_df[col] = pd.to_numeric(filtered_db_df[col], errors="coerce")
-
-    # Terrain type filter
-    if soil_group_filter:
-        filtered_db_df = filtered_db_df[filtered_db_df["Terrain"].isin(soil_group_filter)]
-
-    # Test type filter
-    if test_filter:
-        filtered_db_df = filtered_db_df[filtered_db_df["Test"].isin(test_filter)]
-
-    # Mission group filter (use Mission Group, not Mission)
-    if mission_group_filter:
-        filtered_db_df = filtered_db_df[filtered_db_df["Mission Group"].isin(mission_group_filter)]
-
-    # Mission type filter
-    if mission_type_filter:
-        filtered_db_df = filtered_db_df[filtered_db_df["Type of mission"].isin(mission_type_filter)]
-
-    # Year of publication filter (only if slider active)
-    if year_range:
-        filtered_db_df = filtered_db_df[
-            (filtered_db_df["Year of publication"] >= year_range[0]) &
-            (filtered_db_df["Year of publication"] <= year_range[1])
-        ]
-
-    # --- Numeric filters (keep NaN rows visible) ---
-    def filter_numeric_range(df, col_min, col_max, min_val, max_val):
-        """Filter keeping NaNs visible."""
-        return df[
-            ((df[col_max].ge(min_val)) | (df[col_max].isna())) &
-            ((df[col_min].le(max_val)) | (df[col_min].isna()))
-        ]
-
-    if density_range:
-        filtered_db_df = filter_numeric_range(
-            filtered_db_df,
-            "Bulk density (g/cm^3)_min", "Bulk density (g/cm^3)_max",
-            density_range[0], density_range[1]
-        )
+            # --- Numeric Range Filters ---
+            year_range = range_slider(lunar_stats, "Year of publication", key="moon_year")
+            density_range = range_slider(lunar_stats, "Bulk density (g/cm^3)", key="moon_density")
+            cohesion_range = range_slider(lunar_stats, "Cohesion (kPa)", key="moon_cohesion")
+            angle_range = range_slider(lunar_stats, "Angle of internal friction (degree)", key="moon_angle")
+            sbc_range = range_slider(lunar_stats, "Static bearing capacity (kPa)", key="moon_sbc")
 
-    if cohesion_range:
-        filtered_db_df = filter_numeric_range(
-            filtered_db_df,
-            "Cohesion (kPa)_min", "Cohesion (kPa)_max",
-            cohesion_range[0], cohesion_range[1]
+            # --- Column Selection ---
+            st.divider()
+            st.header("Display Options")
+            all_columns = list(lunar_stats)
+            default_columns = ["Mission", "Location", "Terrain","Year","Type of mission","Test", "Test location", "Bulk density (g/cm^3)", "Bulk density (g/cm^3)_min", "Bulk density (g/cm^3)_max", "Bulk density (g/cm^3)_avg", "Angle of internal friction (degree)", "Angle of internal friction (degree)_min", "Angle of internal friction (degree)_max", "Angle of internal friction (degree)_avg", "Cohesion (kPa)", "Cohesion (kPa)_min", "Cohesion (kPa)_max", "Cohesion (kPa)_avg", "Static bearing capacity (kPa)", "Static bearing capacity (kPa)_min", "Static bearing capacity (kPa)_max", "Static bearing capacity (kPa)_avg", "Source","Year of publication", "DOI / URL"]
+            selected_columns = st.multiselect(
+                "Select columns to display:",
+                options=all_columns,
+                default=[col for col in default_columns if col in all_columns]
+            )
+            show_memory_report("regolith")
+            show_validation_report("regolith")
+
+
+        # --- Apply Filters (NaN rows stay visible in the numeric ranges) ---
+        filters = dict(
+            facets={
+                "terrain": soil_group_filter,
+                "test": test_filter,
+                "mission_group": mission_group_filter,
+                "mission_type": mission_type_filter,
+            },
+            ranges={
+                "Bulk density (g/cm^3)": density_range,
+                "Cohesion (kPa)": cohesion_range,
+                "Angle of internal friction (degree)": angle_range,
+                "Static bearing capacity (kPa)": sbc_range,
+            },
+            year=year_range,
         )
 
-    if angle_range:
-        filtered_db_df = filter_numeric_range(
-            filtered_db_df,
-            "Angle of internal friction (degree)_min", "Angle of internal friction (degree)_max",
-            angle_range[0], angle_range[1]
-        )
+        # --- Display filtered table ---
+        st.subheader("Database Table")
+        if selected_columns:
+            show_table("regolith", filters, selected_columns, key="moon")
+            show_export_panel("regolith", filters, selected_columns, key="moon")
+        else:
+            st.info("No columns selected. Please select at least one column to display.")
 
-    if sbc_range:
-        filtered_db_df = filter_numeric_range(
-            filtered_db_df,
-            "Static bearing capacity (kPa)_min", "Static bearing capacity (kPa)_max",
-            sbc_range[0], sbc_range[1]
+        st.markdown(
+            "<p style='font-size:12px; color:gray;'>Note: Values are for the top 10 cm of lunar soil, see missions details for more depths.<br>* Indicates values estimated for the measurements.</p>",
+            unsafe_allow_html=True
         )
 
-    # --- Display filtered table ---
-    st.subheader("Database Table")
-    if selected_columns:
-        st.dataframe(filtered_db_df[selected_columns])
-    else:
-        st.info("No columns selected. Please select at least one column to display.")
 
-    st.markdown(
-        "<p style='font-size:12px; color:gray;'>Note: Values are for the top 10 cm of lunar soil, see missions details for more depths.<br>* Indicates values estimated for the measurements.</p>",
-        unsafe_allow_html=True
-    )
 
+        # Plotting Section & Display
+        st.subheader("Plot Numerical Data")
 
+        x_axis = st.selectbox("X-axis (categorical)", options=[
+            "Mission", "Location", "Terrain", "Test", "Type of mission", 
+            "Bulk density (g/cm^3)", "Angle of internal friction (degree)", 
+            "Cohesion (kPa)", "Static bearing capacity (kPa)"
+        ])
+        y_axis = st.selectbox("Y-axis (numeric)", options=[
+            "Bulk density (g/cm^3)", "Angle of internal friction (degree)", 
+            "Cohesion (kPa)", "Static bearing capacity (kPa)"
+        ])
 
-    # Plotting Section & Display
-    st.subheader("Plot Numerical Data")
-
-    x_axis = st.selectbox("X-axis (categorical)", options=[
-        "Mission", "Location", "Terrain", "Test", "Type of mission", 
-        "Bulk density (g/cm^3)", "Angle of internal friction (degree)", 
-        "Cohesion (kPa)", "Static bearing capacity (kPa)"
-    ])
-    y_axis = st.selectbox("Y-axis (numeric)", options=[
-        "Bulk density (g/cm^3)", "Angle of internal friction (degree)", 
-        "Cohesion (kPa)", "Static bearing capacity (kPa)"
-    ])
-
-    lunar_plot_df["Mission Group"] = lunar_plot_df["Mission"].apply(categorize_mission)
-
-    # Filters application 
-    filtered_plot_df = lunar_plot_df.copy()
-    if mission_group_filter:
-        filtered_plot_df = filtered_plot_df[filtered_plot_df["Mission Group"].isin(mission_group_filter)]
-    if test_filter:
-        filtered_plot_df = filtered_plot_df[filtered_plot_df["Test"].isin(test_filter)]
-    if soil_group_filter:
-        filtered_plot_df = filtered_plot_df[filtered_plot_df["Terrain"].isin(soil_group_filter)]
-
-    # Plotting markers
-    marker_shapes = {
-        "Apollo": "circle",
-        "Luna": "square",
-        "Surveyor": "triangle-up",
-        "Chang'e": "diamond",
-        "Chandrayaan": "cross"
-    }
-    color_map = {
-        "Apollo": "#0b96d6",
-        "Luna": "#d45087",
-        "Surveyor": "#ffa600",
-        "Chang'e": "#72CF6D",
-        "Chandrayaan": "#8e44ad",
-    }
-
-    compare_simulants = st.checkbox("Compare with lunar regolith simulants")
-
-    filtered_plot_df = filtered_plot_df.dropna(subset=[x_axis, y_axis])
-    if not filtered_plot_df.empty:
-        fig = px.scatter(
-            filtered_plot_df,
-            x=x_axis,
-            y=y_axis,
-            color="Mission Group",
-            symbol="Mission Group",
-            color_discrete_map=color_map,
-            symbol_map=marker_shapes,
-            hover_data=["Mission", x_axis, y_axis],
-            title=f"{y_axis} vs {x_axis}",
-        )
-        fig.update_traces(marker=dict(size=10, opacity=0.7))
-        fig.update_layout(
-            xaxis_title=x_axis,
-            yaxis_title=y_axis,
-            hoverlabel=dict(bgcolor="white", font_size=12, font_color="black"),
-            title=dict(
-                x=0,
-                xanchor='left',
-                font=dict(size=20)
-            ),
-            legend_title_text="Mission Group",
-            width=800,
-            height=500,
+        # Filters application 
+        filtered_plot_df = backend.filter(
+            "regolith_plots",
+            facets={"mission_group": mission_group_filter, "test": test_filter, "terrain": soil_group_filter},
         )
 
-        # Add simulants if selected
-        if compare_simulants:
-            if x_axis in simulant_plot_df.columns and y_axis in simulant_plot_df.columns:
-                hover_texts = [
-                    f"Simulant: {row['Simulant']}<br>{x_axis}: {row[x_axis]}<br>{y_axis}: {row[y_axis]}"
-                    for _, row in simulant_plot_df.iterrows()
-                ]
-                fig.add_scatter(
-                    x=simulant_plot_df[x_axis],
-                    y=simulant_plot_df[y_axis],
-                    mode='markers',
-                    name='Lunar Simulants',
-                    marker=dict(symbol='diamond', size=10, color='#ff00ff', line=dict(width=1, color='black')),
-                    hovertext=hover_texts,
-                    hoverinfo='text'
-                )
-            else:
-                st.warning(f"'{x_axis}' or '{y_axis}' not found in simulant dataset.")
+        compare_simulants = st.checkbox("Compare with lunar regolith simulants")
 
-        # Updated config dictionary
-        config = {
-            "displayModeBar": False,  # hides the toolbar
-            "scrollZoom": True
-        }
+        filtered_plot_df = filtered_plot_df.dropna(subset=[x_axis, y_axis])
+        simulant_columns = backend.columns("simulant_plots")
+        simulants_comparable = x_axis in simulant_columns and y_axis in simulant_columns
+        if not filtered_plot_df.empty:
+            # Built once per dataset versions, plotted rows and axes for all workers (figures.py)
+            simulant_plot_df = backend_rows("simulant_plots") if compare_simulants else None
+            fig = mission_scatter(filtered_plot_df, x_axis, y_axis, compare_simulants, simulant_plot_df)
+            if compare_simulants and not simulants_comparable:
+                st.warning(f"'{x_axis}' or '{y_axis}' not found in simulant dataset.")
 
-        st.plotly_chart(fig, use_container_width=True, config=config)
-    else:
-        st.info("No data available for the selected plot.")
+            # Updated config dictionary
+            config = {
+                "displayModeBar": False,  # hides the toolbar
+                "scrollZoom": True
+            }
 
+            st.plotly_chart(fig, use_container_width=True, config=config)
+        else:
+            st.info("No data available for the selected plot.")
 
-    # Moon Map
-    def parse_location(loc_str):
-        if pd.isna(loc_str):
-            return None, None
-        # Match something like: 3.01239S 23.42157W
-        match = re.match(r"([0-9.+-]+)([NS])\s+([0-9.+-]+)([EW])", loc_str.strip())
-        if not match:
-            return None, None
-        lat_val, lat_dir, lon_val, lon_dir = match.groups()
-        lat = float(lat_val) * (1 if lat_dir.upper() == "N" else -1)
-        lon = float(lon_val) * (1 if lon_dir.upper() == "E" else -1)
-        return lat, lon
 
-    lunar_plot_df["Latitude"], lunar_plot_df["Longitude"] = zip(*lunar_plot_df["Location"].apply(parse_location))
+        # Moon Map (Latitude/Longitude are parsed at ingestion, see prepare_regolith_plot_data)
+        fig = moon_map(plot_df=backend_rows("regolith_plots"))
 
-    # Load Moon map image
-    def pil_to_base64_uri(pil_img):
-        buffered = BytesIO()
-        pil_img.save(buffered, format="PNG")
-        img_bytes = buffered.getvalue()
-        base64_str = base64.b64encode(img_bytes).decode()
-        return "data:image/png;base64," + base64_str
+        config_map = {
+        "displayModeBar": False,
+        "scrollZoom": True
+        }
+        st.plotly_chart(fig, use_container_width=True, height=800, config=config_map)
 
 
-    moon_img = Image.open("moon_map.jpg")
+    # --------------------------- Lunar Simulants Database Section ---------------------------
 
-    if moon_img.mode != 'RGB':
-        moon_img = moon_img.convert('RGB')
+    elif db_choice == "Lunar Regolith Simulants Database":
 
-    moon_img_uri = pil_to_base64_uri(moon_img)
+        st.title("Lunar Regolith Simulants Database")
 
-    fig = go.Figure()
+        backend = get_backend()
+        with perf.stage("load"):
+            simulant_stats = backend.column_stats("simulants")
 
-    for group in lunar_plot_df["Mission Group"].unique():
-        df_group = lunar_plot_df[lunar_plot_df["Mission Group"] == group]
-        hover_text = df_group.apply(
-            lambda row: f"Mission: {row['Mission']}<br>Longitude: {row['Longitude']}°<br>Latitude: {row['Latitude']}°", 
-            axis=1
+        # Live facet counts: rows each option would keep under the other current filters
+        simulant_counts = live_facet_counts(
+            "simulants",
+            facet_keys={"Soil Group": "sim_soil_group", "Test": "sim_test", "Agency": "sim_agency", "Developer": "sim_developer"},
+            range_keys={
+                "sim_year": ("Year of publication", None),
+                "sim_density": ("Bulk density (g/cm^3)", 2),
+                "sim_cohesion": ("Cohesion (kPa)", 1),
+                "sim_angle": ("Angle of internal friction (degree)", 1),
+            },
         )
-        fig.add_trace(go.Scatter(
-            x=df_group["Longitude"],
-            y=df_group["Latitude"],
-            mode="markers",
-            marker=dict(
-                size=10,
-                color=color_map.get(group, "black"),
-                symbol=marker_shapes.get(group, "circle"),
-                opacity=0.8,
-                line=dict(width=0)
-            ),
-            text=hover_text,
-            hoverinfo="text",
-            name=group   
-        ))
-
-    fig.add_layout_image(
-        dict(
-            source=moon_img_uri,
-            xref="x",
-            yref="y",
-            x=-180,
-            y=90,
-            sizex=360,
-            sizey=180,
-            sizing="stretch",
-            opacity=1,
-            layer="below"
-        )
-    )
 
-    fig.update_layout(
-        title=dict(
-            text="Mission Location Representation on the Moon",
-            x=0,
-            xanchor='left',
-            y=0.8,
-            yanchor='top',
-            font=dict(size=20)
-        ),
-        xaxis=dict(
-            title="Longitude (°)",
-            range=[-180, 180],
-            constrain='domain',
-            scaleratio=1,
-            scaleanchor="y",
-            fixedrange=True,
-            showgrid=False,
-            zeroline=False,
-        ),
-        yaxis=dict(
-            title=dict(
-                text="Latitude (°)",
-                standoff=20 
-            ),
-            range=[-90, 90],
-            constrain='domain',
-            fixedrange=True,
-            showgrid=False,
-            zeroline=False,
-        ),
-        margin=dict(l=80, r=20, t=20, b=40), 
-        plot_bgcolor='rgba(0,0,0,0)',
-        paper_bgcolor='rgba(0,0,0,0)',
-        showlegend=True,
-        legend=dict(
-            title="Mission Group",
-            y=0.8, 
-            yanchor="top", 
-            x=1,   
-            xanchor="left",
-        ),
-        hoverlabel=dict(bgcolor="white", font_size=12, font_color="black"),
-        width=800,
-        height=600
-    )
+        with st.sidebar:
+                st.header("Filter Simulant Data")
+                #original filters 
+                soil_group_filter = st.multiselect("Select Type of Simulant", ["Mare", "Highland"], key="sim_soil_group", format_func=with_count(simulant_counts["Soil Group"]))
+                test_filter = st.multiselect("Select Test Type", simulant_stats["Test"]["values"], key="sim_test", format_func=with_count(simulant_counts["Test"]))
+                agency_filter = st.multiselect("Select Agency", ["NASA", "ESA", "JAXA", "KASA", "ISRO", "CNSA", "GISTDA"], key="sim_agency", format_func=with_count(simulant_counts["Agency"]))
+                # --- Text / Categorical Filters ---
+                developer_filter = st.multiselect(
+                    "Select Developer(s):",
+                    options=simulant_stats["Developer"]["sorted_values"],
+                    key="sim_developer",
+                    format_func=with_count(simulant_counts["Developer"])
+                )
 
-    fig.update_xaxes(automargin=False)
-    fig.update_yaxes(automargin=False)
+                #country_filter = st.multiselect(
+                #    "Select Country:",
+                #    options=sorted(simulant_db_df["Moon Location/Country"].dropna().unique())
+                #)         )
+
+                # --- Numeric Range Filters ---
+                year_range = range_slider(simulant_stats, "Year of publication", key="sim_year")
+                density_range = range_slider(simulant_stats, "Bulk density (g/cm^3)", key="sim_density", bounds=False)
+                cohesion_range = range_slider(simulant_stats, "Cohesion (kPa)", key="sim_cohesion", bounds=False)
+                angle_range = range_slider(simulant_stats, "Angle of internal friction (degree)", key="sim_angle", bounds=False)
+
+                #st.markdown("### Static Bearing Capacity (kPa)")
+                #if "Static bearing capacity (kPa)" in simulant_df.columns:
+                #    sbc_min, sbc_max = float(simulant_df["Static bearing capacity (kPa)"].min()), float(simulant_df["Static bearing capacity (kPa)"].max())
+                #    sbc_range = st.slider(
+                #        "Select Static Bearing Capacity Range",
+                #        min_value=round(sbc_min, 1),
+                #        max_value=round(sbc_max, 1),
+                #        value=(round(sbc_min, 1), round(sbc_max, 1))
+                #    )
+                #else:
+                #    sbc_range = None
+
+                st.markdown("### Normal Force (N) [To be implemented]")
+                # Placeholder for when you add this column later
+                # normal_force_range = st.slider("Select Normal Force Range", min_value=0, max_value=1000, value=(0, 1000))
+                normal_force_range = None
+
+
+
+                # --- Column Selection ---
+                st.divider()
+                st.header("Display Options")
+                all_columns = list(simulant_stats)
+                default_columns = ["Developer", "Agency", "Simulant", "Year", "Test", "Type of simulant",  "Bulk density (g/cm^3)", "Bulk density (g/cm^3)_min", "Bulk density (g/cm^3)_max", "Bulk density (g/cm^3)_avg", "Angle of internal friction (degree)", "Angle of internal friction (degree)_min", "Angle of internal friction (degree)_max", "Angle of internal friction (degree)_avg", "Cohesion (kPa)", "Cohesion (kPa)_min", "Cohesion (kPa)_max", "Cohesion (kPa)_avg", "Source","Year of publication","DOI / URL"]
+                selected_columns = st.multiselect(
+                    "Select columns to display:",
+                    options=all_columns,
+                    default=[col for col in default_columns if col in all_columns]
+                )
+                show_memory_report("simulants")
+                show_validation_report("simulants")
+
+
+        # --- Apply Filters (NaN rows stay visible in the numeric ranges) ---
+        filters = dict(
+            facets={
+                "soil_group": soil_group_filter,
+                "test": test_filter,
+                "agency": agency_filter,
+                "developer": developer_filter,
+            },
+            ranges={
+                "Bulk density (g/cm^3)": density_range,
+                "Cohesion (kPa)": cohesion_range,
+                "Angle of internal friction (degree)": angle_range,
+            },
+            year=year_range,
+        )
+        filtered_db_df = backend.filter("simulants", **filters)
+
+        #if sbc_range:
+        #    filtered_db_df = filter_numeric_range(
+        #        filtered_db_df,
+        #        "Static bearing capacity (kPa)_min", "Static bearing capacity (kPa)_max",
+        #        sbc_range[0], sbc_range[1]
+        #    )
+
+        st.subheader("Database Table")
+        if selected_columns:  # avoid empty selection
+            show_table("simulants", filters, selected_columns, key="sim", rows=filtered_db_df)
+            show_export_panel("simulants", filters, selected_columns, key="sim")
+        else:
+            st.info("No columns selected. Please select at least one column to display.")
 
-    config_map = {
-    "displayModeBar": False,
-    "scrollZoom": True
-    }
-    st.plotly_chart(fig, use_container_width=True, height=800, config=config_map)
 
+        # Plotting Section & Display
+        st.subheader("Plot Numerical Data")
+        x_axis = st.selectbox("X-axis (categorical)", [
+            "Developer", "Agency", "Simulant", "Year", "Test", "Type of simulant",  
+            "Bulk density (g/cm^3)", "Angle of internal friction (degree)", "Cohesion (kPa)"
+        ])
+        y_axis = st.selectbox("Y-axis (numeric)", [
+            "Bulk density (g/cm^3)", "Angle of internal friction (degree)", "Cohesion (kPa)"
+        ])
 
-# --------------------------- Lunar Simulants Database Section ---------------------------
+    
+        filtered_plot_df = filtered_db_df.dropna(subset=[x_axis, y_axis])
 
-elif db_choice == "Lunar Regolith Simulants Database":
+        if not filtered_plot_df.empty:
+            fig = simulant_scatter(filtered_plot_df, x_axis, y_axis)
 
-    st.title("Lunar Regolith Simulants Database")
-    simulant_db_df.columns = simulant_db_df.columns.str.strip()
-    numeric_cols = ["Year","Bulk density (g/cm^3)", "Angle of internal friction (degree)", "Cohesion (kPa)", "Year of publication"]
-    for col in numeric_cols:
-        if col in simulant_db_df.columns:
-            simulant_db_df[col] = pd.to_numeric(simulant_db_df[col], errors="coerce")
+            # Config for Plotly
+            config_simulant = {"displayModeBar": False, "scrollZoom": True}
 
-    # Soil categorization function
-    def categorize_soil(soil_name):
-        if pd.isna(soil_name):
-            return "Other"
-        name = soil_name.lower()
-        if "mare" in name:
-            return "Mare"
-        elif "highland" in name:
-            return "Highland"
-        else:
-            return "Other"
-        
-    def extract_range(value):
-        if pd.isna(value):
-            return (np.nan, np.nan)
-        if isinstance(value, (int, float)):
-            return (float(value), float(value))
-        match = re.findall(r"[-+]?\d*\.?\d+", str(value))
-        if len(match) == 0:
-            return (np.nan, np.nan)
-        elif len(match) == 1:
-            val = float(match[0])
-            return (val, val)
+            st.plotly_chart(fig, use_container_width=True, config=config_simulant)
         else:
-            return (float(match[0]), float(match[-1]))  # take first and last
-        
-
-    # --- Columns that may contain ranges ---
-    range_columns = [
-        "Bulk density (g/cm^3)",
-        "Angle of internal friction (degree)",
-        "Cohesion (kPa)",
-    ]
-
-    # --- Apply extraction and create numeric columns ---
-    for col in range_columns:
-        if col in simulant_db_df.columns:
-            simulant_db_df[[f"{col}_min", f"{col}_max"]] = simulant_db_df[col].apply(
-                lambda x: pd.Series(extract_range(x))
-            )
-            simulant_db_df[f"{col}_avg"] = simulant_db_df[
-                [f"{col}_min", f"{col}_max"]
-            ].mean(axis=1)
+            st.info("No data available for the selected plot.")
+
+
+
+    # --------------------------- All Data Section ---------------------------
+    elif db_choice == "All Data":
+        st.title("Combined Lunar Regolith Database")
+
+        backend = get_backend()
+        with perf.stage("load"):
+            if backend.name == "pandas":
+                # both source tables and views are built concurrently on a cold start (see load_datasets)
+                load_datasets(["all"])
+            all_stats = backend.column_stats("all")
+
+        # Live facet counts: rows each option would keep under the other current filters
+        all_counts = live_facet_counts(
+            "all",
+            facet_keys={"Terrain type": "all_terrain", "Test": "all_test", "Type of mission": "all_mission_type", "Mission Group": "all_mission_group"},
+            range_keys={
+                "all_year": ("Year of publication", None),
+                "all_density": ("Bulk density (g/cm^3)", 2),
+                "all_cohesion": ("Cohesion (kPa)", 1),
+                "all_angle": ("Angle of internal friction (degree)", 1),
+                "all_sbc": ("Static bearing capacity (kPa)", 1),
+            },
+        )
 
-    simulant_db_df["Soil Group"] = simulant_db_df["Type of simulant"].apply(categorize_soil)
+        # --- Sidebar Filters ---
+        with st.sidebar:
+            st.header("Filter Regolith Data")
 
+            soil_group_filter = st.multiselect("Select Terrain type", ["Mare", "Highland"], key="all_terrain", format_func=with_count(all_counts["Terrain type"]))
+            test_filter = st.multiselect("Select Test Type", all_stats["Test"]["values"], key="all_test", format_func=with_count(all_counts["Test"]))
 
-    with st.sidebar:
-            st.header("Filter Simulant Data")
-            #original filters 
-            soil_group_filter = st.multiselect("Select Type of Simulant", ["Mare", "Highland"])
-            test_filter = st.multiselect("Select Test Type", simulant_db_df["Test"].dropna().unique())
-            agency_filter = st.multiselect("Select Agency", ["NASA", "ESA", "JAXA", "KASA", "ISRO", "CNSA", "GISTDA"])
-            # --- Text / Categorical Filters ---
-            developer_filter = st.multiselect(
-                "Select Developer(s):",
-                options=sorted(simulant_db_df["Developer"].dropna().unique())
+            mission_type_filter = st.multiselect(
+                "Select type of mission:",
+                options=all_stats["Type of mission"]["sorted_values"],
+                key="all_mission_type",
+                format_func=with_count(all_counts["Type of mission"])
             )
 
-            #country_filter = st.multiselect(
-            #    "Select Country:",
-            #    options=sorted(simulant_db_df["Moon Location/Country"].dropna().unique())
-            #)         )
+            mission_group_filter = st.multiselect(
+                "Select Mission Group",
+                options=["Apollo", "Luna", "Surveyor", "Chang'e", "Chandrayaan", "Simulant"],
+                key="all_mission_group",
+                format_func=with_count(all_counts["Mission Group"])
+            )
 
             # --- Numeric Range Filters ---
-            st.markdown("### Publication Year")
-            if "Year of publication" in simulant_db_df.columns and simulant_db_df["Year of publication"].notna().any():
-                year_min, year_max = int(simulant_db_df["Year of publication"].min()), int(simulant_db_df["Year of publication"].max())
-                year_range = st.slider(
-                    "Select Year of publication Range",
-                    min_value=year_min,
-                    max_value=year_max,
-                    value=(year_min, year_max)
-                )
-            else:
-                year_range = None
-
-            st.markdown("### Density (g/cm³)")
-            if "Bulk density (g/cm^3)" in simulant_db_df.columns:
-                dens_min, dens_max = float(simulant_db_df["Bulk density (g/cm^3)"].min()), float(simulant_db_df["Bulk density (g/cm^3)"].max())
-                density_range = st.slider(
-                    "Select Density Range",
-                    min_value=round(dens_min, 2),
-                    max_value=round(dens_max, 2),
-                    value=(round(dens_min, 2), round(dens_max, 2))
-                )
-            else:
-                density_range = None
-
-            st.markdown("### Cohesion (kPa)")
-            if "Cohesion (kPa)" in simulant_db_df.columns:
-                coh_min, coh_max = float(simulant_db_df["Cohesion (kPa)"].min()), float(simulant_db_df["Cohesion (kPa)"].max())
-                cohesion_range = st.slider(
-                    "Select Cohesion Range",
-                    min_value=round(coh_min, 1),
-                    max_value=round(coh_max, 1),
-                    value=(round(coh_min, 1), round(coh_max, 1))
-                )
-            else:
-                cohesion_range = None
-
-            st.markdown("### Angle of Internal Friction (°)")
-            if "Angle of internal friction (degree)" in simulant_db_df.columns:
-                ang_min, ang_max = float(simulant_db_df["Angle of internal friction (degree)"].min()), float(simulant_db_df["Angle of internal friction (degree)"].max())
-                angle_range = st.slider(
-                    "Select Angle Range",
-                    min_value=round(ang_min, 1),
-                    max_value=round(ang_max, 1),
-                    value=(round(ang_min, 1), round(ang_max, 1))
-                )
-            else:
-                angle_range = None
-
-            #st.markdown("### Static Bearing Capacity (kPa)")
-            #if "Static bearing capacity (kPa)" in simulant_df.columns:
-            #    sbc_min, sbc_max = float(simulant_df["Static bearing capacity (kPa)"].min()), float(simulant_df["Static bearing capacity (kPa)"].max())
-            #    sbc_range = st.slider(
-            #        "Select Static Bearing Capacity Range",
-            #        min_value=round(sbc_min, 1),
-            #        max_value=round(sbc_max, 1),
-            #        value=(round(sbc_min, 1), round(sbc_max, 1))
-            #    )
-            #else:
-            #    sbc_range = None
-
-            st.markdown("### Normal Force (N) [To be implemented]")
-            # Placeholder for when you add this column later
-            # normal_force_range = st.slider("Select Normal Force Range", min_value=0, max_value=1000, value=(0, 1000))
-            normal_force_range = None
-
-
+            year_range = range_slider(all_stats, "Year of publication", key="all_year")
+            density_range = range_slider(all_stats, "Bulk density (g/cm^3)", key="all_density")
+            cohesion_range = range_slider(all_stats, "Cohesion (kPa)", key="all_cohesion")
+            angle_range = range_slider(all_stats, "Angle of internal friction (degree)", key="all_angle")
+            sbc_range = range_slider(all_stats, "Static bearing capacity (kPa)", key="all_sbc")
 
             # --- Column Selection ---
             st.divider()
             st.header("Display Options")
-            all_columns = simulant_db_df.columns.tolist()
-            default_columns = ["Developer", "Agency", "Simulant", "Year", "Test", "Type of simulant",  "Bulk density (g/cm^3)", "Bulk density (g/cm^3)_min", "Bulk density (g/cm^3)_max", "Bulk density (g/cm^3)_avg", "Angle of internal friction (degree)", "Angle of internal friction (degree)_min", "Angle of internal friction (degree)_max", "Angle of internal friction (degree)_avg", "Cohesion (kPa)", "Cohesion (kPa)_min", "Cohesion (kPa)_max", "Cohesion (kPa)_avg", "Source","Year of publication","DOI / URL"]
+            all_columns = list(all_stats)
+            default_columns = [
+                "Mission/Simulant", "Developer", "Agency", "Moon Location/Country", "Year", "Terrain type", 
+                "Type of mission", "Test", "Test location", "Bulk density (g/cm^3)", 
+                "Angle of internal friction (degree)", "Cohesion (kPa)", "Static bearing capacity (kPa)",
+                "Source", "Year of publication", "DOI / URL"
+            ]
             selected_columns = st.multiselect(
                 "Select columns to display:",
                 options=all_columns,
                 default=[col for col in default_columns if col in all_columns]
             )
-
-
-    filtered_db_df = simulant_db_df.copy()
-    if soil_group_filter:
-        filtered_db_df = filtered_db_df[filtered_db_df["Soil Group"].isin(soil_group_filter)]
-    if test_filter:
-        filtered_db_df = filtered_db_df[filtered_db_df["Test"].isin(test_filter)]
-    if agency_filter:
-        filtered_db_df = filtered_db_df[filtered_db_df["Agency"].isin(agency_filter)]
-    if developer_filter:
-        filtered_db_df = filtered_db_df[filtered_db_df["Developer"].isin(developer_filter)]
-    if year_range:
-        filtered_db_df = filtered_db_df[
-            (filtered_db_df["Year of publication"] >= year_range[0]) & (filtered_db_df["Year of publication"] <= year_range[1])
-        ]
-
-        # --- Numeric filters (keep NaN rows visible) ---
-    def filter_numeric_range(df, col_min, col_max, min_val, max_val):
-        """Filter keeping NaNs visible."""
-        return df[
-            ((df[col_max].ge(min_val)) | (df[col_max].isna())) &
-            ((df[col_min].le(max_val)) | (df[col_min].isna()))
-        ]
-    
-    if density_range:
-        filtered_db_df = filter_numeric_range(
-            filtered_db_df,
-            "Bulk density (g/cm^3)_min", "Bulk density (g/cm^3)_max",
-            density_range[0], density_range[1]
+            show_memory_report("all")
+
+        # --- Apply Filters (NaN rows stay visible in the numeric ranges) ---
+        filters = dict(
+            facets={
+                "terrain": soil_group_filter,
+                "test": test_filter,
+                "mission_group": mission_group_filter,
+                "mission_type": mission_type_filter,
+            },
+            ranges={
+                "Bulk density (g/cm^3)": density_range,
+                "Cohesion (kPa)": cohesion_range,
+                "Angle of internal friction (degree)": angle_range,
+                "Static bearing capacity (kPa)": sbc_range,
+            },
+            year=year_range,
         )
-    
-    if cohesion_range:
-        filtered_db_df = filter_numeric_range(
-            filtered_db_df,
-            "Cohesion (kPa)_min", "Cohesion (kPa)_max",
-            cohesion_range[0], cohesion_range[1]
-        )
-    
-    if angle_range:
-        filtered_db_df = filter_numeric_range(
-            filtered_db_df,
-            "Angle of internal friction (degree)_min", "Angle of internal friction (degree)_max",
-            angle_range[0], angle_range[1]
-        )
-    
-    #if sbc_range:
-    #    filtered_db_df = filter_numeric_range(
-    #        filtered_db_df,
-    #        "Static bearing capacity (kPa)_min", "Static bearing capacity (kPa)_max",
-    #        sbc_range[0], sbc_range[1]
-    #    )
-
-    st.subheader("Database Table")
-    if selected_columns:  # avoid empty selection
-        st.dataframe(filtered_db_df[selected_columns])
-    else:
-        st.info("No columns selected. Please select at least one column to display.")
-
-
-    # Plotting Section & Display
-    st.subheader("Plot Numerical Data")
-    x_axis = st.selectbox("X-axis (categorical)", [
-        "Developer", "Agency", "Simulant", "Year", "Test", "Type of simulant",  
-        "Bulk density (g/cm^3)", "Angle of internal friction (degree)", "Cohesion (kPa)"
-    ])
-    y_axis = st.selectbox("Y-axis (numeric)", [
-        "Bulk density (g/cm^3)", "Angle of internal friction (degree)", "Cohesion (kPa)"
-    ])
 
-    
-    filtered_plot_df = filtered_db_df.dropna(subset=[x_axis, y_axis])
-
-    if not filtered_plot_df.empty:
-        fig = px.scatter(
-            filtered_plot_df,
-            x=x_axis,
-            y=y_axis,
-            color="Soil Group",
-            symbol="Soil Group",
-            color_discrete_map={"Mare": "#4dbaed", "Highland": "#d45087", "Other": "#84ebbb"},
-            symbol_map={"Mare": "circle", "Highland": "square"},
-            hover_data=["Simulant", x_axis, y_axis],
-            title=f"{y_axis} vs {x_axis}",
-        )
-        fig.update_traces(marker=dict(size=10, opacity=0.7))
-
-        # Config for Plotly
-        config_simulant = {"displayModeBar": False, "scrollZoom": True}
-
-        st.plotly_chart(fig, use_container_width=True, config=config_simulant)
-    else:
-        st.info("No data available for the selected plot.")
-
-
-
-# --------------------------- All Data Section ---------------------------
-elif db_choice == "All Data":
-    st.title("Combined Lunar Regolith Database")
-
-    # --- Detect correct mission column ---
-    mission_col_candidates = ["Mission/Simulant", "Mission", "Mission Name"]
-    mission_col = next((col for col in mission_col_candidates if col in all_db_df.columns), None)
-
-    if mission_col is None:
-        st.error("Could not find a mission column. Expected one of: 'Mission/Simulant', 'Mission', or 'Mission Name'.")
-    else:
-        # --- Categorize missions ---
-        def categorize_mission(mission_name):
-            if pd.isna(mission_name):
-                return "Other"
-            name = mission_name.lower()
-            if "apollo" in name:
-                return "Apollo"
-            elif "luna" in name:
-                return "Luna"
-            elif "surveyor" in name:
-                return "Surveyor"
-            elif "chang'e" in name or "change" in name:
-                return "Chang'e"
-            elif "chandrayaan" in name:
-                return "Chandrayaan"
-            else:
-                return "Simulant"
-
-        all_db_df["Mission Group"] = all_db_df[mission_col].apply(categorize_mission)
-
-    # --- Extract numeric ranges ---
-    def extract_range(value):
-        if pd.isna(value):
-            return (np.nan, np.nan)
-        if isinstance(value, (int, float)):
-            return (float(value), float(value))
-        match = re.findall(r"[-+]?\d*\.?\d+", str(value))
-        if len(match) == 0:
-            return (np.nan, np.nan)
-        elif len(match) == 1:
-            val = float(match[0])
-            return (val, val)
+        # --- Display filtered table ---
+        st.subheader("Filtered Database Table")
+        if selected_columns:
+            show_table("all", filters, selected_columns, key="all")
+            show_export_panel("all", filters, selected_columns, key="all")
         else:
-            return (float(match[0]), float(match[-1]))
-
-    range_columns = [
-        "Bulk density (g/cm^3)",
-        "Angle of internal friction (degree)",
-        "Cohesion (kPa)",
-        "Static bearing capacity (kPa)",
-    ]
-
-    for col in range_columns:
-        if col in all_db_df.columns:
-            all_db_df[[f"{col}_min", f"{col}_max"]] = all_db_df[col].apply(lambda x: pd.Series(extract_range(x)))
-
-    # --- Sidebar Filters ---
-    with st.sidebar:
-        st.header("Filter Regolith Data")
+            st.info("No columns selected. Please select at least one column to display.")
 
-        soil_group_filter = st.multiselect("Select Terrain type", ["Mare", "Highland"])
-        test_filter = st.multiselect("Select Test Type", all_db_df["Test"].dropna().unique())
-
-        mission_type_filter = st.multiselect(
-            "Select type of mission:",
-            options=sorted(all_db_df["Type of mission"].dropna().unique())
+        st.markdown(
+            "<p style='font-size:12px; color:gray;'>Note: Values are for the top 10 cm of lunar soil, see mission details for more depths.<br>* Indicates values estimated for the measurements.</p>",
+            unsafe_allow_html=True
         )
 
-        mission_group_filter = st.multiselect(
-            "Select Mission Group",
-            options=["Apollo", "Luna", "Surveyor", "Chang'e", "Chandrayaan", "Simulant"]
-        )
 
-        # --- Numeric Range Filters ---
-        st.markdown("### Publication Year")
-        if "Year of publication" in all_db_df.columns and all_db_df["Year of publication"].notna().any():
-            year_min, year_max = int(all_db_df["Year of publication"].min()), int(all_db_df["Year of publication"].max())
-            year_range = st.slider("Select Year of publication Range", min_value=year_min, max_value=year_max, value=(year_min, year_max))
-        else:
-            year_range = None
+    # ------------------Mission Details Section ------------------
+    elif db_choice == "Detailed Mission Pages":
+        st.title("Detailed Lunar Mission Pages")
 
-        st.markdown("### Density (g/cm³)")
-        if "Bulk density (g/cm^3)_min" in all_db_df.columns:
-            dens_min = float(all_db_df["Bulk density (g/cm^3)_min"].min(skipna=True))
-            dens_max = float(all_db_df["Bulk density (g/cm^3)_max"].max(skipna=True))
-            density_range = st.slider("Select Density Range", min_value=round(dens_min, 2), max_value=round(dens_max, 2), value=(round(dens_min, 2), round(dens_max, 2)))
-        else:
-            density_range = None
+        BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+        MISSION_DIR = os.path.join(BASE_DIR, "Pages")
 
-        st.markdown("### Cohesion (kPa)")
-        if "Cohesion (kPa)_min" in all_db_df.columns:
-            coh_min = float(all_db_df["Cohesion (kPa)_min"].min(skipna=True))
-            coh_max = float(all_db_df["Cohesion (kPa)_max"].max(skipna=True))
-            cohesion_range = st.slider("Select Cohesion Range", min_value=round(coh_min, 1), max_value=round(coh_max, 1), value=(round(coh_min, 1), round(coh_max, 1)))
+        if not os.path.exists(MISSION_DIR):
+            st.error(f"❌ Could not find mission directory: {MISSION_DIR}")
         else:
-            cohesion_range = None
-
-        st.markdown("### Angle of Internal Friction (°)")
-        if "Angle of internal friction (degree)_min" in all_db_df.columns:
-            ang_min = float(all_db_df["Angle of internal friction (degree)_min"].min(skipna=True))
-            ang_max = float(all_db_df["Angle of internal friction (degree)_max"].max(skipna=True))
-            angle_range = st.slider("Select Angle Range", min_value=round(ang_min, 1), max_value=round(ang_max, 1), value=(round(ang_min, 1), round(ang_max, 1)))
-        else:
-            angle_range = None
-
-        st.markdown("### Static Bearing Capacity (kPa)")
-        if "Static bearing capacity (kPa)_min" in all_db_df.columns:
-            sbc_min = float(all_db_df["Static bearing capacity (kPa)_min"].min(skipna=True))
-            sbc_max = float(all_db_df["Static bearing capacity (kPa)_max"].max(skipna=True))
-            sbc_range = st.slider("Select Static Bearing Capacity Range", min_value=round(sbc_min, 1), max_value=round(sbc_max, 1), value=(round(sbc_min, 1), round(sbc_max, 1)))
-        else:
-            sbc_range = None
-
-        # --- Column Selection ---
-        st.divider()
-        st.header("Display Options")
-        all_columns = all_db_df.columns.tolist()
-        default_columns = [
-            "Mission/Simulant", "Developer", "Agency", "Moon Location/Country", "Year", "Terrain type", 
-            "Type of mission", "Test", "Test location", "Bulk density (g/cm^3)", 
-            "Angle of internal friction (degree)", "Cohesion (kPa)", "Static bearing capacity (kPa)",
-            "Source", "Year of publication", "DOI / URL"
-        ]
-        selected_columns = st.multiselect(
-            "Select columns to display:",
-            options=all_columns,
-            default=[col for col in default_columns if col in all_columns]
-        )
-
-    # --- Apply Filters ---
-    filtered_db_df = all_db_df.copy()  
-    numeric_cols = [
-        "Year of publication",
-        "Bulk density (g/cm^3)",
-        "Angle of internal friction (degree)",
-        "Cohesion (kPa)",
-        "Static bearing capacity (kPa)",
-        "Year"
-    ]
-
-    for col in numeric_cols:
-        if col in filtered_db_df.columns:
-            filtered_db_df[col] = pd.to_numeric(filtered_db_df[col], errors="coerce")
-
-    if soil_group_filter:
-        filtered_db_df = filtered_db_df[filtered_db_df["Terrain type"].isin(soil_group_filter)]
-    if test_filter:
-        filtered_db_df = filtered_db_df[filtered_db_df["Test"].isin(test_filter)]
-    if mission_group_filter:
-        filtered_db_df = filtered_db_df[filtered_db_df["Mission Group"].isin(mission_group_filter)]
-    if mission_type_filter:
-        filtered_db_df = filtered_db_df[filtered_db_df["Type of mission"].isin(mission_type_filter)]
-    if year_range:
-        filtered_db_df = filtered_db_df[
-            (filtered_db_df["Year of publication"] >= year_range[0]) & (filtered_db_df["Year of publication"] <= year_range[1])
-        ]
-
-    def filter_numeric_range(df, col_min, col_max, min_val, max_val):
-        return df[
-            ((df[col_max].ge(min_val)) | (df[col_max].isna())) &
-            ((df[col_min].le(max_val)) | (df[col_min].isna()))
-        ]
-
-    if density_range:
-        filtered_db_df = filter_numeric_range(filtered_db_df, "Bulk density (g/cm^3)_min", "Bulk density (g/cm^3)_max", *density_range)
-    if cohesion_range:
-        filtered_db_df = filter_numeric_range(filtered_db_df, "Cohesion (kPa)_min", "Cohesion (kPa)_max", *cohesion_range)
-    if angle_range:
-        filtered_db_df = filter_numeric_range(filtered_db_df, "Angle of internal friction (degree)_min", "Angle of internal friction (degree)_max", *angle_range)
-    if sbc_range:
-        filtered_db_df = filter_numeric_range(filtered_db_df, "Static bearing capacity (kPa)_min", "Static bearing capacity (kPa)_max", *sbc_range)
-
-    # --- Display filtered table ---
-    st.subheader("Filtered Database Table")
-    if selected_columns:
-        st.dataframe(filtered_db_df[selected_columns])
-    else:
-        st.info("No columns selected. Please select at least one column to display.")
-
-    st.markdown(
-        "<p style='font-size:12px; color:gray;'>Note: Values are for the top 10 cm of lunar soil, see mission details for more depths.<br>* Indicates values estimated for the measurements.</p>",
-        unsafe_allow_html=True
-    )
-
-
-# ------------------Mission Details Section ------------------
-elif db_choice == "Detailed Mission Pages":
-    st.title("Detailed Lunar Mission Pages")
-
-    BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-    MISSION_DIR = os.path.join(BASE_DIR, "Pages")
-
-    if not os.path.exists(MISSION_DIR):
-        st.error(f"❌ Could not find mission directory: {MISSION_DIR}")
-    else:
-        # --- List all mission scripts ---
-        available_missions = {}
-        for filename in os.listdir(MISSION_DIR):
-            if filename.endswith(".py"):
-                mission_name = filename[:-3].replace("_", " ").title()
-                available_missions[mission_name] = os.path.join(MISSION_DIR, filename)
-
-        # --- Sidebar selection ---
-        st.sidebar.header("Mission Selection")
-        mission_choice = st.sidebar.selectbox(
-            "Select a mission to view details:",
-            options=[""] + sorted(list(available_missions.keys())),  # empty default (none selected)
-            format_func=lambda x: "Select a mission" if x == "" else x
-        )
+            # --- List all mission scripts ---
+            available_missions = {}
+            for filename in os.listdir(MISSION_DIR):
+                if filename.endswith(".py"):
+                    mission_name = filename[:-3].replace("_", " ").title()
+                    available_missions[mission_name] = os.path.join(MISSION_DIR, filename)
+
+            # --- Sidebar selection ---
+            st.sidebar.header("Mission Selection")
+            mission_choice = st.sidebar.selectbox(
+                "Select a mission to view details:",
+                options=[""] + sorted(list(available_missions.keys())),  # empty default (none selected)
+                format_func=lambda x: "Select a mission" if x == "" else x
+            )
 
-        # --- Load and display selected mission page ---
-        if mission_choice:
-            st.divider()
-            st.subheader(f"📄 Detailed Data for {mission_choice}")
+            # --- Load and display selected mission page ---
+            if mission_choice:
+                st.divider()
+                st.subheader(f"📄 Detailed Data for {mission_choice}")
 
-            mission_file = available_missions[mission_choice]
-            spec = importlib.util.spec_from_file_location("mission_module", mission_file)
-            mission_module = importlib.util.module_from_spec(spec)
-            spec.loader.exec_module(mission_module)
+                mission_file = available_missions[mission_choice]
+                spec = importlib.util.spec_from_file_location("mission_module", mission_file)
+                mission_module = importlib.util.module_from_spec(spec)
+                spec.loader.exec_module(mission_module)
 
-            if hasattr(mission_module, "show_mission"):
-                mission_module.show_mission()  # Run mission page script
+                if hasattr(mission_module, "show_mission"):
+                    mission_module.show_mission()  # Run mission page script
+                else:
+                    st.warning("No show_mission() function found in this mission script.")
             else:
-                st.warning("No show_mission() function found in this mission script.")
-        else:
-            st.info("Select a mission from the sidebar to display its detailed page.")
+                st.info("Select a mission from the sidebar to display its detailed page.")
 
-# ------------------- Footer --------------------
-import requests
-import datetime
+    # ------------------- Footer --------------------
+    import requests
+    import datetime
 
 
-def get_last_commit_date(repo="leoniegasteiner/Lunar-Regolith-Database", branch="main"):
-    try:
-        token = st.secrets.get("GITHUB_TOKEN", None)
-        headers = {"Accept": "application/vnd.github.v3+json"}
-        if token:
-            headers["Authorization"] = f"token {token}"
+    def get_last_commit_date(repo="leoniegasteiner/Lunar-Regolith-Database", branch="main"):
+        try:
+            token = st.secrets.get("GITHUB_TOKEN", None)
+            headers = {"Accept": "application/vnd.github.v3+json"}
+            if token:
+                headers["Authorization"] = f"token {token}"
 
-        url = f"https://api.github.com/repos/{repo}/commits/{branch}"
-        resp = requests.get(url, headers=headers, timeout=10)
-        resp.raise_for_status()
+            url = f"https://api.github.com/repos/{repo}/commits/{branch}"
+            resp = requests.get(url, headers=headers, timeout=10)
+            resp.raise_for_status()
 
-        data = resp.json()
-        commit_iso = data["commit"]["committer"]["date"]
-        dt = datetime.datetime.fromisoformat(commit_iso.replace("Z", "+00:00"))
-        return dt.strftime("%d %B %Y")
+            data = resp.json()
+            commit_iso = data["commit"]["committer"]["date"]
+            dt = datetime.datetime.fromisoformat(commit_iso.replace("Z", "+00:00"))
+            return dt.strftime("%d %B %Y")
 
-    except Exception as e:
-        st.write("⚠️ Could not fetch last commit date:", e)
-        return "Unknown"
+        except Exception as e:
+            st.write("⚠️ Could not fetch last commit date:", e)
+            return "Unknown"
 
-last_updated = get_last_commit_date()
+    with perf.stage("footer"):
+        last_updated = get_last_commit_date()
+
+    st.markdown(
+        f"<hr><p style='font-size:11px; color:gray; text-align:center;'>© 2025 Lunar Regolith Database <br> Contact us at gasteinerleonie@gmail.com <br> Last updated: {last_updated}</p>",
+        unsafe_allow_html=True
+    )
 
-st.markdown(
-    f"<hr><p style='font-size:11px; color:gray; text-align:center;'>© 2025 Lunar Regolith Database <br> Contact us at gasteinerleonie@gmail.com <br> Last updated: {last_updated}</p>",
-    unsafe_allow_html=True
-)
 
+# ------------------- Rerun timings & developer panel --------------------
+if dev_mode:
+    with st.expander("Developer: rerun timings"):
+        st.caption(f"{rerun.section}: {rerun.total * 1000:.1f} ms")
+        st.dataframe(rerun.frame(), hide_index=True)
+        if rerun.counters:
+            st.dataframe(rerun.counters_frame(), hide_index=True)
+        st.line_chart(perf.history(), x="started", y="ms")
@@ -0,0 +1,35 @@
+"""Lunar Regolith Database: datasets, derived columns and filters without Streamlit."""
+from .backends import available_backends, get_backend
+from .data import (
+    DATASETS,
+    categorize_mission,
+    categorize_soil,
+    column_stats,
+    dataset_version,
+    extract_range,
+    facet_index,
+    load_dataset,
+    memory_report,
+    parse_location,
+    star_schema,
+    validation_report,
+)
+from .diskcache import cached
+from .query import (
+    facet_counts,
+    filter_dataset,
+    filter_numeric_range,
+    page_dataset,
+    to_arrow,
+)
+
+# modules that also run with python -m are imported on first use, so that running them
+# does not find them already imported by the package
+_LAZY = {"append_rows": "ingest", "compact": "ingest", "diff_frames": "snapshot", "save_snapshot": "snapshot"}
+
+def __getattr__(name):
+    if name in _LAZY:
+        import importlib
+
+        return getattr(importlib.import_module(f".{_LAZY[name]}", __name__), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,555 @@
+"""Query backends: the filter, projection, paging and aggregate layer behind the CLI,
+the HTTP service, exports and the paged table.
+
+    pandas   the prepared in-memory frames of data.py (default)
+    duckdb   an embedded DuckDB over Parquet files, filters, projections, sorts and
+             aggregates pushed down, results streamed back in record batches
+    polars   Polars lazy plans over the same Parquet files, run multi-threaded
+
+The backend is chosen with LUNAR_REGOLITH_BACKEND (or get_backend(name)). The DuckDB
+and Polars backends read the prepared dataset written to one Parquet file per version
+(under the user's cache directory, see diskcache.py). With LUNAR_REGOLITH_PARQUET_DIR
+set they read PARQUET_DIR/<dataset>/*.parquet instead, where such a directory exists,
+so a fork can serve tables far larger than memory (with the prepared columns: _min/_max
+bounds, Mission Group, ...); those files are not tied to the CSVs' version, their
+version (of the column statistics, ETags, ...) comes from their names, mtimes and
+sizes instead. Filter semantics are those of query.py and the column statistics and
+facet counts those of data.py for every backend, parity.py checks that they all
+return the same results.
+"""
+import functools
+import glob
+import hashlib
+import importlib.util
+import os
+import tempfile
+import threading
+
+import numpy as np
+import pandas as pd
+
+from . import perf
+from .data import column_stats, dataset_spec, dataset_version, load_dataset
+from .diskcache import check_owner, private_dir, user_cache_dir
+from .query import YEAR_COLUMN, facet_column, facet_counts, filter_dataset, filtered_positions
+
+BACKEND = os.environ.get("LUNAR_REGOLITH_BACKEND", "pandas")
+# optional packages a backend needs, backends without them are not offered
+BACKEND_REQUIREMENTS = {"duckdb": ("duckdb", "pyarrow"), "polars": ("polars", "pyarrow")}
+AGGREGATES = ("count", "mean", "median", "min", "max", "sum")
+DEFAULT_BATCH_SIZE = 10_000
+HISTOGRAM_BINS = 10  # as data.compute_column_stats
+# external tables, only read when configured explicitly
+PARQUET_DIR = os.environ.get("LUNAR_REGOLITH_PARQUET_DIR")
+PARQUET_CACHE_DIR = os.path.join(user_cache_dir(), "parquet")
+
+
+def check_aggregate(agg):
+    if agg not in AGGREGATES:
+        raise ValueError(f"Unknown aggregate {agg!r}, expected one of: {', '.join(AGGREGATES)}")
+
+def check_columns(available, columns):
+    missing = [col for col in columns if col not in available]
+    if missing:
+        raise KeyError(f"unknown column(s): {', '.join(missing)}")
+
+
+# --- Column statistics and facet counts of the Parquet backends ---
+# Same entries as data.compute_column_stats. The histogram of a numeric column is read
+# from how many values reach each interior bin edge, which puts every value in the
+# bin np.histogram puts it in (the last bin includes the maximum).
+def histogram_edges(low, high, bins):
+    if low == high:
+        low, high = low - 0.5, high + 0.5
+    return np.linspace(low, high, bins + 1).tolist()
+
+def numeric_entry(count, null_count, low, high, at_least):
+    """Stats entry of a numeric column, at_least[k] counting the values >= interior edge k."""
+    entry = {"count": count, "null_count": null_count}
+    if not count:
+        entry.update(min=None, max=None, histogram=([], []))
+        return entry
+    cumulative = [count, *at_least, 0]
+    edges = histogram_edges(low, high, len(at_least) + 1)
+    entry.update(
+        min=float(low),
+        max=float(high),
+        histogram=([cumulative[k] - cumulative[k + 1] for k in range(len(edges) - 1)], edges),
+    )
+    return entry
+
+def text_entry(value_counts, null_count):
+    """Stats entry of a text column from (value, count) pairs in order of first appearance."""
+    values = [value for value, _ in value_counts]
+    return {
+        "count": sum(count for _, count in value_counts),
+        "null_count": null_count,
+        "values": values,
+        "sorted_values": sorted(values),
+        "value_counts": {value: int(count) for value, count in value_counts},
+    }
+
+def grouped_facet_counts(backend, dataset, facets=None, ranges=None, year=None):
+    """query.facet_counts from the backend's column_stats and group_counts."""
+    stats = backend.column_stats(dataset)
+    selected = {facet_column(dataset, key): values for key, values in (facets or {}).items() if values}
+    counts = {}
+    for col in dataset_spec(dataset)["facets"].values():
+        others = {key: values for key, values in selected.items() if key != col}
+        found = backend.group_counts(dataset, col, others, ranges, year)
+        counts[col] = {option: found.get(option, 0) for option in stats[col]["values"]}
+    return counts
+
+
+class PandasBackend:
+    """Queries over the prepared frames, through the masks and indexes of query.py."""
+
+    name = "pandas"
+
+    def version(self, dataset):
+        return dataset_version(dataset)
+
+    def columns(self, dataset):
+        return list(load_dataset(dataset).columns)
+
+    def column_stats(self, dataset):
+        return column_stats(dataset)
+
+    def numeric_columns(self, dataset):
+        df = load_dataset(dataset)
+        return [col for col in df.columns if pd.api.types.is_numeric_dtype(df[col])]
+
+    def column_stats(self, dataset):
+        return column_stats(dataset)
+
+    def facet_counts(self, dataset, facets=None, ranges=None, year=None):
+        return facet_counts(dataset, facets, ranges, year)
+
+    def filter(self, dataset, facets=None, ranges=None, year=None, columns=None):
+        if columns is not None:
+            check_columns(self.columns(dataset), columns)
+        return filter_dataset(dataset, facets, ranges, year, columns)
+
+    def count(self, dataset, facets=None, ranges=None, year=None):
+        return len(filtered_positions(dataset, facets, ranges, year))
+
+    def page(self, dataset, offset=0, limit=None, sort=None, descending=False, columns=None,
+             facets=None, ranges=None, year=None):
+        """(rows offset..offset+limit of the filtered, optionally sorted result, total rows)."""
+        df = load_dataset(dataset)
+        columns = list(df.columns) if columns is None else list(columns)
+        check_columns(df.columns, columns + ([sort] if sort else []))
+        positions = filtered_positions(dataset, facets, ranges, year, sort, descending)
+        rows = positions[offset:] if limit is None else positions[offset:offset + limit]
+        return df.iloc[rows, df.columns.get_indexer(columns)], len(positions)
+
+    def aggregate(self, dataset, by, value, agg="mean", facets=None, ranges=None, year=None):
+        """One row per non-missing `by` value (sorted) with agg of `value`, column named agg."""
+        check_aggregate(agg)
+        check_columns(self.columns(dataset), [by, value])
+        df = filter_dataset(dataset, facets, ranges, year, [by, value])
+        return df.groupby(by, observed=True, sort=True)[value].agg(agg).rename(agg).reset_index()
+
+    def stream(self, dataset, facets=None, ranges=None, year=None, columns=None, batch_size=DEFAULT_BATCH_SIZE):
+        """(empty frame with the result columns, iterator of result chunks)."""
+        df = self.filter(dataset, facets, ranges, year, columns)
+        return df.iloc[:0], (df.iloc[start:start + batch_size] for start in range(0, len(df), batch_size))
+
+
+# --- DuckDB over Parquet ---
+def quote(identifier):
+    return '"' + str(identifier).replace('"', '""') + '"'
+
+def _sql_string(text):
+    return "'" + text.replace("'", "''") + "'"
+
+DUCKDB_NUMERIC_TYPES = (
+    "TINYINT", "SMALLINT", "INTEGER", "BIGINT", "HUGEINT",
+    "UTINYINT", "USMALLINT", "UINTEGER", "UBIGINT", "FLOAT", "DOUBLE",
+)
+
+def where_clause(dataset, facets=None, ranges=None, year=None):
+    """(SQL condition, parameters) of the app's filters, same semantics as query.filter_masks."""
+    conditions, params = [], []
+    for key, selected in (facets or {}).items():
+        if selected:
+            conditions.append(f"{quote(facet_column(dataset, key))} IN ({', '.join('?' * len(selected))})")
+            params.extend(str(value) for value in selected)
+    for col, bounds in (ranges or {}).items():
+        if bounds is not None:
+            low, high = quote(f"{col}_min"), quote(f"{col}_max")
+            conditions.append(f"({high} >= ? OR {high} IS NULL) AND ({low} <= ? OR {low} IS NULL)")
+            params.extend(float(bound) for bound in bounds)
+    if year is not None:
+        conditions.append(f"{quote(YEAR_COLUMN)} >= ? AND {quote(YEAR_COLUMN)} <= ?")
+        params.extend(float(bound) for bound in year)
+    return " AND ".join(conditions) or "TRUE", params
+
+def _write_parquet(df, path):
+    import pyarrow.parquet as pq
+
+    from .query import to_arrow
+
+    directory = os.path.dirname(path)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".", suffix=".parquet")
+    os.close(fd)
+    try:
+        pq.write_table(to_arrow(df), tmp_path)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+
+def external_source(dataset):
+    """Glob of the dataset's files under LUNAR_REGOLITH_PARQUET_DIR, None if it has none."""
+    if PARQUET_DIR and os.path.isdir(os.path.join(PARQUET_DIR, dataset)):
+        return os.path.join(PARQUET_DIR, dataset, "*.parquet")
+    return None
+
+def parquet_version(dataset):
+    """Version of the Parquet files a dataset is read from: the CSVs' version, or the
+    names, mtimes and sizes of the external files."""
+    source = external_source(dataset)
+    if source is None:
+        return dataset_version(dataset)
+    files = []
+    for path in sorted(glob.glob(source)):
+        st = os.stat(path)
+        files.append((os.path.basename(path), st.st_mtime_ns, st.st_size))
+    return hashlib.sha256(repr(files).encode("utf-8")).hexdigest()[:16]
+
+def parquet_source(dataset):
+    """Glob of the Parquet files of a dataset, written from the prepared frame if needed."""
+    source = external_source(dataset)
+    if source is not None:
+        return source
+    dataset_spec(dataset)
+    private_dir(PARQUET_CACHE_DIR)
+    digest = hashlib.sha256(dataset_version(dataset).encode("utf-8")).hexdigest()[:16]
+    path = os.path.join(PARQUET_CACHE_DIR, f"{dataset}-{digest}.parquet")
+    check_owner(path)
+    if not os.path.exists(path):
+        _write_parquet(load_dataset(dataset), path)
+        for old in glob.glob(os.path.join(PARQUET_CACHE_DIR, f"{dataset}-*.parquet")):
+            if old != path:
+                try:
+                    os.remove(old)
+                except OSError:
+                    pass
+    return path
+
+class DuckDBBackend:
+    """Queries compiled to SQL over the Parquet files of a dataset, run in DuckDB.
+
+    Only the requested columns and matching row groups are read, results come back as
+    Arrow record batches. One connection is shared, each query runs on its own cursor.
+    """
+
+    name = "duckdb"
+
+    def __init__(self, database=":memory:"):
+        import duckdb
+
+        self._connection = duckdb.connect(database)
+        self._lock = threading.Lock()
+
+    def cursor(self):
+        with self._lock:
+            return self._connection.cursor()
+
+    def source(self, dataset):
+        return f"read_parquet({_sql_string(parquet_source(dataset))}, filename=true, file_row_number=true)"
+
+    def version(self, dataset):
+        return parquet_version(dataset)
+
+    def columns(self, dataset):
+        description = self.cursor().execute(f"SELECT * FROM {self.source(dataset)} LIMIT 0").description
+        return [column[0] for column in description if column[0] not in ("filename", "file_row_number")]
+
+    def numeric_columns(self, dataset):
+        described = self.cursor().execute(f"DESCRIBE SELECT * FROM {self.source(dataset)}").fetchall()
+        return [
+            name for name, type_, *_ in described
+            if type_ in DUCKDB_NUMERIC_TYPES or type_.startswith("DECIMAL")
+        ]
+
+    def column_stats(self, dataset):
+        return self._column_stats(dataset, self.version(dataset))
+
+    @functools.lru_cache(maxsize=8)
+    def _column_stats(self, dataset, version):
+        source, columns = self.source(dataset), self.columns(dataset)
+        numeric = [col for col in self.numeric_columns(dataset) if col in columns]
+        cursor = self.cursor()
+        # one scan for the counts and bounds, one for the histograms, one per text column
+        summary = ["count(*)"] + [f"count({quote(col)})" for col in columns]
+        summary += [f"{function}({quote(col)})" for col in numeric for function in ("min", "max")]
+        row = cursor.execute(f"SELECT {', '.join(summary)} FROM {source}").fetchone()
+        n_rows, counts = row[0], dict(zip(columns, row[1:len(columns) + 1]))
+        bounds = dict(zip(numeric, zip(row[len(columns) + 1::2], row[len(columns) + 2::2])))
+        edges = {col: histogram_edges(*bounds[col], HISTOGRAM_BINS)[1:-1] for col in numeric if counts[col]}
+        at_least, params = [], []
+        for col, interior in edges.items():
+            at_least += [f"count(*) FILTER (WHERE {quote(col)} >= ?)"] * len(interior)
+            params += interior
+        reached = iter(cursor.execute(f"SELECT {', '.join(at_least)} FROM {source}", params).fetchone() if at_least else ())
+        stats = {}
+        for col in columns:
+            null_count = n_rows - counts[col]
+            if col in numeric:
+                stats[col] = numeric_entry(
+                    counts[col], null_count, *bounds[col], [next(reached) for _ in edges.get(col, ())]
+                )
+            else:
+                value_counts = cursor.execute(
+                    f"SELECT {quote(col)}, count(*) FROM {source} WHERE {quote(col)} IS NOT NULL"
+                    f" GROUP BY {quote(col)} ORDER BY min(struct_pack(f := filename, r := file_row_number))"
+                ).fetchall()
+                stats[col] = text_entry(value_counts, null_count)
+        return stats
+
+    def group_counts(self, dataset, column, facets=None, ranges=None, year=None):
+        """{value: rows} of one column under the filters."""
+        where, params = where_clause(dataset, facets, ranges, year)
+        sql = (f"SELECT {quote(column)}, count(*) FROM {self.source(dataset)}"
+               f" WHERE ({where}) AND {quote(column)} IS NOT NULL GROUP BY {quote(column)}")
+        return dict(self.cursor().execute(sql, params).fetchall())
+
+    def facet_counts(self, dataset, facets=None, ranges=None, year=None):
+        return grouped_facet_counts(self, dataset, facets, ranges, year)
+
+    def select(self, dataset, columns):
+        available = self.columns(dataset)
+        columns = available if columns is None else list(columns)
+        check_columns(available, columns)
+        return ", ".join(quote(col) for col in columns)
+
+    def filter(self, dataset, facets=None, ranges=None, year=None, columns=None):
+        with perf.stage("filter"):
+            head, chunks = self.stream(dataset, facets, ranges, year, columns)
+            df = pd.concat([head, *chunks], ignore_index=True)
+        perf.count("filtered rows", len(df))
+        return df
+
+    def count(self, dataset, facets=None, ranges=None, year=None):
+        where, params = where_clause(dataset, facets, ranges, year)
+        return self.cursor().execute(f"SELECT count(*) FROM {self.source(dataset)} WHERE {where}", params).fetchone()[0]
+
+    def page(self, dataset, offset=0, limit=None, sort=None, descending=False, columns=None,
+             facets=None, ranges=None, year=None):
+        select = self.select(dataset, columns)
+        if sort:
+            check_columns(self.columns(dataset), [sort])
+        where, params = where_clause(dataset, facets, ranges, year)
+        # dataset order breaks ties, like the stable sort of the pandas backend
+        order = [f"{quote(sort)} {'DESC' if descending else 'ASC'} NULLS LAST"] if sort else []
+        order += ["filename", "file_row_number"]
+        sql = (f"SELECT {select} FROM {self.source(dataset)} WHERE {where} ORDER BY {', '.join(order)}"
+               f" LIMIT {'ALL' if limit is None else int(limit)} OFFSET {int(offset)}")
+        rows = self.cursor().execute(sql, params).fetch_arrow_table().to_pandas()
+        return rows, self.count(dataset, facets, ranges, year)
+
+    def aggregate(self, dataset, by, value, agg="mean", facets=None, ranges=None, year=None):
+        check_aggregate(agg)
+        check_columns(self.columns(dataset), [by, value])
+        function = {"mean": "avg"}.get(agg, agg)
+        expression = f"{function}({quote(value)})"
+        if agg == "sum":
+            expression = f"coalesce({expression}, 0)"
+        where, params = where_clause(dataset, facets, ranges, year)
+        sql = (f"SELECT {quote(by)}, {expression} AS {quote(agg)} FROM {self.source(dataset)}"
+               f" WHERE ({where}) AND {quote(by)} IS NOT NULL GROUP BY {quote(by)} ORDER BY {quote(by)}")
+        return self.cursor().execute(sql, params).fetch_arrow_table().to_pandas()
+
+    def stream(self, dataset, facets=None, ranges=None, year=None, columns=None, batch_size=DEFAULT_BATCH_SIZE):
+        select = self.select(dataset, columns)
+        where, params = where_clause(dataset, facets, ranges, year)
+        reader = self.cursor().execute(
+            f"SELECT {select} FROM {self.source(dataset)} WHERE {where}", params
+        ).fetch_record_batch(batch_size)
+        return reader.schema.empty_table().to_pandas(), (batch.to_pandas() for batch in reader)
+
+
+# --- Polars (lazy, multi-threaded) ---
+class PolarsBackend:
+    """Queries as Polars lazy plans over the same Parquet files as the DuckDB backend.
+
+    Plans run on Polars' thread pool (sized by POLARS_MAX_THREADS), with projection and
+    predicate pushdown into the scan. Categorical columns are compared and sorted as
+    text, like the lexically ordered categories of the pandas frames.
+    """
+
+    name = "polars"
+
+    def scan(self, dataset):
+        import polars as pl
+
+        return pl.scan_parquet(parquet_source(dataset))
+
+    def version(self, dataset):
+        return parquet_version(dataset)
+
+    def columns(self, dataset):
+        return self.scan(dataset).collect_schema().names()
+
+    def numeric_columns(self, dataset):
+        return [col for col, dtype in self.scan(dataset).collect_schema().items() if dtype.is_numeric()]
+
+    def column_stats(self, dataset):
+        return self._column_stats(dataset, self.version(dataset))
+
+    @functools.lru_cache(maxsize=8)
+    def _column_stats(self, dataset, version):
+        import polars as pl
+
+        plan, columns = self.scan(dataset), self.columns(dataset)
+        numeric = self.numeric_columns(dataset)
+        summary = [pl.len()] + [pl.col(col).count() for col in columns]
+        summary += [getattr(pl.col(col), function)() for col in numeric for function in ("min", "max")]
+        row = plan.select([expression.alias(str(i)) for i, expression in enumerate(summary)]).collect().row(0)
+        n_rows, counts = row[0], dict(zip(columns, row[1:len(columns) + 1]))
+        bounds = dict(zip(numeric, zip(row[len(columns) + 1::2], row[len(columns) + 2::2])))
+        edges = {col: histogram_edges(*bounds[col], HISTOGRAM_BINS)[1:-1] for col in numeric if counts[col]}
+        at_least = [(pl.col(col) >= edge).sum() for col, interior in edges.items() for edge in interior]
+        reached = iter(
+            plan.select([expression.alias(str(i)) for i, expression in enumerate(at_least)]).collect().row(0)
+            if at_least else ()
+        )
+        stats = {}
+        for col in columns:
+            null_count = n_rows - counts[col]
+            if col in numeric:
+                stats[col] = numeric_entry(
+                    counts[col], null_count, *bounds[col], [next(reached) for _ in edges.get(col, ())]
+                )
+            else:
+                first = (
+                    plan.select(pl.col(col).cast(pl.String)).with_row_index("__row")
+                    .filter(pl.col(col).is_not_null())
+                    .group_by(col).agg(pl.len().alias("__count"), pl.col("__row").min())
+                    .sort("__row")
+                    .collect()
+                )
+                stats[col] = text_entry(list(zip(first[col].to_list(), first["__count"].to_list())), null_count)
+        return stats
+
+    def group_counts(self, dataset, column, facets=None, ranges=None, year=None):
+        """{value: rows} of one column under the filters."""
+        import polars as pl
+
+        plan, _ = self.query(dataset, [column], facets, ranges, year)
+        key = pl.col(column).cast(pl.String) if self.text_columns(dataset, [column]) else pl.col(column)
+        grouped = plan.filter(pl.col(column).is_not_null()).group_by(key.alias(column)).agg(pl.len()).collect()
+        return dict(zip(grouped[column].to_list(), grouped["len"].to_list()))
+
+    def facet_counts(self, dataset, facets=None, ranges=None, year=None):
+        return grouped_facet_counts(self, dataset, facets, ranges, year)
+
+    def text_columns(self, dataset, columns):
+        import polars as pl
+
+        schema = self.scan(dataset).collect_schema()
+        return [col for col in columns if isinstance(schema[col], (pl.Categorical, pl.Enum))]
+
+    def predicate(self, dataset, facets=None, ranges=None, year=None):
+        """Polars expression of the app's filters, same semantics as query.filter_masks."""
+        import polars as pl
+
+        predicate = pl.lit(True)
+        for key, selected in (facets or {}).items():
+            if selected:
+                column = pl.col(facet_column(dataset, key)).cast(pl.String)
+                predicate &= column.is_in([str(value) for value in selected]).fill_null(False)
+        for col, bounds in (ranges or {}).items():
+            if bounds is not None:
+                low, high = pl.col(f"{col}_min"), pl.col(f"{col}_max")
+                predicate &= ((high >= float(bounds[0])) | high.is_null()) & ((low <= float(bounds[1])) | low.is_null())
+        if year is not None:
+            column = pl.col(YEAR_COLUMN)
+            predicate &= ((column >= float(year[0])) & (column <= float(year[1]))).fill_null(False)
+        return predicate
+
+    def query(self, dataset, columns=None, facets=None, ranges=None, year=None):
+        available = self.columns(dataset)
+        columns = available if columns is None else list(columns)
+        check_columns(available, columns)
+        return self.scan(dataset).filter(self.predicate(dataset, facets, ranges, year)), columns
+
+    def filter(self, dataset, facets=None, ranges=None, year=None, columns=None):
+        with perf.stage("filter"):
+            plan, columns = self.query(dataset, columns, facets, ranges, year)
+            df = plan.select(columns).collect().to_pandas()
+        perf.count("filtered rows", len(df))
+        return df
+
+    def count(self, dataset, facets=None, ranges=None, year=None):
+        import polars as pl
+
+        plan, _ = self.query(dataset, [], facets, ranges, year)
+        return plan.select(pl.len()).collect().item()
+
+    def page(self, dataset, offset=0, limit=None, sort=None, descending=False, columns=None,
+             facets=None, ranges=None, year=None):
+        import polars as pl
+
+        plan, columns = self.query(dataset, columns, facets, ranges, year)
+        if sort:
+            check_columns(self.columns(dataset), [sort])
+            key = pl.col(sort).cast(pl.String) if self.text_columns(dataset, [sort]) else pl.col(sort)
+            # maintain_order keeps dataset order among ties, like the stable pandas sort
+            plan = plan.sort(key, descending=descending, nulls_last=True, maintain_order=True)
+        rows = plan.select(columns).slice(offset, limit).collect().to_pandas()
+        return rows, self.count(dataset, facets, ranges, year)
+
+    def aggregate(self, dataset, by, value, agg="mean", facets=None, ranges=None, year=None):
+        import polars as pl
+
+        check_aggregate(agg)
+        plan, _ = self.query(dataset, [by, value], facets, ranges, year)
+        column = pl.col(value)
+        expression = {
+            "count": column.count(), "mean": column.mean(), "median": column.median(),
+            "min": column.min(), "max": column.max(), "sum": column.sum(),
+        }[agg]
+        key = pl.col(by).cast(pl.String) if self.text_columns(dataset, [by]) else pl.col(by)
+        grouped = (
+            plan.filter(pl.col(by).is_not_null())
+            .group_by(key.alias(by))
+            .agg(expression.alias(agg))
+            .sort(by)
+        )
+        return grouped.collect().to_pandas()
+
+    def stream(self, dataset, facets=None, ranges=None, year=None, columns=None, batch_size=DEFAULT_BATCH_SIZE):
+        import polars as pl
+
+        plan, columns = self.query(dataset, columns, facets, ranges, year)
+        # categoricals stream as strings: each batch has its own dictionary and an
+        # empty head's categorical has a null one, neither of which Arrow can cast
+        text = self.text_columns(dataset, columns)
+        plan = plan.select(columns).with_columns(pl.col(text).cast(pl.String))
+        head = plan.head(0).collect().to_pandas()
+        return head, (batch.to_pandas() for batch in plan.collect_batches(chunk_size=batch_size))
+
+
+BACKENDS = {"pandas": PandasBackend, "duckdb": DuckDBBackend, "polars": PolarsBackend}
+_instances = {}
+_instances_lock = threading.Lock()
+
+def available_backends():
+    """Backends whose optional packages are installed."""
+    return [
+        name for name in BACKENDS
+        if all(importlib.util.find_spec(package) is not None for package in BACKEND_REQUIREMENTS.get(name, ()))
+    ]
+
+def get_backend(name=None):
+    """The shared instance of a backend, by default the one configured by LUNAR_REGOLITH_BACKEND."""
+    name = name or BACKEND
+    if name not in BACKENDS:
+        raise KeyError(f"Unknown backend {name!r}, expected one of: {', '.join(BACKENDS)}")
+    with _instances_lock:
+        if name not in _instances:
+            _instances[name] = BACKENDS[name]()
+        return _instances[name]
@@ -0,0 +1,433 @@
+"""Benchmarks of ingestion, derivation, filtering and figure building, with a history.
+
+    python -m lunar_regolith.bench --rows 1e5               synthetic data, generated once
+    python -m lunar_regolith.bench --rows 1e6 --select filter
+    python -m lunar_regolith.bench                          the data of LUNAR_REGOLITH_DATA_DIR
+    python -m lunar_regolith.bench --list
+
+With --rows the datasets come from synthetic.py (generated into BENCH_DATA_DIR on the
+first run for a row count and seed, reused afterwards) and the benchmarks run in a
+child process reading them. Every benchmark times one uncached call: the CSV parse,
+each build step of data.BUILD_STEPS and prepared dataset with only its own cache
+cleared, range extraction and categorization, every filter path of query.py on the
+regolith, simulant and combined datasets, the figure builders of figures.py, and the
+depth profiles of the Pages/ mission scripts (rendered through AppTest, so their times
+include its script run).
+
+Each run is appended to BENCH_HISTORY (JSON lines) and compared with the last run on
+the same machine and row counts: a benchmark whose fastest call (the statistic least
+disturbed by other load on the machine) grew by more than the threshold, and by at
+least MIN_DELTA seconds, is reported as a regression and the command exits with 1.
+"""
+import argparse
+import datetime
+import gc
+import glob
+import json
+import logging
+import os
+import platform
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BENCH_DATA_DIR = os.environ.get("LUNAR_REGOLITH_BENCH_DATA_DIR", os.path.join(tempfile.gettempdir(), "lunar_regolith_bench"))
+BENCH_HISTORY = os.environ.get("LUNAR_REGOLITH_BENCH_HISTORY", os.path.join(REPO_DIR, ".benchmarks", "history.jsonl"))
+THRESHOLD = 0.2
+MIN_DELTA = 0.001
+MIN_ROUNDS = 5
+MIN_TIME = 0.5
+
+# name -> (group, setup); setup() prepares the inputs and returns the call to time
+BENCHMARKS = {}
+
+def benchmark(name, group):
+    def register(setup):
+        BENCHMARKS[name] = (group, setup)
+        return setup
+    return register
+
+
+# --------------------------- Timing ---------------------------
+def measure(func, min_rounds=MIN_ROUNDS, min_time=MIN_TIME):
+    """Seconds per call over at least min_rounds calls and min_time seconds, after one warm-up call."""
+    func()
+    times = []
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        while len(times) < min_rounds or sum(times) < min_time:
+            start = time.perf_counter()
+            func()
+            times.append(time.perf_counter() - start)
+            if len(times) >= 1000:
+                break
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+    return {
+        "min": min(times),
+        "median": statistics.median(times),
+        "mean": statistics.fmean(times),
+        "stdev": statistics.stdev(times) if len(times) > 1 else 0.0,
+        "rounds": len(times),
+    }
+
+
+# --------------------------- Ingestion & derivation ---------------------------
+def _register_loading():
+    from . import data, schema
+
+    for table in schema.TABLES:
+        @benchmark(f"read {table} csv", "ingestion")
+        def read_csv(table=table):
+            path = data.data_path(schema.TABLES[table]["file"])
+            return lambda: data.read_table_csv(path, table)
+
+    def uncached(func, version):
+        def call():
+            func.cache_clear()
+            func(version)
+        return call
+
+    for step, (func, _, files) in data.BUILD_STEPS.items():
+        if hasattr(func, "cache_clear"):
+            @benchmark(f"load {step}", "ingestion")
+            def load_step(func=func, files=files):
+                data.load_datasets()
+                return uncached(func, data.files_version(files))
+
+    for name in data.DATASETS:
+        @benchmark(f"prepare {name}", "derivation")
+        def prepare(name=name):
+            data.load_datasets()
+            return uncached(data.dataset_spec(name)["prepare"], data.dataset_version(name))
+
+    @benchmark("extract_range per cell", "derivation")
+    def extract_range_cells():
+        column = data.regolith_view(data.files_version(data.MODEL_FILES))["Cohesion (kPa)"]
+        return lambda: column.map(data.extract_range)
+
+    @benchmark("add_range_columns regolith", "derivation")
+    def add_range_columns():
+        view = data.regolith_view(data.files_version(data.MODEL_FILES))
+        return lambda: data.add_range_columns(view.copy(), data.REGOLITH_RANGE_COLUMNS)
+
+    @benchmark("categorize_mission", "derivation")
+    def categorize_mission():
+        missions = data.regolith_view(data.files_version(data.MODEL_FILES))["Mission"]
+        return lambda: missions.apply(data.categorize_mission)
+
+    @benchmark("categorize_soil", "derivation")
+    def categorize_soil():
+        soils = data.simulant_view(data.files_version(data.MODEL_FILES))["Type of simulant"]
+        return lambda: soils.apply(data.categorize_soil)
+
+    @benchmark("parse_location", "derivation")
+    def parse_location():
+        locations = data.load_plot_data(data.dataset_version("regolith_plots"))["Location"]
+        return lambda: locations.apply(data.parse_location)
+
+    for name in ("regolith", "all"):
+        @benchmark(f"derived rows {name}", "derivation")
+        def derive(name=name):
+            df = data.dataset_spec(name)["load"](data.files_version(data.MODEL_FILES))
+            return lambda: data.derived_rows(name, df)
+
+
+# --------------------------- Filters ---------------------------
+def filter_cases(name):
+    """query.py keyword arguments of each filter path of a dataset: one facet option,
+    two options, the middle half of an interval, a year range and all of them at once."""
+    from . import schema
+    from .data import column_stats, dataset_spec, facet_index
+
+    spec, stats, index = dataset_spec(name), column_stats(name), facet_index(name)
+    key, column = next(iter(spec["facets"].items()))
+    options = list(index[column]["options"])
+    cases = {
+        "facet": {"facets": {key: options[:1]}},
+        "facets": {"facets": {key: options[:2]}},
+    }
+    for col in spec["ranges"]:
+        bounds = schema.slider_range(stats, col)
+        if bounds is not None:
+            low, high = bounds
+            cases["range"] = {"ranges": {col: (low + (high - low) / 4, high - (high - low) / 4)}}
+            break
+    year = schema.slider_range(stats, "Year of publication")
+    if year is not None:
+        cases["year"] = {"year": (year[0] + (year[1] - year[0]) // 2, year[1])}
+    cases["combined"] = {arg: value for case in cases.values() for arg, value in case.items()}
+    return cases
+
+def _register_filters():
+    from .data import dataset_spec, load_dataset
+    from .query import facet_counts, filter_dataset, page_dataset, query
+
+    for name in ("regolith", "simulants", "all"):
+        for case in ("facet", "facets", "range", "year", "combined"):
+            @benchmark(f"filter {name} {case}", "filter")
+            def filter_path(name=name, case=case):
+                kwargs = filter_cases(name)[case]
+                return lambda: filter_dataset(name, **kwargs)
+
+        @benchmark(f"filter {name} columns", "filter")
+        def filter_columns(name=name):
+            kwargs = filter_cases(name)["combined"]
+            columns = list(load_dataset(name).columns[:4])
+            return lambda: filter_dataset(name, columns=columns, **kwargs)
+
+        @benchmark(f"page {name} sorted", "filter")
+        def page_sorted(name=name):
+            kwargs = filter_cases(name)["combined"]
+            sort = next(iter(dataset_spec(name)["facets"].values()))
+            return lambda: page_dataset(name, page=1, sort=sort, descending=True, **kwargs)
+
+        @benchmark(f"facet counts {name}", "filter")
+        def counts(name=name):
+            kwargs = filter_cases(name)["combined"]
+            return lambda: facet_counts(name, **kwargs)
+
+        @benchmark(f"query {name} arrow", "filter")
+        def arrow(name=name):
+            kwargs = filter_cases(name)["combined"]
+            return lambda: query(name, as_arrow=True, **kwargs)
+
+    @benchmark("column stats all", "filter")
+    def stats():
+        from .data import _column_stats, dataset_version
+
+        version = dataset_version("all")
+        return lambda: (_column_stats.cache_clear(), _column_stats("all", version))
+
+
+# --------------------------- Figures ---------------------------
+def _register_figures():
+    from . import figures, warmup
+    from .data import load_dataset
+    from .query import filter_dataset
+
+    for compare_simulants in (False, True):
+        @benchmark(f"figure mission scatter{' with simulants' if compare_simulants else ''}", "figure")
+        def mission_scatter(compare_simulants=compare_simulants):
+            x_axis, y_axis = "Bulk density (g/cm^3)", "Angle of internal friction (degree)"
+            plot_df = load_dataset("regolith_plots").dropna(subset=[x_axis, y_axis])
+            simulants = load_dataset("simulant_plots")
+            return lambda: figures.build_mission_scatter(plot_df, simulants, x_axis, y_axis, compare_simulants)
+
+    @benchmark("figure simulant scatter", "figure")
+    def simulant_scatter():
+        x_axis, y_axis = warmup.DEFAULT_SIMULANT_AXES
+        plot_df = filter_dataset("simulants", **warmup.default_filters("simulants", bounds=False)).dropna(subset=[x_axis, y_axis])
+        return lambda: figures.build_simulant_scatter(plot_df, x_axis, y_axis)
+
+    @benchmark("figure moon map", "figure")
+    def moon_map():
+        plot_df, uri = load_dataset("regolith_plots"), figures.moon_map_uri()
+        return lambda: figures.build_moon_map(plot_df, uri)
+
+    @benchmark("moon map image encoding", "figure")
+    def moon_map_uri():
+        return figures.moon_map_uri
+
+
+# --------------------------- Mission pages ---------------------------
+PAGE_SCRIPT = """
+import importlib.util
+
+spec = importlib.util.spec_from_file_location("mission_module", {path!r})
+mission_module = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(mission_module)
+mission_module.show_mission()
+"""
+
+def _register_pages():
+    for path in sorted(glob.glob(os.path.join(REPO_DIR, "Pages", "*.py"))):
+        page = os.path.splitext(os.path.basename(path))[0].replace("_", " ")
+
+        @benchmark(f"page {page}", "page")
+        def render(path=path):
+            from streamlit.testing.v1 import AppTest
+
+            def run():
+                at = AppTest.from_string(PAGE_SCRIPT.format(path=path), default_timeout=60).run()
+                if at.exception:
+                    raise RuntimeError(at.exception[0].value)
+
+            # the pages log deprecation warnings on every run, through loggers created by the first one
+            run()
+            for name, logger in logging.root.manager.loggerDict.items():
+                if name.startswith("streamlit") and isinstance(logger, logging.Logger):
+                    logger.setLevel(logging.ERROR)
+            return run
+
+def register_all():
+    if not BENCHMARKS:
+        _register_loading()
+        _register_filters()
+        _register_figures()
+        _register_pages()
+    return BENCHMARKS
+
+
+# --------------------------- Runs & history ---------------------------
+def run(select=None, min_rounds=MIN_ROUNDS, min_time=MIN_TIME, progress=None):
+    """{benchmark: timings} of the benchmarks whose name matches `select` (a regex)."""
+    results = {}
+    for name, (group, setup) in register_all().items():
+        if select and not re.search(select, name):
+            continue
+        try:
+            results[name] = {"group": group, **measure(setup(), min_rounds, min_time)}
+        except Exception as e:  # a broken benchmark is reported, the others still run
+            results[name] = {"group": group, "error": f"{type(e).__name__}: {e}"}
+        if progress:
+            progress(name, results[name])
+    return results
+
+def git_commit():
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=REPO_DIR, capture_output=True, text=True, timeout=10,
+        )
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return out.stdout.strip() or None
+
+def run_record(results):
+    from . import schema
+    from .data import DATA_DIR, load_table
+
+    return {
+        "time": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        "commit": git_commit(),
+        "machine": platform.node(),
+        "python": platform.python_version(),
+        "data_dir": DATA_DIR,
+        "rows": {table: len(load_table(table)) for table in schema.TABLES},
+        "results": results,
+    }
+
+def read_history(path=BENCH_HISTORY):
+    try:
+        with open(path, encoding="utf-8") as f:
+            return [json.loads(line) for line in f if line.strip()]
+    except FileNotFoundError:
+        return []
+
+def append_history(record, path=BENCH_HISTORY):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(json.dumps(record) + "\n")
+
+def baseline(history, record):
+    """Last recorded run comparable with `record` (same machine and row counts)."""
+    for previous in reversed(history):
+        if previous.get("machine") == record["machine"] and previous.get("rows") == record["rows"]:
+            return previous
+    return None
+
+def regressions(record, previous, threshold=THRESHOLD, min_delta=MIN_DELTA):
+    """[(benchmark, previous min, min)] of the benchmarks slower than the baseline."""
+    slower = []
+    for name, result in record["results"].items():
+        before = previous["results"].get(name, {}).get("min")
+        now = result.get("min")
+        if before is None or now is None:
+            continue
+        if now > before * (1 + threshold) and now - before >= min_delta:
+            slower.append((name, before, now))
+    return slower
+
+
+# --------------------------- Command line ---------------------------
+def synthetic_dir(rows, simulant_rows, seed):
+    """Synthetic data directory for a row count and seed, generated on first use."""
+    from . import synthetic
+
+    simulant_rows = rows if simulant_rows is None else simulant_rows
+    path = os.path.join(BENCH_DATA_DIR, f"{rows}-{simulant_rows}-seed{seed}")
+    done = os.path.join(path, ".complete")
+    # directories generated before the plot values file was part of the data lack it
+    if not os.path.exists(done) or not os.path.exists(os.path.join(path, synthetic.PLOT_VALUES_FILE)):
+        print(f"generating {rows} regolith and {simulant_rows} simulant rows into {path}", file=sys.stderr)
+        synthetic.generate(path, rows, simulant_rows, seed)
+        open(done, "w").close()
+    return path
+
+def run_in(data_dir, argv, module="lunar_regolith.bench"):
+    """Rerun a command line module in a child process reading data_dir (the data paths are read at import)."""
+    env = dict(
+        os.environ,
+        LUNAR_REGOLITH_DATA_DIR=data_dir,
+        LUNAR_REGOLITH_DELTA_DIR=os.path.join(data_dir, "deltas"),
+        LUNAR_REGOLITH_DISK_CACHE="0",
+        LUNAR_REGOLITH_PERF="0",
+    )
+    env.pop("LUNAR_REGOLITH_SHARED_DIR", None)
+    return subprocess.call([sys.executable, "-m", module, *argv, "--data-dir", data_dir], env=env)
+
+def _ms(seconds):
+    return f"{seconds * 1000:10.3f}"
+
+def main(argv=None):
+    from . import synthetic
+
+    argv = sys.argv[1:] if argv is None else list(argv)
+    parser = argparse.ArgumentParser(
+        prog="python -m lunar_regolith.bench",
+        description="Time ingestion, derivation, filters, figures and mission pages and compare with earlier runs.",
+    )
+    parser.add_argument("--rows", type=synthetic.parse_rows, help="Benchmark synthetic data with this many regolith rows")
+    parser.add_argument("--simulant-rows", type=synthetic.parse_rows, help="Synthetic simulant rows (default: as many as --rows)")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the synthetic data")
+    parser.add_argument("--data-dir", help=argparse.SUPPRESS)
+    parser.add_argument("--select", help="Only the benchmarks whose name matches this regular expression")
+    parser.add_argument("--min-rounds", type=int, default=MIN_ROUNDS, help=f"Calls per benchmark at least (default: {MIN_ROUNDS})")
+    parser.add_argument("--min-time", type=float, default=MIN_TIME, help=f"Seconds per benchmark at least (default: {MIN_TIME})")
+    parser.add_argument("--threshold", type=float, default=THRESHOLD, help=f"Slowdown of the fastest call reported as a regression (default: {THRESHOLD})")
+    parser.add_argument("--history", default=BENCH_HISTORY, help=f"JSON lines file of earlier runs (default: {BENCH_HISTORY})")
+    parser.add_argument("--no-save", action="store_true", help="Compare with the history without appending this run")
+    parser.add_argument("--list", action="store_true", help="List the benchmarks and exit")
+    args = parser.parse_args(argv)
+
+    if args.rows and not args.data_dir:
+        return run_in(synthetic_dir(args.rows, args.simulant_rows, args.seed), argv)
+
+    if args.list:
+        for name, (group, _) in register_all().items():
+            print(f"{group:12s} {name}")
+        return 0
+
+    def progress(name, result):
+        if "error" in result:
+            print(f"{'FAILED':>10s}     {name}: {result['error']}")
+        else:
+            print(f"{_ms(result['median'])} ms  {name}  ({result['rounds']} rounds, min {result['min'] * 1000:.3f} ms)")
+
+    print(f"{'median':>10s}")
+    results = run(args.select, args.min_rounds, args.min_time, progress)
+    record = run_record(results)
+    history = read_history(args.history)
+    previous = baseline(history, record)
+    slower = regressions(record, previous, args.threshold) if previous else []
+    if previous is None:
+        print(f"\nno earlier run on this machine with {record['rows']} rows to compare with")
+    else:
+        print(f"\ncompared with {previous.get('commit') or 'unknown commit'} ({previous['time']})")
+        for name, before, now in slower:
+            print(f"REGRESSION {name}: min {_ms(before).strip()} ms -> {_ms(now).strip()} ms (+{(now / before - 1) * 100:.0f}%)")
+        if not slower:
+            print(f"no benchmark slower by more than {args.threshold:.0%}")
+    if not args.no_save:
+        append_history(record, args.history)
+    failed = any("error" in result for result in results.values())
+    return 1 if slower or failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,163 @@
+"""Combined ("All Data") dataset derived from the regolith and simulant tables.
+
+ALL_SCHEMA declares, for every column of the combined table, where each source
+table takes it from: a source column name, a constant, a lookup through a mapping
+(on the whole value or on its first word), or None for a missing value.
+
+Derivation is incremental: rows are keyed by a hash of their source values, and
+only rows whose hash was not seen in the previous build are derived again.
+"""
+import functools
+import threading
+
+import numpy as np
+import pandas as pd
+
+ALL_COLUMNS = [
+    "Mission/Simulant", "Developer", "Agency", "Moon Location/Country", "Year", "Terrain type",
+    "Type of mission", "Test", "Test location", "Bulk density (g/cm^3)",
+    "Angle of internal friction (degree)", "Cohesion (kPa)", "Static bearing capacity (kPa)",
+    "Source", "Year of publication", "DOI / URL",
+]
+
+MISSION_AGENCIES = {
+    "Surveyor": "NASA",
+    "Apollo": "NASA",
+    "Luna": "Roscosmos",
+    "Chang'e": "CNSA",
+    "Chandrayaan": "ISRO",
+}
+AGENCY_COUNTRIES = {
+    "NASA": "USA",
+    "CNSA": "China",
+    "ISRO": "India",
+    "JAXA": "Japan",
+    "ESA": "Europe",
+    "KASA": "Korea",
+    "GISTDA": "Thailand",
+}
+
+
+# Derived text columns use the "str" dtype, which keeps missing values as NaN on
+# pandas >= 3 (requirements.txt); older pandas would turn them into the text "nan".
+class Const:
+    def __init__(self, value):
+        self.value = value
+
+    def derive(self, df):
+        return pd.Series(self.value, index=df.index, dtype="str")
+
+class Lookup:
+    """Value of `column` mapped through `mapping`, on the first word only with prefix=True."""
+
+    def __init__(self, column, mapping, prefix=False):
+        self.column, self.mapping, self.prefix = column, mapping, prefix
+
+    def derive(self, df):
+        keys = df[self.column].str.split().str[0] if self.prefix else df[self.column]
+        return keys.map(self.mapping).astype("str")
+
+# combined column -> rule, per source table
+ALL_SCHEMA = {
+    "regolith": {
+        "Mission/Simulant": "Mission",
+        "Developer": None,
+        "Agency": Lookup("Mission", MISSION_AGENCIES, prefix=True),
+        "Moon Location/Country": "Location",
+        "Year": "Year",
+        "Terrain type": "Terrain",
+        "Type of mission": "Type of mission",
+        "Test": "Test",
+        "Test location": "Test location",
+        "Bulk density (g/cm^3)": "Bulk density (g/cm^3)",
+        "Angle of internal friction (degree)": "Angle of internal friction (degree)",
+        "Cohesion (kPa)": "Cohesion (kPa)",
+        "Static bearing capacity (kPa)": "Static bearing capacity (kPa)",
+        "Source": "Source",
+        "Year of publication": "Year of publication",
+        "DOI / URL": "DOI / URL",
+    },
+    "simulants": {
+        "Mission/Simulant": "Simulant",
+        "Developer": "Developer",
+        "Agency": "Agency",
+        "Moon Location/Country": Lookup("Agency", AGENCY_COUNTRIES),
+        "Year": "Year",
+        "Terrain type": "Type of simulant",
+        "Type of mission": None,
+        "Test": "Test",
+        "Test location": Const("On Earth"),
+        "Bulk density (g/cm^3)": "Bulk density (g/cm^3)",
+        "Angle of internal friction (degree)": "Angle of internal friction (degree)",
+        "Cohesion (kPa)": "Cohesion (kPa)",
+        "Static bearing capacity (kPa)": None,
+        "Source": "Source",
+        "Year of publication": "Year of publication",
+        "DOI / URL": "DOI / URL",
+    },
+}
+
+
+def derive_rows(df, mapping):
+    """Combined-table rows of a source frame through one source's column mapping."""
+    out = {}
+    for target in ALL_COLUMNS:
+        rule = mapping[target]
+        if rule is None:
+            out[target] = pd.Series(np.nan, index=df.index, dtype="str")
+        elif isinstance(rule, str):
+            out[target] = df[rule]
+        else:
+            out[target] = rule.derive(df)
+    return pd.DataFrame(out, index=df.index)
+
+def source_columns(mapping):
+    columns = []
+    for rule in mapping.values():
+        column = rule if isinstance(rule, str) else getattr(rule, "column", None)
+        if column is not None and column not in columns:
+            columns.append(column)
+    return columns
+
+
+class IncrementalDerivation:
+    """Derived rows of one source table, reused across builds by source-row hash.
+
+    derive(df) must be row-local: each output row depends only on the same row of
+    df[columns], so rows whose hash was seen in the previous build are taken from it.
+    """
+
+    def __init__(self, columns, derive):
+        self.columns, self.derive = list(columns), derive
+        self._hashes = np.empty(0, dtype=np.uint64)
+        self._rows = derive(pd.DataFrame(columns=self.columns, dtype="str"))
+        self._lock = threading.Lock()
+        self.last_derived = 0
+
+    def __call__(self, df):
+        hashes = pd.util.hash_pandas_object(df[self.columns], index=False).to_numpy()
+        with self._lock:
+            known = pd.Series(np.arange(len(self._hashes)), index=self._hashes)
+            known = known[~known.index.duplicated()]
+            previous = known.reindex(hashes).to_numpy()
+            changed = np.isnan(previous)
+            self.last_derived = int(changed.sum())
+            if not changed.any() and len(hashes) == len(self._hashes) and (hashes == self._hashes).all():
+                return self._rows
+            new_rows = self.derive(df[changed].reset_index(drop=True))
+            # reused rows come from the previous build, new rows from new_rows, in source order
+            take = np.where(changed, len(self._rows) + np.cumsum(changed) - 1, np.nan_to_num(previous)).astype(np.intp)
+            rows = pd.concat([self._rows, new_rows], ignore_index=True).take(take).reset_index(drop=True)
+            self._hashes, self._rows = hashes, rows
+            return rows
+
+_derivations = {
+    source: IncrementalDerivation(source_columns(mapping), functools.partial(derive_rows, mapping=mapping))
+    for source, mapping in ALL_SCHEMA.items()
+}
+
+def build_all(regolith, simulants):
+    """The combined table, regolith rows first, then simulant rows."""
+    parts = [_derivations["regolith"](regolith), _derivations["simulants"](simulants)]
+    return pd.concat(parts, ignore_index=True)
+
@@ -0,0 +1,118 @@
+"""Command-line batch query and export.
+
+    python -m lunar_regolith regolith --mission-group Apollo --range "Cohesion (kPa)=0.5:3" -o apollo.parquet
+    python -m lunar_regolith simulants --agency NASA --format jsonl > nasa.jsonl
+
+Filters follow the app: repeated options are OR-ed within one facet, different
+facets and ranges are AND-ed, and interval ranges keep rows without a value.
+"""
+import argparse
+import os
+import sys
+
+from .backends import BACKEND, available_backends, get_backend
+from .data import DATASETS, dataset_spec
+from .export import DEFAULT_CHUNK_SIZE, TEXT_FORMATS, WRITERS, format_from_path, write_chunks
+from .query import parse_bounds, parse_range
+
+# command-line option -> facet filter name of the dataset registry
+FACET_OPTIONS = {
+    "mission_group": "Mission group (Apollo, Luna, Surveyor, Chang'e, Chandrayaan, Other/Simulant)",
+    "terrain": "Terrain type (Mare, Highland)",
+    "soil_group": "Soil group of a simulant (Mare, Highland, Other)",
+    "test": "Test type",
+    "mission_type": "Type of mission",
+    "agency": "Agency",
+    "developer": "Simulant developer",
+}
+
+
+def _argument_type(parse):
+    def convert(text):
+        try:
+            return parse(text)
+        except ValueError as e:
+            raise argparse.ArgumentTypeError(str(e))
+    convert.__name__ = parse.__name__
+    return convert
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="python -m lunar_regolith",
+        description="Filter a Lunar Regolith Database dataset and export the rows.",
+    )
+    parser.add_argument("dataset", choices=list(DATASETS), help="Dataset to query")
+    filters = parser.add_argument_group("filters")
+    for name, help_text in FACET_OPTIONS.items():
+        filters.add_argument(
+            f"--{name.replace('_', '-')}", dest=name, action="append", metavar="VALUE",
+            help=f"{help_text}, repeat to select several",
+        )
+    filters.add_argument(
+        "--range", dest="ranges", action="append", type=_argument_type(parse_range), metavar="COLUMN=MIN:MAX",
+        help='Interval filter on a property, e.g. "Cohesion (kPa)=0.5:3"; either bound may be left empty',
+    )
+    filters.add_argument("--year", type=_argument_type(parse_bounds), metavar="MIN:MAX", help="Year of publication range")
+    output = parser.add_argument_group("output")
+    output.add_argument("--columns", help="Comma separated list of columns to export (default: all)")
+    output.add_argument("-o", "--output", default="-", help="Output file, '-' for stdout (default)")
+    output.add_argument("--format", choices=list(WRITERS), help="Output format (default: from the file extension, else csv)")
+    output.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="Rows serialized per chunk")
+    output.add_argument(
+        "--backend", choices=available_backends(), default=BACKEND,
+        help=f"Query backend, rows are streamed from it chunk by chunk (default: {BACKEND})",
+    )
+    return parser
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    spec = dataset_spec(args.dataset)
+
+    facets = {}
+    for name in FACET_OPTIONS:
+        selected = getattr(args, name)
+        if selected:
+            if name not in spec["facets"]:
+                parser.error(f"--{name.replace('_', '-')} is not available for {args.dataset!r}, "
+                             f"use one of: {', '.join('--' + f.replace('_', '-') for f in spec['facets'])}")
+            facets[name] = selected
+    ranges = dict(args.ranges or [])
+    for column in ranges:
+        if column not in spec["ranges"]:
+            parser.error(f"no interval column {column!r} in {args.dataset!r}, use one of: {', '.join(spec['ranges'])}")
+    columns = [col.strip() for col in args.columns.split(",")] if args.columns else None
+
+    try:
+        head, chunks = get_backend(args.backend).stream(
+            args.dataset, facets=facets, ranges=ranges, year=args.year, columns=columns, batch_size=args.chunk_size,
+        )
+    except KeyError as e:
+        parser.error(e.args[0])
+    rows = 0
+
+    def counted(chunks):
+        nonlocal rows
+        for chunk in chunks:
+            rows += len(chunk)
+            yield chunk
+
+    fmt = args.format or format_from_path(args.output)
+    if args.output == "-":
+        stream = sys.stdout if fmt in TEXT_FORMATS else sys.stdout.buffer
+        try:
+            write_chunks(head, counted(chunks), fmt, stream)
+            stream.flush()
+        except BrokenPipeError:
+            # reader went away (e.g. piped into head), stop quietly
+            os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+            return 0
+    else:
+        mode = "w" if fmt in TEXT_FORMATS else "wb"
+        with open(args.output, mode, newline="" if mode == "w" else None, encoding="utf-8" if mode == "w" else None) as stream:
+            write_chunks(head, counted(chunks), fmt, stream)
+    print(f"{rows} rows written", file=sys.stderr)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,635 @@
+"""Dataset loading, derived columns and per-version caches.
+
+Nothing in here imports Streamlit: the app, notebooks and batch jobs all go
+through the same functions and therefore share the same in-process caches.
+Cached frames are shared between callers, treat them as read-only.
+"""
+import contextvars
+import functools
+import os
+import re
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import numpy as np
+import pandas as pd
+
+from . import build, model, perf, rules, schema
+
+# --------------------------- Files & Versions ---------------------------
+DATA_DIR = os.environ.get(
+    "LUNAR_REGOLITH_DATA_DIR",
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+)
+REGOLITH_FILE = schema.TABLES["regolith"]["file"]
+SIMULANT_FILE = schema.TABLES["simulants"]["file"]
+
+def data_path(filename):
+    return os.path.join(DATA_DIR, filename)
+
+def file_version(filename):
+    """Cheap version key for a data file, changes whenever the file is rewritten."""
+    stat = os.stat(data_path(filename))
+    return f"{stat.st_mtime_ns}-{stat.st_size}"
+
+# New measurements are appended as delta files next to the compacted CSV
+# (deltas/<table file stem>/<time_ns>-<pid>.csv, same header as the CSV) and merged
+# with it at load time until ingest.compact() folds them in. Delta files are never
+# rewritten, so their names are enough to version them.
+DELTA_DIR = os.environ.get("LUNAR_REGOLITH_DELTA_DIR", data_path("deltas"))
+
+def delta_dir(filename):
+    return os.path.join(DELTA_DIR, os.path.splitext(filename)[0])
+
+def delta_files(filename):
+    """Paths of the pending delta files of a table file, oldest first."""
+    try:
+        names = os.listdir(delta_dir(filename))
+    except FileNotFoundError:
+        return []
+    return [os.path.join(delta_dir(filename), name) for name in sorted(names) if name.endswith(".csv")]
+
+def source_version(filename):
+    """Version of a source table: its CSV plus the pending delta files."""
+    return "|".join([file_version(filename), *(os.path.basename(path) for path in delta_files(filename))])
+
+
+# --------------------------- Loading ---------------------------
+# Every cached function takes the dataset version as its first argument, so editing
+# a CSV only invalidates the entries built from that file.
+
+def read_table_csv(path, table):
+    df = pd.read_csv(
+    path,
+    dtype=str,
+    header=0,
+    skip_blank_lines=False,
+    )
+    df.columns = schema.table_columns(table)
+    # every column is read as text ("str" on pandas 3, not "object"), strip them all
+    df = df.apply(lambda col: col.str.strip())
+    return df
+
+# The compacted CSV is parsed once per file version and each delta file once, so
+# appending measurements only costs the parse of the new delta.
+@functools.lru_cache(maxsize=256)
+def _read_table_file(version, path, table):
+    return read_table_csv(path, table)
+
+def load_table(table):
+    """Rows of a source table: the compacted CSV followed by its pending delta files."""
+    filename = schema.TABLES[table]["file"]
+    base = _read_table_file(file_version(filename), data_path(filename), table)
+    deltas = [_read_table_file(os.path.basename(path), path, table) for path in delta_files(filename)]
+    if not deltas:
+        return base
+    return pd.concat([base, *deltas], ignore_index=True)
+
+#Lunar Data Loading
+# (regolith and simulant frames are not cached themselves, only the normalized model built from them)
+def load_database_data(version):
+    return load_table("regolith")
+
+#Simulants Data Loading
+def load_Simulants_data(version):
+    return load_table("simulants")
+
+
+# --------------------------- Normalized model ---------------------------
+# Missions, simulants and sources are stored once in dimension tables and referenced
+# by integer keys from the measurement fact table (see model.py). The regolith and
+# simulant frames the app works on are cached joins over it. Both files feed the
+# shared sources dimension, so the model is versioned by both. The plot tables read
+# one view each plus the preferred values of Dataset_Plot_Values.csv
+# (rules.read_overrides) and are versioned by those two files only, so editing a
+# preferred value rebuilds the plot tables and nothing else.
+PLOT_VALUES_FILE = "Dataset_Plot_Values.csv"
+MODEL_FILES = (REGOLITH_FILE, SIMULANT_FILE)
+REGOLITH_PLOT_FILES = (REGOLITH_FILE, PLOT_VALUES_FILE)
+SIMULANT_PLOT_FILES = (SIMULANT_FILE, PLOT_VALUES_FILE)
+
+def files_version(filenames):
+    return "+".join(source_version(filename) for filename in filenames)
+
+@functools.lru_cache(maxsize=2)
+def _star_schema(version):
+    return model.build_model(load_database_data(version), load_Simulants_data(version))
+
+def star_schema():
+    """Dimension and fact tables {missions, simulants, sources, measurements}, read-only."""
+    return _star_schema(files_version(MODEL_FILES))
+
+@functools.lru_cache(maxsize=2)
+def regolith_view(version):
+    return model.regolith_view(_star_schema(version))
+
+@functools.lru_cache(maxsize=2)
+def simulant_view(version):
+    return model.simulant_view(_star_schema(version))
+
+
+# Combined table of the All Data section, derived from the two source tables through
+# the declared column mapping of build.py (only new or changed rows are re-derived)
+@functools.lru_cache(maxsize=2)
+def load_all_data(version):
+    return build.build_all(regolith_view(version), simulant_view(version))
+
+
+# Numerical data for plotting: one representative value per interval cell of the text
+# tables, chosen by the rule sets of rules.py (max / min / midpoint / preferred value).
+# The version is that of the table file and PLOT_VALUES_FILE, the view comes from the
+# current model (a view only holds the rows of its own table file).
+@functools.lru_cache(maxsize=2)
+def plot_overrides(version):
+    return rules.read_overrides(data_path(PLOT_VALUES_FILE))
+
+@functools.lru_cache(maxsize=2)
+def load_plot_data(version):
+    return rules.plot_table(
+        regolith_view(files_version(MODEL_FILES)), model.REGOLITH_PROPERTIES,
+        rules.with_overrides(rules.REGOLITH_PLOT_RULES, plot_overrides(file_version(PLOT_VALUES_FILE))),
+        numeric=["Year", "Year of publication"],
+    )
+
+@functools.lru_cache(maxsize=2)
+def load_Simulant_plot_data(version):
+    return rules.plot_table(
+        simulant_view(files_version(MODEL_FILES)), model.SIMULANT_PROPERTIES,
+        rules.with_overrides(rules.SIMULANT_PLOT_RULES, plot_overrides(file_version(PLOT_VALUES_FILE))),
+        numeric=["Year", "Year of publication"],
+    )
+
+
+# --------------------------- Derived columns ---------------------------
+# Columns that may contain ranges such as "30 - 40"
+REGOLITH_RANGE_COLUMNS = schema.interval_columns("regolith")
+SIMULANT_RANGE_COLUMNS = schema.interval_columns("simulants")
+RANGE_PATTERN = r"[-+]?\d*\.?\d+"
+
+# Mission categorization function
+def categorize_mission(mission_name, other="Other"):
+    """Groups a mission name, names matching no known program fall into `other`."""
+    if pd.isna(mission_name):
+        return "Other"
+    name = mission_name.lower()
+    if "apollo" in name:
+        return "Apollo"
+    elif "luna" in name:
+        return "Luna"
+    elif "surveyor" in name:
+        return "Surveyor"
+    elif "chang'e" in name or "change" in name:
+        return "Chang'e"
+    elif "chandrayaan" in name: 
+        return "Chandrayaan"
+    else:
+        return other
+
+# Soil categorization function
+def categorize_soil(soil_name):
+    if pd.isna(soil_name):
+        return "Other"
+    name = soil_name.lower()
+    if "mare" in name:
+        return "Mare"
+    elif "highland" in name:
+        return "Highland"
+    else:
+        return "Other"
+
+def extract_range(value):
+    """Extracts min and max numeric values from strings"""
+    if pd.isna(value):
+        return (np.nan, np.nan)
+    if isinstance(value, (int, float)):
+        return (float(value), float(value))
+    match = re.findall(RANGE_PATTERN, str(value))
+    if len(match) == 0:
+        return (np.nan, np.nan)
+    elif len(match) == 1:
+        val = float(match[0])
+        return (val, val)
+    else:
+        return (float(match[0]), float(match[-1]))  # take first and last
+
+def interval_tokens(df, range_columns):
+    """First and last number of each interval cell, as text in {col}_min / {col}_max."""
+    out = {}
+    for col in range_columns:
+        matches = df[col].astype(object).str.findall(RANGE_PATTERN)
+        out[f"{col}_min"], out[f"{col}_max"] = matches.str[0], matches.str[-1]
+    return pd.DataFrame(out, index=df.index)
+
+@perf.timed("derive ranges")
+def add_range_columns(df, range_columns, with_avg=True, tokens=None):
+    """Adds the _min/_max(/_avg) columns, same results as extract_range applied per cell.
+
+    tokens, when given, holds the interval_tokens of the text columns already.
+    """
+    for col in range_columns:
+        if col not in df.columns:
+            continue
+        if pd.api.types.is_numeric_dtype(df[col]):
+            df[f"{col}_min"] = df[col].astype(float)
+            df[f"{col}_max"] = df[col].astype(float)
+        else:
+            col_tokens = interval_tokens(df, [col]) if tokens is None else tokens
+            df[f"{col}_min"] = pd.to_numeric(col_tokens[f"{col}_min"].set_axis(df.index))
+            df[f"{col}_max"] = pd.to_numeric(col_tokens[f"{col}_max"].set_axis(df.index))
+        if with_avg:
+            df[f"{col}_avg"] = df[[f"{col}_min", f"{col}_max"]].mean(axis=1)
+    return df
+
+def coerce_numeric(df, columns):
+    for col in columns:
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors="coerce")
+    return df
+
+def parse_location(loc_str):
+    if pd.isna(loc_str):
+        return None, None
+    # Match something like: 3.01239S 23.42157W
+    match = re.match(r"([0-9.+-]+)([NS])\s+([0-9.+-]+)([EW])", loc_str.strip())
+    if not match:
+        return None, None
+    lat_val, lat_dir, lon_val, lon_dir = match.groups()
+    lat = float(lat_val) * (1 if lat_dir.upper() == "N" else -1)
+    lon = float(lon_val) * (1 if lon_dir.upper() == "E" else -1)
+    return lat, lon
+
+
+# --------------------------- Compact storage ---------------------------
+# Categorical columns of the schema are stored as pandas categories, integer columns
+# in the smallest integer type and float columns as float32 only when every value
+# converts back exactly, so tables, hover labels and slider comparisons are unchanged.
+CATEGORY_COLUMNS = schema.columns_of_kind("categorical")
+
+def compact_dtypes(df):
+    for col in df.columns:
+        if col in CATEGORY_COLUMNS:
+            df[col] = df[col].astype("category")
+        elif pd.api.types.is_float_dtype(df[col]):
+            values = df[col].to_numpy(dtype=np.float64)
+            as_float32 = values.astype(np.float32)
+            if np.array_equal(as_float32.astype(np.float64), values, equal_nan=True):
+                df[col] = as_float32
+        elif pd.api.types.is_integer_dtype(df[col]):
+            df[col] = pd.to_numeric(df[col], downcast="integer")
+    return df
+
+
+# --------------------------- Row-level derivation caches ---------------------------
+# The text-level derivations (interval tokens, group names) are row-local and the slow
+# part of preparing a dataset, so they are kept per source-row content hash: a new
+# version only derives the rows that were added or changed (see snapshot.py for the
+# same hashes used to diff versions). Numeric conversion and dtypes stay vectorized,
+# and the caches downstream of the prepared frame are rebuilt per version.
+def row_derivation(range_columns, groups):
+    """derive(df) of interval tokens plus {target: (source column, categorize function)}."""
+    def derive(df):
+        out = interval_tokens(df, range_columns)
+        for target, (source, categorize) in groups.items():
+            out[target] = df[source].apply(categorize).astype(object)
+        return out
+    return derive
+
+_row_derivations = {
+    "regolith": build.IncrementalDerivation(
+        ["Mission", *REGOLITH_RANGE_COLUMNS],
+        row_derivation(REGOLITH_RANGE_COLUMNS, {"Mission Group": ("Mission", categorize_mission)}),
+    ),
+    "simulants": build.IncrementalDerivation(
+        ["Type of simulant"], row_derivation([], {"Soil Group": ("Type of simulant", categorize_soil)}),
+    ),
+    "all": build.IncrementalDerivation(
+        ["Mission/Simulant", *REGOLITH_RANGE_COLUMNS],
+        row_derivation(REGOLITH_RANGE_COLUMNS, {
+            "Mission Group": ("Mission/Simulant", functools.partial(categorize_mission, other="Simulant")),
+        }),
+    ),
+}
+
+def derived_rows(name, df):
+    """Row-level derivations of a dataset's source frame, positionally aligned with df."""
+    return _row_derivations[name](df).set_axis(df.index)
+
+
+# --------------------------- Prepared datasets ---------------------------
+# Loading plus every derived column the app sections need, done once per version.
+# Raw frames and model views are cached too, so they are copied before columns are added.
+@functools.lru_cache(maxsize=4)
+def prepare_regolith_data(version):
+    df = regolith_view(version).copy()
+    rows = derived_rows("regolith", df)
+    add_range_columns(df, REGOLITH_RANGE_COLUMNS, tokens=rows)
+    df["Mission Group"] = rows["Mission Group"]
+    coerce_numeric(df, ["Year of publication", *REGOLITH_RANGE_COLUMNS, "Year"])
+    return compact_dtypes(df)
+
+@functools.lru_cache(maxsize=4)
+def prepare_regolith_plot_data(version):
+    df = load_plot_data(version).copy()
+    df["Mission Group"] = df["Mission"].apply(categorize_mission)
+    with perf.stage("parse locations"):
+        df["Latitude"], df["Longitude"] = zip(*df["Location"].apply(parse_location))
+    return compact_dtypes(df)
+
+@functools.lru_cache(maxsize=4)
+def prepare_simulant_data(version):
+    df = simulant_view(version).copy()
+    df.columns = df.columns.str.strip()
+    coerce_numeric(df, ["Year", *SIMULANT_RANGE_COLUMNS, "Year of publication"])
+    add_range_columns(df, SIMULANT_RANGE_COLUMNS)
+    df["Soil Group"] = derived_rows("simulants", df)["Soil Group"]
+    return compact_dtypes(df)
+
+@functools.lru_cache(maxsize=4)
+def prepare_simulant_plot_data(version):
+    return load_Simulant_plot_data(version)
+
+@functools.lru_cache(maxsize=4)
+def prepare_all_data(version):
+    df = load_all_data(version).copy()
+    rows = derived_rows("all", df)
+    df["Mission Group"] = rows["Mission Group"]
+    add_range_columns(df, REGOLITH_RANGE_COLUMNS, with_avg=False, tokens=rows)
+    coerce_numeric(df, ["Year of publication", *REGOLITH_RANGE_COLUMNS, "Year"])
+    return compact_dtypes(df)
+
+# Registry of the datasets: source file (plus every file its version depends on, when
+# built from the normalized model), raw loader, prepared frame, the build steps it is
+# prepared from (BUILD_STEPS), the facet columns (filter name -> column) and the
+# interval columns carrying _min/_max bounds.
+DATASETS = {
+    "regolith": {
+        "file": REGOLITH_FILE,
+        "files": MODEL_FILES,
+        "load": load_database_data,
+        "prepare": prepare_regolith_data,
+        "inputs": ["regolith view"],
+        "facets": {"terrain": "Terrain", "test": "Test", "mission_type": "Type of mission", "mission_group": "Mission Group"},
+        "ranges": REGOLITH_RANGE_COLUMNS,
+    },
+    "regolith_plots": {
+        "files": REGOLITH_PLOT_FILES,
+        "load": load_plot_data,
+        "prepare": prepare_regolith_plot_data,
+        "inputs": ["regolith plot data"],
+        "facets": {"terrain": "Terrain", "test": "Test", "mission_type": "Type of mission", "mission_group": "Mission Group"},
+        "ranges": [],
+    },
+    "simulants": {
+        "file": SIMULANT_FILE,
+        "files": MODEL_FILES,
+        "load": load_Simulants_data,
+        "prepare": prepare_simulant_data,
+        "inputs": ["simulant view"],
+        "facets": {"soil_group": "Soil Group", "test": "Test", "agency": "Agency", "developer": "Developer"},
+        "ranges": SIMULANT_RANGE_COLUMNS,
+    },
+    "simulant_plots": {
+        "files": SIMULANT_PLOT_FILES,
+        "load": load_Simulant_plot_data,
+        "prepare": prepare_simulant_plot_data,
+        "inputs": ["simulant plot data"],
+        "facets": {"test": "Test", "agency": "Agency", "developer": "Developer"},
+        "ranges": [],
+    },
+    "all": {
+        "files": MODEL_FILES,
+        "load": load_all_data,
+        "prepare": prepare_all_data,
+        "inputs": ["all data"],
+        "facets": {"terrain": "Terrain type", "test": "Test", "mission_type": "Type of mission", "mission_group": "Mission Group", "agency": "Agency"},
+        "ranges": REGOLITH_RANGE_COLUMNS,
+    },
+}
+
+def dataset_spec(name):
+    if name not in DATASETS:
+        raise KeyError(f"Unknown dataset {name!r}, expected one of: {', '.join(DATASETS)}")
+    return DATASETS[name]
+
+def dataset_version(name):
+    spec = dataset_spec(name)
+    return files_version(spec.get("files", (spec.get("file"),)))
+
+# With LUNAR_REGOLITH_SHARED_DIR set, prepared frames are mapped from Arrow IPC files
+# shared by every worker process instead of being built per process (see shared.py).
+SHARED_DIR = os.environ.get("LUNAR_REGOLITH_SHARED_DIR")
+
+@functools.lru_cache(maxsize=8)
+def _shared_frame(name, version):
+    from . import shared
+
+    return shared.shared_frame(name, version, dataset_spec(name)["prepare"].__wrapped__)
+
+def prepared_frame(name, version):
+    if SHARED_DIR:
+        return _shared_frame(name, version)
+    return dataset_spec(name)["prepare"](version)
+
+def load_dataset(name):
+    """Prepared frame of a dataset (raw columns plus derived ones), cached per version."""
+    return prepared_frame(name, dataset_version(name))
+
+
+# --------------------------- Concurrent loading ---------------------------
+# The steps the prepared datasets are built from, with the steps they read and the
+# files they are versioned by. Every step is one of the cached functions above, called
+# with the version of its files (the model version, or a plot table's version), so once
+# a step ran its dependents find its result in the cache.
+BUILD_STEPS = {
+    "regolith table": (load_database_data, [], MODEL_FILES),
+    "simulants table": (load_Simulants_data, [], MODEL_FILES),
+    "star schema": (_star_schema, ["regolith table", "simulants table"], MODEL_FILES),
+    "regolith view": (regolith_view, ["star schema"], MODEL_FILES),
+    "simulant view": (simulant_view, ["star schema"], MODEL_FILES),
+    "all data": (load_all_data, ["regolith view", "simulant view"], MODEL_FILES),
+    "regolith plot data": (load_plot_data, ["regolith view"], REGOLITH_PLOT_FILES),
+    "simulant plot data": (load_Simulant_plot_data, ["simulant view"], SIMULANT_PLOT_FILES),
+}
+LOAD_WORKERS = int(os.environ.get("LUNAR_REGOLITH_LOAD_WORKERS", min(8, os.cpu_count() or 1)))
+
+_load_pool = None
+_load_lock = threading.Lock()
+_loaded = set()
+
+def _load_executor():
+    global _load_pool
+    with _load_lock:
+        if _load_pool is None:
+            _load_pool = ThreadPoolExecutor(LOAD_WORKERS, thread_name_prefix="load")
+        return _load_pool
+
+def step_inputs(step):
+    """Build steps a step (or dataset) reads, none for a dataset already in the shared files."""
+    if step not in DATASETS:
+        return BUILD_STEPS[step][1]
+    if SHARED_DIR:
+        from . import shared
+
+        if os.path.exists(shared.arrow_path(step, dataset_version(step))):
+            return []
+    return DATASETS[step]["inputs"]
+
+def run_step(step):
+    with perf.stage(f"load {step}"):
+        if step in DATASETS:
+            return load_dataset(step)
+        func, _, files = BUILD_STEPS[step]
+        return func(files_version(files))
+
+def build_plan(names):
+    """Every step the datasets need, inputs first."""
+    plan = []
+
+    def visit(step):
+        if step not in plan:
+            for dependency in step_inputs(step):
+                visit(dependency)
+            plan.append(step)
+
+    for name in names:
+        dataset_spec(name)
+        visit(name)
+    return plan
+
+def load_datasets(names=None, executor=None):
+    """Prepared frames {name: frame} of several datasets, built concurrently.
+
+    The build steps run on a thread pool (LUNAR_REGOLITH_LOAD_WORKERS threads), each as
+    soon as its inputs are done, so the two CSVs are parsed side by side, the two views
+    and the tables derived from them likewise, and the wall time is that of the longest
+    chain of steps rather than the sum. CSV parsing and most of the pandas and NumPy work
+    release the GIL. Already loaded versions are returned without touching the pool.
+    """
+    names = list(DATASETS) if names is None else list(names)
+    keys = {(name, dataset_version(name)) for name in names}
+    if not keys <= _loaded:
+        plan = build_plan(names)
+        inputs = {step: step_inputs(step) for step in plan}
+        executor = executor or _load_executor()
+        done, running = set(), {}
+        try:
+            while len(done) < len(plan):
+                for step in plan:
+                    if step not in done and step not in running.values() and all(d in done for d in inputs[step]):
+                        # in a copy of the caller's context, so the steps are timed in its rerun
+                        running[executor.submit(contextvars.copy_context().run, run_step, step)] = step
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    future.result()
+                    done.add(running.pop(future))
+        finally:
+            for future in running:
+                future.cancel()
+        _loaded.update(keys)
+    return {name: load_dataset(name) for name in names}
+
+
+# --------------------------- Column statistics sidecar ---------------------------
+def compute_column_stats(df, bins=10):
+    """Per-column bounds, distinct values, counts, null counts and histograms."""
+    stats = {}
+    for col in df.columns:
+        series = df[col]
+        null_count = int(series.isna().sum())
+        entry = {"count": len(series) - null_count, "null_count": null_count}
+        if pd.api.types.is_numeric_dtype(series):
+            values = series.dropna().to_numpy(dtype=float)
+            if len(values):
+                hist_counts, hist_edges = np.histogram(values, bins=bins)
+                entry.update(
+                    min=float(values.min()),
+                    max=float(values.max()),
+                    histogram=(hist_counts.tolist(), hist_edges.tolist()),
+                )
+            else:
+                entry.update(min=None, max=None, histogram=([], []))
+        else:
+            value_counts = series.value_counts()
+            values = list(series.dropna().unique())  # order of first appearance
+            entry.update(
+                values=values,
+                sorted_values=sorted(values),
+                value_counts={value: int(value_counts[value]) for value in values},
+            )
+        stats[col] = entry
+    return stats
+
+@functools.lru_cache(maxsize=8)
+def _column_stats(name, version):
+    return compute_column_stats(prepared_frame(name, version))
+
+def column_stats(name):
+    return _column_stats(name, dataset_version(name))
+
+
+# --------------------------- Facet index ---------------------------
+# Each facet column is stored as integer row codes (-1 for NaN) plus its option list,
+# so option counts are one np.bincount over the rows kept by the other filters.
+def build_facet_index(df, columns):
+    facets = {}
+    for col in columns:
+        codes, options = pd.factorize(df[col])
+        options = list(options)
+        facets[col] = {
+            "codes": codes.astype(np.int32),
+            "options": options,
+            "lookup": {option: i for i, option in enumerate(options)},
+        }
+    return facets
+
+@functools.lru_cache(maxsize=8)
+def _facet_index(name, version):
+    spec = dataset_spec(name)
+    return build_facet_index(prepared_frame(name, version), list(spec["facets"].values()))
+
+def facet_index(name):
+    return _facet_index(name, dataset_version(name))
+
+
+# --------------------------- Sort indexes ---------------------------
+# Row positions of a dataset in the order of one column (stable, NaN last), built once
+# per version and column so a sorted page is a mask lookup plus a slice.
+@functools.lru_cache(maxsize=64)
+def _sort_index(name, version, column, descending):
+    series = prepared_frame(name, version)[column].reset_index(drop=True)
+    order = series.sort_values(ascending=not descending, kind="stable", na_position="last").index
+    return order.to_numpy(dtype=np.intp)
+
+def sort_index(name, column, descending=False):
+    return _sort_index(name, dataset_version(name), column, descending)
+
+
+# --------------------------- Memory report ---------------------------
+@functools.lru_cache(maxsize=8)
+def _memory_report(name, version):
+    spec = dataset_spec(name)
+    prepared = prepared_frame(name, version)
+    report = pd.DataFrame({
+        "dtype": prepared.dtypes.astype(str),
+        "memory (KB)": prepared.memory_usage(deep=True, index=False) / 1024,
+    })
+    loaded_kb = spec["load"](version).memory_usage(deep=True).sum() / 1024
+    return report, float(report["memory (KB)"].sum()), float(loaded_kb)
+
+def memory_report(name):
+    """Per-column dtype and memory of a prepared dataset, with the size as parsed from CSV.
+
+    Returns (report frame, total KB, KB as parsed from CSV).
+    """
+    return _memory_report(name, dataset_version(name))
+
+
+# --------------------------- Validation ---------------------------
+@functools.lru_cache(maxsize=4)
+def _validation_report(table, version):
+    load = {"regolith": load_database_data, "simulants": load_Simulants_data}[table]
+    return schema.validate(load(version), table)
+
+def validation_report(table):
+    """Row-level report of the cells of a source table ("regolith", "simulants") failing the schema."""
+    return _validation_report(table, source_version(schema.TABLES[table]["file"]))
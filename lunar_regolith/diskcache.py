@@ -0,0 +1,183 @@
+"""Disk cache shared by every process of a user, for results worth more than a pickle.
+
+Entries live in one SQLite file (LUNAR_REGOLITH_CACHE_DB, WAL mode, so readers never
+block and a write is one atomic transaction) and are namespaced by the datasets they
+were computed from and those datasets' versions: writing an entry for a new version
+drops the entries of older versions of the same datasets. The total size is bounded
+(LUNAR_REGOLITH_CACHE_BYTES) by evicting the least recently used entries.
+
+    >>> from lunar_regolith.diskcache import cached
+    >>> fig = cached(["regolith_plots"], ("moon_map",), build_moon_map)
+
+LUNAR_REGOLITH_DISK_CACHE=0 turns it off (cached() then just computes).
+
+Values are unpickled, so the file is trusted like code: by default it lives in a
+per-user directory ($XDG_CACHE_HOME/lunar_regolith or ~/.cache/lunar_regolith) created
+with mode 0700, and a cache file the current user does not own, or one in a directory
+other users can replace it in, is refused with PermissionError. private_dir and
+check_owner guard the other per-user caches (the Parquet files of backends.py, the
+exports of export.py) the same way.
+"""
+import hashlib
+import os
+import pickle
+import sqlite3
+import stat
+import threading
+import time
+
+from . import perf
+from .data import dataset_version
+
+def user_cache_dir():
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "lunar_regolith")
+
+CACHE_DB = os.environ.get("LUNAR_REGOLITH_CACHE_DB", os.path.join(user_cache_dir(), "cache.sqlite"))
+CACHE_BYTES = int(os.environ.get("LUNAR_REGOLITH_CACHE_BYTES", 256 * 1024 * 1024))
+ENABLED = os.environ.get("LUNAR_REGOLITH_DISK_CACHE", "1") not in ("0", "false", "no")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    namespace TEXT NOT NULL,
+    version TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    accessed REAL NOT NULL,
+    PRIMARY KEY (namespace, key)
+);
+CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed);
+"""
+
+
+def check_owner(path):
+    """Raise PermissionError when path exists and belongs to another user."""
+    if not hasattr(os, "getuid"):  # no ownership to compare on Windows
+        return
+    try:
+        owner = os.stat(path).st_uid
+    except FileNotFoundError:
+        return
+    if owner != os.getuid():
+        raise PermissionError(f"Refusing the cache file {path!r}: owned by uid {owner}, not by the current user")
+
+def check_directory(path):
+    """Raise PermissionError when other users can replace the files of directory path."""
+    if not hasattr(os, "getuid"):
+        return
+    st = os.stat(path)
+    # a sticky directory (like /tmp) only lets owners rename or delete their files
+    if st.st_uid != os.getuid() and st.st_mode & 0o022 and not st.st_mode & stat.S_ISVTX:
+        raise PermissionError(f"Refusing the cache directory {path!r}: writable by other users")
+
+def private_dir(path):
+    """Create directory path with mode 0700 if needed and check it like check_directory."""
+    os.makedirs(path, mode=0o700, exist_ok=True)
+    check_directory(path)
+    return path
+
+
+class DiskCache:
+    """Size-bounded LRU of pickled values in SQLite, one connection per thread."""
+
+    def __init__(self, path=CACHE_DB, max_bytes=CACHE_BYTES):
+        self.path, self.max_bytes = path, max_bytes
+        self._local = threading.local()
+        self.hits = self.misses = 0
+
+    def connection(self):
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            directory = os.path.dirname(os.path.abspath(self.path))
+            private_dir(directory)
+            # the WAL and shared memory files are read back as much as the database
+            for path in (self.path, self.path + "-wal", self.path + "-shm"):
+                check_owner(path)
+            connection = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.executescript(SCHEMA)
+            self._local.connection = connection
+        return connection
+
+    def get(self, namespace, version, key):
+        """(True, value) of a cached entry of this version, else (False, None)."""
+        connection = self.connection()
+        row = connection.execute(
+            "SELECT value FROM entries WHERE namespace = ? AND key = ? AND version = ?", (namespace, key, version)
+        ).fetchone()
+        if row is None:
+            self.misses += 1
+            return False, None
+        connection.execute("UPDATE entries SET accessed = ? WHERE namespace = ? AND key = ?", (time.time(), namespace, key))
+        self.hits += 1
+        return True, pickle.loads(row[0])
+
+    def put(self, namespace, version, key, value):
+        """Store value, drop the namespace's entries of other versions and evict down to max_bytes."""
+        blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        if len(blob) > self.max_bytes:
+            return
+        connection = self.connection()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            connection.execute("DELETE FROM entries WHERE namespace = ? AND version != ?", (namespace, version))
+            connection.execute(
+                "INSERT OR REPLACE INTO entries (namespace, version, key, value, size, accessed) VALUES (?, ?, ?, ?, ?, ?)",
+                (namespace, version, key, blob, len(blob), time.time()),
+            )
+            total = connection.execute("SELECT coalesce(sum(size), 0) FROM entries").fetchone()[0]
+            if total > self.max_bytes:
+                # oldest first until the total fits again
+                evict, freed = [], 0
+                for rowid, size in connection.execute("SELECT rowid, size FROM entries ORDER BY accessed"):
+                    if total - freed <= self.max_bytes:
+                        break
+                    evict.append((rowid,))
+                    freed += size
+                connection.executemany("DELETE FROM entries WHERE rowid = ?", evict)
+            connection.execute("COMMIT")
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+
+    def clear(self):
+        self.connection().execute("DELETE FROM entries")
+
+    def stats(self):
+        entries, size = self.connection().execute("SELECT count(*), coalesce(sum(size), 0) FROM entries").fetchone()
+        return {"entries": entries, "bytes": size, "max_bytes": self.max_bytes, "hits": self.hits, "misses": self.misses}
+
+_cache = None
+_cache_lock = threading.Lock()
+
+def shared_cache():
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = DiskCache()
+        return _cache
+
+def cache_key(key):
+    return hashlib.sha256(repr(key).encode("utf-8")).hexdigest()
+
+def cached(datasets, key, compute):
+    """compute() through the shared disk cache, namespaced by the datasets' versions.
+
+    key identifies the result within those datasets (arguments, filters, options), by its
+    repr, so it must only hold plain values.
+    """
+    if not ENABLED:
+        return compute()
+    namespace = "+".join(datasets)
+    version = "|".join(dataset_version(name) for name in datasets)
+    digest = cache_key(key)
+    cache = shared_cache()
+    hit, value = cache.get(namespace, version, digest)
+    perf.count("disk cache hits" if hit else "disk cache misses")
+    if hit:
+        return value
+    value = compute()
+    cache.put(namespace, version, digest, value)
+    return value
@@ -0,0 +1,213 @@
+"""Chunked writers for filtered frames (CSV, JSON, JSON Lines, Parquet, Arrow IPC, Excel).
+
+Each writer serializes a sequence of chunks into a stream, given an empty frame with
+the result columns (head): either a frame `chunk_size` rows at a time (write_frame) or
+the record batches a query backend streams back (write_chunks), so output never needs
+a full copy of the selection in memory. export_file writes a filtered selection once
+per filter hash into an on-disk export cache, private to the user like the disk cache.
+"""
+import hashlib
+import importlib.util
+import os
+import tempfile
+
+from .backends import get_backend
+from .data import dataset_spec, dataset_version, load_dataset
+from .diskcache import check_owner, private_dir, user_cache_dir
+
+EXPORT_FORMATS = {
+    "csv": ".csv",
+    "json": ".json",
+    "jsonl": ".jsonl",
+    "parquet": ".parquet",
+    "arrow": ".arrow",
+    "xlsx": ".xlsx",
+}
+TEXT_FORMATS = {"csv", "json", "jsonl"}
+# optional packages a format needs, formats without them are not offered
+FORMAT_REQUIREMENTS = {"parquet": "pyarrow", "arrow": "pyarrow", "xlsx": "openpyxl"}
+MIME_TYPES = {
+    "csv": "text/csv",
+    "json": "application/json",
+    "jsonl": "application/x-ndjson",
+    "parquet": "application/vnd.apache.parquet",
+    "arrow": "application/vnd.apache.arrow.stream",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+}
+DEFAULT_CHUNK_SIZE = 10_000
+EXPORT_CACHE_DIR = os.environ.get("LUNAR_REGOLITH_EXPORT_DIR", os.path.join(user_cache_dir(), "exports"))
+EXPORT_CACHE_FILES = 64
+
+
+def iter_chunks(df, chunk_size=DEFAULT_CHUNK_SIZE):
+    for start in range(0, len(df), chunk_size):
+        yield df.iloc[start:start + chunk_size]
+
+def format_from_path(path, default="csv"):
+    for fmt, extension in EXPORT_FORMATS.items():
+        if path.lower().endswith(extension):
+            return fmt
+    return default
+
+
+def write_csv(head, chunks, stream):
+    stream.write(head.to_csv(index=False))
+    for chunk in chunks:
+        stream.write(chunk.to_csv(index=False, header=False))
+
+def write_jsonl(head, chunks, stream):
+    for chunk in chunks:
+        text = chunk.to_json(orient="records", lines=True, force_ascii=False)
+        stream.write(text if text.endswith("\n") else text + "\n")
+
+def write_json(head, chunks, stream):
+    """One JSON array of records, written a chunk at a time."""
+    stream.write("[")
+    first = True
+    for chunk in chunks:
+        body = chunk.to_json(orient="records", force_ascii=False)[1:-1]
+        if body:
+            stream.write(body if first else "," + body)
+            first = False
+    stream.write("]")
+
+def _arrow_batches(head, chunks):
+    import pyarrow as pa
+
+    schema = pa.Schema.from_pandas(head, preserve_index=False)
+    # through a Table: columns of concatenated frames may be chunked Arrow arrays
+    batches = (
+        batch
+        for chunk in chunks
+        for batch in pa.Table.from_pandas(chunk, schema=schema, preserve_index=False).combine_chunks().to_batches()
+    )
+    return schema, batches
+
+def write_parquet(head, chunks, stream):
+    import pyarrow.parquet as pq
+
+    schema, batches = _arrow_batches(head, chunks)
+    with pq.ParquetWriter(stream, schema) as writer:
+        for batch in batches:
+            writer.write_batch(batch)
+
+def write_arrow(head, chunks, stream):
+    import pyarrow as pa
+
+    schema, batches = _arrow_batches(head, chunks)
+    with pa.ipc.new_stream(stream, schema) as writer:
+        for batch in batches:
+            writer.write_batch(batch)
+
+def write_xlsx(head, chunks, stream):
+    """Excel workbook through openpyxl's write-only (row streaming) mode."""
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet("data")
+    sheet.append([str(col) for col in head.columns])
+    for chunk in chunks:
+        chunk = chunk.astype(object).where(chunk.notna(), None)
+        for row in chunk.itertuples(index=False, name=None):
+            sheet.append(row)
+    workbook.save(stream)
+
+WRITERS = {
+    "csv": write_csv,
+    "json": write_json,
+    "jsonl": write_jsonl,
+    "parquet": write_parquet,
+    "arrow": write_arrow,
+    "xlsx": write_xlsx,
+}
+
+def write_chunks(head, chunks, fmt, stream):
+    """Writes the chunks to stream in the given format; text formats expect a text stream."""
+    if fmt not in WRITERS:
+        raise ValueError(f"Unknown export format {fmt!r}, expected one of: {', '.join(WRITERS)}")
+    WRITERS[fmt](head, chunks, stream)
+
+def write_frame(df, fmt, stream, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Writes df to stream in the given format, chunk_size rows at a time."""
+    write_chunks(df.iloc[:0], iter_chunks(df, chunk_size), fmt, stream)
+
+
+def available_formats():
+    """Export formats whose optional packages are installed."""
+    return [
+        fmt for fmt in WRITERS
+        if fmt not in FORMAT_REQUIREMENTS or importlib.util.find_spec(FORMAT_REQUIREMENTS[fmt]) is not None
+    ]
+
+
+# --- Cached exports of filtered selections ---
+DERIVED_SUFFIXES = ("min", "max", "avg")
+
+def with_derived_columns(name, columns):
+    """columns plus the derived _min/_max/_avg columns the dataset has of any interval property among them."""
+    spec = dataset_spec(name)
+    available = set(load_dataset(name).columns)
+    out = []
+    for col in columns:
+        derived = [f"{col}_{suffix}" for suffix in DERIVED_SUFFIXES if f"{col}_{suffix}" in available] if col in spec["ranges"] else []
+        for c in [col, *derived]:
+            if c not in out:
+                out.append(c)
+    return out
+
+def filter_hash(name, fmt, facets=None, ranges=None, year=None, columns=None):
+    """Hash of a dataset version, export format and the active filters (order independent)."""
+    key = (
+        name,
+        dataset_version(name),
+        fmt,
+        sorted((k, tuple(sorted(v))) for k, v in (facets or {}).items() if v),
+        sorted((k, tuple(v)) for k, v in (ranges or {}).items() if v is not None),
+        tuple(year) if year is not None else None,
+        tuple(columns) if columns is not None else None,
+    )
+    return hashlib.sha256(repr(key).encode("utf-8")).hexdigest()[:24]
+
+def _prune_export_cache(keep):
+    entries = [
+        os.path.join(EXPORT_CACHE_DIR, f) for f in os.listdir(EXPORT_CACHE_DIR) if not f.startswith(".")
+    ]
+    entries.sort(key=os.path.getmtime, reverse=True)
+    for path in entries[keep:]:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+def export_file(name, fmt, facets=None, ranges=None, year=None, columns=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Path of the filtered selection exported as fmt, written once per filter hash.
+
+    The selection is streamed from the query backend chunk by chunk into a temporary
+    file and renamed into the export cache, so concurrent sessions never read a half
+    written export.
+    """
+    if fmt not in WRITERS:
+        raise ValueError(f"Unknown export format {fmt!r}, expected one of: {', '.join(WRITERS)}")
+    private_dir(EXPORT_CACHE_DIR)
+    path = os.path.join(
+        EXPORT_CACHE_DIR, f"{name}-{filter_hash(name, fmt, facets, ranges, year, columns)}{EXPORT_FORMATS[fmt]}"
+    )
+    check_owner(path)
+    if os.path.exists(path):
+        os.utime(path)
+        return path
+    head, chunks = get_backend().stream(name, facets, ranges, year, columns, chunk_size)
+    fd, tmp_path = tempfile.mkstemp(dir=EXPORT_CACHE_DIR, prefix=".", suffix=EXPORT_FORMATS[fmt])
+    try:
+        if fmt in TEXT_FORMATS:
+            with os.fdopen(fd, "w", encoding="utf-8", newline="") as stream:
+                write_chunks(head, chunks, fmt, stream)
+        else:
+            with os.fdopen(fd, "wb") as stream:
+                write_chunks(head, chunks, fmt, stream)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+    _prune_export_cache(EXPORT_CACHE_FILES)
+    return path
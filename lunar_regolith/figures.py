@@ -0,0 +1,280 @@
+"""Plotly figures of the app sections, built without Streamlit and cached on disk.
+
+Each figure is returned as its plotly dict (st.plotly_chart renders it as is) and goes
+through diskcache.cached, keyed by the dataset versions and a digest of the rows it
+plots, so a figure is built once for all workers, whichever filters selected those
+rows, and warmup.py can build the default views before the first visitor.
+"""
+import base64
+import hashlib
+import os
+from io import BytesIO
+
+from . import perf
+from .data import dataset_version, load_dataset
+from .diskcache import cached
+
+# The image ships with the app, not with the data (LUNAR_REGOLITH_DATA_DIR)
+MOON_MAP_FILE = os.environ.get(
+    "LUNAR_REGOLITH_MOON_MAP",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "moon_map.jpg"),
+)
+
+# Plotting markers
+MARKER_SHAPES = {
+    "Apollo": "circle",
+    "Luna": "square",
+    "Surveyor": "triangle-up",
+    "Chang'e": "diamond",
+    "Chandrayaan": "cross"
+}
+MISSION_COLORS = {
+    "Apollo": "#0b96d6",
+    "Luna": "#d45087",
+    "Surveyor": "#ffa600",
+    "Chang'e": "#72CF6D",
+    "Chandrayaan": "#8e44ad",
+}
+
+
+def rows_digest(df):
+    """Digest of the rows of a filtered frame (their values, in order), whichever backend
+    returned it and however it is indexed."""
+    import pandas as pd
+
+    return hashlib.sha256(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes()).hexdigest()[:16]
+
+# JSON size of the figures handed out during recorded reruns, counted once per figure
+_payload_sizes = {}
+
+def cached_figure(datasets, key, build):
+    """cached() figure, counted as "figure bytes" when the rerun is recorded (perf.py)."""
+    fig = cached(datasets, key, build)
+    if perf.current() is not None:
+        size_key = (tuple(dataset_version(name) for name in datasets), key)
+        if size_key not in _payload_sizes:
+            import plotly.io
+
+            if len(_payload_sizes) >= 256:
+                _payload_sizes.clear()
+            _payload_sizes[size_key] = len(plotly.io.to_json(fig, validate=False).encode("utf-8"))
+        perf.count("figure bytes", _payload_sizes[size_key])
+    return fig
+
+
+# --------------------------- Moon Mission Database ---------------------------
+def build_mission_scatter(plot_df, simulant_plot_df, x_axis, y_axis, compare_simulants):
+    import plotly.express as px
+
+    fig = px.scatter(
+        plot_df,
+        x=x_axis,
+        y=y_axis,
+        color="Mission Group",
+        symbol="Mission Group",
+        color_discrete_map=MISSION_COLORS,
+        symbol_map=MARKER_SHAPES,
+        hover_data=["Mission", x_axis, y_axis],
+        title=f"{y_axis} vs {x_axis}",
+    )
+    fig.update_traces(marker=dict(size=10, opacity=0.7))
+    fig.update_layout(
+        xaxis_title=x_axis,
+        yaxis_title=y_axis,
+        hoverlabel=dict(bgcolor="white", font_size=12, font_color="black"),
+        title=dict(
+            x=0,
+            xanchor='left',
+            font=dict(size=20)
+        ),
+        legend_title_text="Mission Group",
+        width=800,
+        height=500,
+    )
+
+    # Add simulants if selected
+    if compare_simulants and x_axis in simulant_plot_df.columns and y_axis in simulant_plot_df.columns:
+        hover_texts = [
+            f"Simulant: {row['Simulant']}<br>{x_axis}: {row[x_axis]}<br>{y_axis}: {row[y_axis]}"
+            for _, row in simulant_plot_df.iterrows()
+        ]
+        fig.add_scatter(
+            x=simulant_plot_df[x_axis],
+            y=simulant_plot_df[y_axis],
+            mode='markers',
+            name='Lunar Simulants',
+            marker=dict(symbol='diamond', size=10, color='#ff00ff', line=dict(width=1, color='black')),
+            hovertext=hover_texts,
+            hoverinfo='text'
+        )
+    return fig.to_dict()
+
+@perf.timed("scatter")
+def mission_scatter(plot_df, x_axis, y_axis, compare_simulants=False, simulant_plot_df=None):
+    """Scatter of the selected regolith_plots rows (NaN-free on both axes), optionally with the
+    simulants (simulant_plot_df, by default the in-memory simulant_plots)."""
+    simulants_digest = None if simulant_plot_df is None or not compare_simulants else rows_digest(simulant_plot_df)
+    return cached_figure(
+        ["regolith_plots", "simulant_plots"],
+        ("mission_scatter", rows_digest(plot_df), x_axis, y_axis, compare_simulants, simulants_digest),
+        lambda: build_mission_scatter(
+            plot_df, load_dataset("simulant_plots") if simulant_plot_df is None else simulant_plot_df,
+            x_axis, y_axis, compare_simulants,
+        ),
+    )
+
+
+# Moon Map (Latitude/Longitude are parsed at ingestion, see prepare_regolith_plot_data)
+def pil_to_base64_uri(pil_img):
+    buffered = BytesIO()
+    pil_img.save(buffered, format="PNG")
+    img_bytes = buffered.getvalue()
+    base64_str = base64.b64encode(img_bytes).decode()
+    return "data:image/png;base64," + base64_str
+
+@perf.timed("map encoding")
+def moon_map_uri(path=MOON_MAP_FILE):
+    """The moon map image as a PNG data URI (the layout image of the map)."""
+    from PIL import Image
+
+    moon_img = Image.open(path)
+
+    if moon_img.mode != 'RGB':
+        moon_img = moon_img.convert('RGB')
+
+    return pil_to_base64_uri(moon_img)
+
+def build_moon_map(lunar_plot_df, moon_img_uri):
+    import plotly.graph_objects as go
+
+    fig = go.Figure()
+
+    for group in lunar_plot_df["Mission Group"].unique():
+        df_group = lunar_plot_df[lunar_plot_df["Mission Group"] == group]
+        hover_text = df_group.apply(
+            lambda row: f"Mission: {row['Mission']}<br>Longitude: {row['Longitude']}°<br>Latitude: {row['Latitude']}°",
+            axis=1
+        )
+        fig.add_trace(go.Scatter(
+            x=df_group["Longitude"],
+            y=df_group["Latitude"],
+            mode="markers",
+            marker=dict(
+                size=10,
+                color=MISSION_COLORS.get(group, "black"),
+                symbol=MARKER_SHAPES.get(group, "circle"),
+                opacity=0.8,
+                line=dict(width=0)
+            ),
+            text=hover_text,
+            hoverinfo="text",
+            name=group
+        ))
+
+    fig.add_layout_image(
+        dict(
+            source=moon_img_uri,
+            xref="x",
+            yref="y",
+            x=-180,
+            y=90,
+            sizex=360,
+            sizey=180,
+            sizing="stretch",
+            opacity=1,
+            layer="below"
+        )
+    )
+
+    fig.update_layout(
+        title=dict(
+            text="Mission Location Representation on the Moon",
+            x=0,
+            xanchor='left',
+            y=0.8,
+            yanchor='top',
+            font=dict(size=20)
+        ),
+        xaxis=dict(
+            title="Longitude (°)",
+            range=[-180, 180],
+            constrain='domain',
+            scaleratio=1,
+            scaleanchor="y",
+            fixedrange=True,
+            showgrid=False,
+            zeroline=False,
+        ),
+        yaxis=dict(
+            title=dict(
+                text="Latitude (°)",
+                standoff=20
+            ),
+            range=[-90, 90],
+            constrain='domain',
+            fixedrange=True,
+            showgrid=False,
+            zeroline=False,
+        ),
+        margin=dict(l=80, r=20, t=20, b=40),
+        plot_bgcolor='rgba(0,0,0,0)',
+        paper_bgcolor='rgba(0,0,0,0)',
+        showlegend=True,
+        legend=dict(
+            title="Mission Group",
+            y=0.8,
+            yanchor="top",
+            x=1,
+            xanchor="left",
+        ),
+        hoverlabel=dict(bgcolor="white", font_size=12, font_color="black"),
+        width=800,
+        height=600
+    )
+
+    fig.update_xaxes(automargin=False)
+    fig.update_yaxes(automargin=False)
+    return fig.to_dict()
+
+@perf.timed("moon map")
+def moon_map(path=MOON_MAP_FILE, plot_df=None):
+    """Map of every mission location (plot_df, by default the in-memory regolith_plots) over
+    the moon image, rebuilt when either changes."""
+    image = os.stat(path)
+    rows = None if plot_df is None else rows_digest(plot_df)
+    return cached_figure(
+        ["regolith_plots"],
+        ("moon_map", os.path.abspath(path), image.st_mtime_ns, image.st_size, rows),
+        lambda: build_moon_map(load_dataset("regolith_plots") if plot_df is None else plot_df, moon_map_uri(path)),
+    )
+
+
+# --------------------------- Lunar Regolith Simulants Database ---------------------------
+SOIL_COLORS = {"Mare": "#4dbaed", "Highland": "#d45087", "Other": "#84ebbb"}
+SOIL_SHAPES = {"Mare": "circle", "Highland": "square"}
+
+def build_simulant_scatter(plot_df, x_axis, y_axis):
+    import plotly.express as px
+
+    fig = px.scatter(
+        plot_df,
+        x=x_axis,
+        y=y_axis,
+        color="Soil Group",
+        symbol="Soil Group",
+        color_discrete_map=SOIL_COLORS,
+        symbol_map=SOIL_SHAPES,
+        hover_data=["Simulant", x_axis, y_axis],
+        title=f"{y_axis} vs {x_axis}",
+    )
+    fig.update_traces(marker=dict(size=10, opacity=0.7))
+    return fig.to_dict()
+
+@perf.timed("scatter")
+def simulant_scatter(plot_df, x_axis, y_axis):
+    """Scatter of the selected simulants rows (NaN-free on both axes)."""
+    return cached_figure(
+        ["simulants"],
+        ("simulant_scatter", rows_digest(plot_df), x_axis, y_axis),
+        lambda: build_simulant_scatter(plot_df, x_axis, y_axis),
+    )
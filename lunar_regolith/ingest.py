@@ -0,0 +1,184 @@
+"""Append-only ingestion of new measurements, and compaction of the pending deltas.
+
+    python -m lunar_regolith.ingest append regolith new_rows.csv
+    python -m lunar_regolith.ingest status
+    python -m lunar_regolith.ingest compact [regolith|simulants]
+
+append writes the rows as a new delta file and never touches the compacted CSV, so
+the next load parses only that delta (data.load_table), and the row-level derivations
+(interval tokens, group names, the All Data rows; build.IncrementalDerivation) only run
+for its rows. The delta is still a new dataset version: the model, the prepared frames,
+column statistics, facet and sort indexes, figures and the disk cache entries are
+rebuilt over the whole table. compact appends the pending deltas' lines to the
+compacted CSV, keeping its existing bytes as they are, then removes them.
+"""
+import argparse
+import csv
+import io
+import os
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+from . import schema
+from .data import data_path, delta_dir, delta_files
+
+
+def table_file(table):
+    if table not in schema.TABLES:
+        raise KeyError(f"Unknown table {table!r}, expected one of: {', '.join(schema.TABLES)}")
+    return schema.TABLES[table]["file"]
+
+def file_header(table):
+    """Header row of the compacted CSV, as written in the file."""
+    with open(data_path(table_file(table)), newline="", encoding="utf-8") as stream:
+        return next(csv.reader(stream))
+
+def atomic_write(directory, path, write, suffix=".tmp"):
+    """Write a file through a temporary file in the same directory and os.replace."""
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".", suffix=suffix)
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8", newline="") as stream:
+            write(stream)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+
+
+# --------------------------- Append ---------------------------
+def delta_rows(table, rows):
+    """Rows (a frame or CSV path) as strings in the column order of the table file.
+
+    Columns may be named as in the file header or as in the schema; fully empty rows
+    are dropped and missing values are written as empty cells.
+    """
+    if not isinstance(rows, pd.DataFrame):
+        rows = pd.read_csv(rows, dtype=str, keep_default_na=False)
+    header = file_header(table)
+    names = schema.table_columns(table)
+    renamed = rows.rename(columns=dict(zip(header, names)))
+    missing = [col for col in names if col not in renamed.columns]
+    if missing:
+        raise ValueError(f"rows for {table!r} lack column(s): {', '.join(missing)}")
+    extra = [col for col in renamed.columns if col not in names]
+    if extra:
+        raise ValueError(f"rows for {table!r} have unknown column(s): {', '.join(map(str, extra))}")
+    out = renamed[names].astype(object).where(renamed[names].notna(), "").astype(str)
+    return out[(out.apply(lambda col: col.str.strip()) != "").any(axis=1)].reset_index(drop=True)
+
+def append_rows(table, rows):
+    """Append rows to a table as a new delta file.
+
+    Returns (delta path or None when there was nothing to add, schema validation report
+    of the new rows). Invalid values are reported, not rejected, as for the CSV files.
+    """
+    df = delta_rows(table, rows)
+    report = schema.validate(df.replace("", None), table)
+    if df.empty:
+        return None, report
+    directory = delta_dir(table_file(table))
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"{time.time_ns():020d}-{os.getpid()}.csv")
+
+    def write(stream):
+        writer = csv.writer(stream, lineterminator="\n")
+        writer.writerow(file_header(table))
+        writer.writerows(df.itertuples(index=False, name=None))
+    atomic_write(directory, path, write)
+    return path, report
+
+
+# --------------------------- Compaction ---------------------------
+def _delta_body(path, header):
+    """Data lines of a delta file (newline terminated), checking its header."""
+    with open(path, newline="", encoding="utf-8") as stream:
+        text = stream.read()
+    first = next(csv.reader(io.StringIO(text)), None)
+    if first != header:
+        raise ValueError(f"{path}: header does not match {header!r}")
+    body = text.split("\n", 1)[1] if "\n" in text else ""
+    return body if not body or body.endswith("\n") else body + "\n"
+
+def pending_rows(table):
+    """{delta path: row count} of a table's pending deltas."""
+    counts = {}
+    for path in delta_files(table_file(table)):
+        with open(path, newline="", encoding="utf-8") as stream:
+            counts[path] = max(sum(1 for _ in csv.reader(stream)) - 1, 0)
+    return counts
+
+def compact(table):
+    """Fold the pending deltas of a table into its CSV, returns the number of rows added.
+
+    Deltas appended while compacting are left pending for the next run.
+    """
+    filename = table_file(table)
+    deltas = delta_files(filename)
+    if not deltas:
+        return 0
+    header = file_header(table)
+    bodies = [_delta_body(path, header) for path in deltas]
+    path = data_path(filename)
+    with open(path, newline="", encoding="utf-8") as stream:
+        base = stream.read()
+    if base and not base.endswith("\n"):
+        base += "\n"
+
+    def write(stream):
+        stream.write(base)
+        for body in bodies:
+            stream.write(body)
+    atomic_write(os.path.dirname(path), path, write)
+    rows = sum(len(list(csv.reader(io.StringIO(body)))) for body in bodies)
+    for delta in deltas:
+        os.remove(delta)
+    return rows
+
+
+# --------------------------- Command line ---------------------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m lunar_regolith.ingest",
+        description="Append new measurements as delta files and compact them into the dataset CSVs.",
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+    append = commands.add_parser("append", help="Append the rows of a CSV file as a new delta")
+    append.add_argument("table", choices=list(schema.TABLES))
+    append.add_argument("rows", help="CSV file with the table's columns, '-' for stdin")
+    commands.add_parser("status", help="List the pending delta files")
+    compact_cmd = commands.add_parser("compact", help="Fold the pending deltas into the dataset CSVs")
+    compact_cmd.add_argument("tables", nargs="*", metavar="table",
+                             help=f"Tables to compact (default: all of {', '.join(schema.TABLES)})")
+    args = parser.parse_args(argv)
+
+    if args.command == "append":
+        try:
+            path, report = append_rows(args.table, sys.stdin if args.rows == "-" else args.rows)
+        except ValueError as e:
+            parser.error(str(e))
+        if not report.empty:
+            print(report.to_string(index=False), file=sys.stderr)
+        if path is None:
+            print("no rows to append", file=sys.stderr)
+        else:
+            rows = pending_rows(args.table)[path]
+            print(f"{rows} row(s) appended to {args.table} as {path}", file=sys.stderr)
+    elif args.command == "status":
+        for table in schema.TABLES:
+            counts = pending_rows(table)
+            print(f"{table}: {len(counts)} delta file(s), {sum(counts.values())} row(s) pending")
+            for path, rows in counts.items():
+                print(f"  {os.path.basename(path)}  {rows} row(s)")
+    else:
+        unknown = [table for table in args.tables if table not in schema.TABLES]
+        if unknown:
+            parser.error(f"unknown table(s): {', '.join(unknown)}, expected {', '.join(schema.TABLES)}")
+        for table in args.tables or list(schema.TABLES):
+            print(f"{table}: {compact(table)} row(s) compacted", file=sys.stderr)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,350 @@
+"""End-to-end rerun latency of the app, driven headless through Streamlit's AppTest.
+
+    python -m lunar_regolith.latency                     the data of LUNAR_REGOLITH_DATA_DIR
+    python -m lunar_regolith.latency --rows 1e5          synthetic data (see bench.py)
+    python -m lunar_regolith.latency --scale 2 --json latency.json
+
+Runs Combined_Lunar_Database.py once cold, waits for the boot warm-up, then plays
+scenario(): range sliders and facet filters of each section, both plot axes, switching
+between the sections and opening every mission page of Pages/. Each interaction is one
+rerun, timed on the wall clock with the resident set size after it (and, with
+--tracemalloc, the peak of Python allocations during it). A rerun over its kind's
+budget in BUDGETS (times --scale, for slower machines) or raising an exception fails
+the run with exit status 1.
+
+The reruns are recorded as with metrics on (see metrics.py), and each one must add
+exactly one observation to the lunar_regolith_filtered_rows histogram: the rows that
+the rerun's calls of query.filter_dataset returned, with no dataset filtered twice.
+
+The footer's GitHub request never leaves the process: requests.get is replaced by
+LocalGitHub, which answers the commits API with the date of the local checkout's last
+commit, and the app gets an empty GITHUB_TOKEN secret.
+"""
+import argparse
+import datetime
+import json
+import logging
+import os
+import subprocess
+import sys
+import time
+import tracemalloc
+from unittest import mock
+
+from . import metrics, perf, warmup
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP_FILE = os.path.join(REPO_DIR, "Combined_Lunar_Database.py")
+RERUN_TIMEOUT = 120
+
+# seconds per rerun, by interaction kind
+BUDGETS = {
+    "cold": 30.0,
+    "section": 3.0,
+    "slider": 1.5,
+    "facet": 1.5,
+    "axis": 2.0,
+    "page": 1.5,
+}
+
+SECTIONS = {
+    "moon": "Moon Mission Database",
+    "simulants": "Lunar Regolith Simulants Database",
+    "all": "All Data",
+    "pages": "Detailed Mission Pages",
+}
+
+
+# --------------------------- Footer stand-in ---------------------------
+class LocalResponse:
+    """The part of requests.Response the footer reads."""
+
+    def __init__(self, payload, status_code=200):
+        self.payload, self.status_code = payload, status_code
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            import requests
+
+            raise requests.HTTPError(f"{self.status_code} from the local stand-in")
+
+    def json(self):
+        return self.payload
+
+def last_commit_date():
+    """ISO date of the local checkout's last commit, now when git cannot tell."""
+    try:
+        out = subprocess.run(["git", "log", "-1", "--format=%cI"], cwd=REPO_DIR, capture_output=True, text=True, timeout=10)
+        if out.stdout.strip():
+            return out.stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        pass
+    return datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds")
+
+class LocalGitHub:
+    """Stand-in for requests.get answering the GitHub commits API of the footer."""
+
+    def __init__(self):
+        self.date = last_commit_date()
+        self.calls = 0
+
+    def __call__(self, url, headers=None, timeout=None, **kwargs):
+        self.calls += 1
+        if url.startswith("https://api.github.com/repos/") and "/commits/" in url:
+            return LocalResponse({"commit": {"committer": {"date": self.date}}})
+        return LocalResponse({}, status_code=404)
+
+
+# --------------------------- Filtered rows ---------------------------
+class FilterLog:
+    """Stand-in for query.filter_dataset noting (dataset, rows) of each call within a recorded rerun."""
+
+    def __init__(self, func):
+        self.func = func
+        self.calls = []
+
+    def __call__(self, name, *args, **kwargs):
+        df = self.func(name, *args, **kwargs)
+        if perf.current() is not None:
+            self.calls.append((name, len(df)))
+        return df
+
+def filtered_rows_errors(reruns, calls, before, after):
+    """Errors of one rerun's filtered rows, given the histogram totals of its section before and after."""
+    if len(reruns) != 1:
+        return [f"{len(reruns)} reruns recorded, expected one"]
+    errors = []
+    names = [name for name, _ in calls]
+    twice = sorted({name for name in names if names.count(name) > 1})
+    if twice:
+        errors.append(f"filtered {', '.join(twice)} more than once")
+    rows = sum(n for _, n in calls)
+    counted = reruns[0].counters.get("filtered rows", 0)
+    if counted != rows:
+        errors.append(f"counted {counted} filtered rows, the filters returned {rows}")
+    observations = after[1] - before[1]
+    if observations != 1:
+        errors.append(f"{observations} observations of {metrics.FILTERED_ROWS.name}, expected one")
+    elif after[0] - before[0] != counted:
+        errors.append(f"{metrics.FILTERED_ROWS.name} observed {after[0] - before[0]:g}, expected {counted}")
+    return errors
+
+
+# --------------------------- Interactions ---------------------------
+def widget(widgets, label=None, key=None):
+    for w in widgets:
+        if (key is not None and w.key == key) or (label is not None and w.label == label):
+            return w
+    raise LookupError(f"no widget {key or label!r} on the page")
+
+def set_section(section):
+    def act(at):
+        at.sidebar.radio[0].set_value(SECTIONS[section])
+    return act
+
+def narrow_slider(key):
+    """Move both handles of a range slider a quarter of its span inwards."""
+    def act(at):
+        slider = widget(at.slider, key=key)
+        low, high = slider.min, slider.max
+        step = slider.step or 1
+        quarter = round((high - low) / 4 / step) * step
+        if isinstance(low, int) and isinstance(high, int):
+            quarter = int(quarter)
+        slider.set_range(round(low + quarter, 10), round(high - quarter, 10))
+    return act
+
+def select(key, option):
+    """Add an option (its value, the labels carry live counts) to a facet multiselect."""
+    def act(at):
+        widget(at.multiselect, key=key).select(option)
+    return act
+
+def choose(label, value):
+    def act(at):
+        widget(at.selectbox, label=label).set_value(value)
+    return act
+
+def toggle(label):
+    def act(at):
+        checkbox = widget(at.checkbox, label=label)
+        checkbox.set_value(not checkbox.value)
+    return act
+
+def open_page(mission):
+    def act(at):
+        widget(at.sidebar.selectbox, label="Select a mission to view details:").set_value(mission)
+    return act
+
+def mission_pages():
+    """Mission names of the Pages/ scripts, as the app lists them."""
+    names = os.listdir(os.path.join(REPO_DIR, "Pages"))
+    return sorted(name[:-3].replace("_", " ").title() for name in names if name.endswith(".py"))
+
+X_AXIS, Y_AXIS = "X-axis (categorical)", "Y-axis (numeric)"
+
+def scenario():
+    """(step, kind, action) of the scripted session after the cold start."""
+    steps = [
+        ("moon: density slider", "slider", narrow_slider("moon_density")),
+        ("moon: cohesion slider", "slider", narrow_slider("moon_cohesion")),
+        ("moon: year slider", "slider", narrow_slider("moon_year")),
+        ("moon: terrain filter", "facet", select("moon_terrain", "Mare")),
+        ("moon: x axis", "axis", choose(X_AXIS, "Terrain")),
+        ("moon: y axis", "axis", choose(Y_AXIS, "Cohesion (kPa)")),
+        ("moon: compare simulants", "axis", toggle("Compare with lunar regolith simulants")),
+        ("simulants: open", "section", set_section("simulants")),
+        ("simulants: density slider", "slider", narrow_slider("sim_density")),
+        ("simulants: agency filter", "facet", select("sim_agency", "NASA")),
+        ("simulants: x axis", "axis", choose(X_AXIS, "Agency")),
+        ("simulants: y axis", "axis", choose(Y_AXIS, "Cohesion (kPa)")),
+        ("all: open", "section", set_section("all")),
+        ("all: angle slider", "slider", narrow_slider("all_angle")),
+        ("all: mission group filter", "facet", select("all_mission_group", "Apollo")),
+        ("pages: open", "section", set_section("pages")),
+    ]
+    steps += [(f"pages: {mission}", "page", open_page(mission)) for mission in mission_pages()]
+    steps.append(("moon: back", "section", set_section("moon")))
+    return steps
+
+
+# --------------------------- Runs ---------------------------
+def megabytes(n):
+    return None if n is None else n / 1e6
+
+def timed_run(at, trace, filter_log):
+    if trace:
+        tracemalloc.reset_peak()
+    reruns = []
+    filter_log.calls.clear()
+    perf.listeners.append(reruns.append)
+    before = {section: metrics.FILTERED_ROWS.totals(section) for section in SECTIONS.values()}
+    rss_before = metrics.resident_bytes()
+    try:
+        start = time.perf_counter()
+        at.run(timeout=RERUN_TIMEOUT)
+        seconds = time.perf_counter() - start
+    finally:
+        perf.listeners.remove(reruns.append)
+    rss = metrics.resident_bytes()
+    section = reruns[0].section if reruns else None
+    after = metrics.FILTERED_ROWS.totals(section)
+    return {
+        "seconds": seconds,
+        "rss_mb": megabytes(rss),
+        "rss_delta_mb": megabytes(rss - rss_before) if rss is not None and rss_before is not None else None,
+        "peak_mb": megabytes(tracemalloc.get_traced_memory()[1]) if trace else None,
+        "errors": [str(e.value) for e in at.exception] + filtered_rows_errors(reruns, filter_log.calls, before.get(section, (0.0, 0)), after),
+    }
+
+def run(scale=1.0, budgets=None, trace=False, progress=None):
+    """Play the scenario, returns [{step, kind, seconds, budget, rss_mb, ..., errors}]."""
+    from streamlit.testing.v1 import AppTest
+
+    budgets = {**BUDGETS, **(budgets or {})}
+    stand_in = LocalGitHub()
+    results = []
+
+    def record(step, kind, measurement):
+        result = {"step": step, "kind": kind, "budget": budgets[kind] * scale, **measurement}
+        results.append(result)
+        if progress:
+            progress(result)
+
+    from . import query
+
+    filter_log = FilterLog(query.filter_dataset)
+    # the app records its reruns while metrics are on; their perf log lines are not wanted here
+    metrics.start(port=0)
+    if not perf.LOG_FILE and not perf.log.handlers:
+        perf.log.addHandler(logging.NullHandler())
+    if trace:
+        tracemalloc.start()
+    try:
+        with (
+            mock.patch("requests.get", stand_in),
+            mock.patch.object(metrics, "ENABLED", True),
+            mock.patch("lunar_regolith.query.filter_dataset", filter_log),
+            mock.patch("lunar_regolith.backends.filter_dataset", filter_log),
+        ):
+            at = AppTest.from_file(APP_FILE, default_timeout=RERUN_TIMEOUT)
+            at.secrets["GITHUB_TOKEN"] = ""
+            record("open app", "cold", timed_run(at, trace, filter_log))
+            # the interactions are measured against warm caches, as a visitor after boot sees them
+            warmup.start().wait(RERUN_TIMEOUT)
+            for step, kind, act in scenario():
+                try:
+                    act(at)
+                except (LookupError, ValueError) as e:
+                    record(step, kind, {"seconds": 0.0, "rss_mb": None, "rss_delta_mb": None, "peak_mb": None, "errors": [f"{type(e).__name__}: {e}"]})
+                    continue
+                record(step, kind, timed_run(at, trace, filter_log))
+    finally:
+        if trace:
+            tracemalloc.stop()
+    if not stand_in.calls:
+        results[-1]["errors"].append("the footer never called the GitHub stand-in")
+    return results
+
+def failures(results):
+    out = []
+    for result in results:
+        out += [f"{result['step']}: {error}" for error in result["errors"]]
+        if result["seconds"] > result["budget"]:
+            out.append(f"{result['step']}: {result['seconds'] * 1000:.0f} ms over the {result['budget'] * 1000:.0f} ms {result['kind']} budget")
+    return out
+
+
+# --------------------------- Command line ---------------------------
+def parse_budget(text):
+    """'KIND=SECONDS' -> (kind, seconds)."""
+    kind, sep, seconds = text.partition("=")
+    if not sep or kind not in BUDGETS:
+        raise argparse.ArgumentTypeError(f"expected KIND=SECONDS with KIND one of {', '.join(BUDGETS)}, got {text!r}")
+    return kind, float(seconds)
+
+def _mb(value):
+    return f"{value:9.1f}" if value is not None else f"{'-':>9s}"
+
+def main(argv=None):
+    from . import bench, synthetic
+
+    argv = sys.argv[1:] if argv is None else list(argv)
+    parser = argparse.ArgumentParser(
+        prog="python -m lunar_regolith.latency",
+        description="Replay scripted interactions with the app through AppTest and check each rerun against a latency budget.",
+    )
+    parser.add_argument("--rows", type=synthetic.parse_rows, help="Run on synthetic data with this many regolith rows")
+    parser.add_argument("--simulant-rows", type=synthetic.parse_rows, help="Synthetic simulant rows (default: as many as --rows)")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the synthetic data")
+    parser.add_argument("--data-dir", help=argparse.SUPPRESS)
+    parser.add_argument("--scale", type=float, default=1.0, help="Multiply every budget, e.g. 2 on a slow machine")
+    parser.add_argument("--budget", type=parse_budget, action="append", default=[], help="Override one budget, e.g. page=0.5")
+    parser.add_argument("--tracemalloc", action="store_true", help="Also record the peak of Python allocations per rerun (slower)")
+    parser.add_argument("--json", help="Write the per-rerun results to this file")
+    args = parser.parse_args(argv)
+
+    if args.rows and not args.data_dir:
+        return bench.run_in(bench.synthetic_dir(args.rows, args.simulant_rows, args.seed), argv, module="lunar_regolith.latency")
+
+    def progress(result):
+        status = "FAIL" if result["errors"] or result["seconds"] > result["budget"] else "ok"
+        print(
+            f"{result['seconds'] * 1000:9.1f} {result['budget'] * 1000:9.0f}"
+            f"{_mb(result['rss_mb'])}{_mb(result['rss_delta_mb'])}{_mb(result['peak_mb'])}  {status:4s}  {result['step']}"
+        )
+
+    print(f"{'ms':>9s} {'budget':>9s}{'rss MB':>9s}{'Δrss MB':>9s}{'peak MB':>9s}")
+    results = run(args.scale, dict(args.budget), args.tracemalloc, progress)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=1)
+    failed = failures(results)
+    for failure in failed:
+        print(f"FAILED {failure}")
+    if not failed:
+        print(f"{len(results)} reruns within budget")
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,229 @@
+"""Prometheus metrics of the app process, in the text exposition format.
+
+    LUNAR_REGOLITH_METRICS_PORT=9464    serve http://127.0.0.1:9464/metrics from the app process
+    LUNAR_REGOLITH_METRICS_FILE=path    rewrite a textfile (node_exporter textfile collector)
+                                        after reruns, at most every METRICS_FILE_INTERVAL seconds;
+                                        {pid} in the path is replaced by the process id
+
+With several app processes (see shared.py) only the first one binds the port; the others
+log a warning and keep recording, so give each worker its own file, e.g.
+LUNAR_REGOLITH_METRICS_FILE=/var/lib/node_exporter/lunar_regolith-{pid}.prom.
+
+The rerun metrics come from the reruns recorded by perf.py (the app records every rerun
+while metrics are on): latency per section, stage and dataset build step, rows
+returned by the filters and figure payload bytes. Cache hits and misses of every
+in-process cache (the functools caches of the package modules and the shared disk
+cache) and the resident set size are read when the metrics are rendered. server.py
+answers GET /metrics with the same text.
+"""
+import bisect
+import logging
+import os
+import sys
+import tempfile
+import threading
+import time
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from . import perf
+
+PORT = int(os.environ.get("LUNAR_REGOLITH_METRICS_PORT", 0))
+METRICS_FILE = os.environ.get("LUNAR_REGOLITH_METRICS_FILE")
+METRICS_FILE_INTERVAL = 10.0
+ENABLED = bool(PORT or METRICS_FILE) or os.environ.get("LUNAR_REGOLITH_METRICS", "0") not in ("0", "false", "no", "")
+
+log = logging.getLogger("lunar_regolith.metrics")
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+ROW_BUCKETS = (0, 10, 100, 1_000, 10_000, 100_000, 1_000_000, 10_000_000)
+BYTE_BUCKETS = (1_000, 10_000, 100_000, 1_000_000, 10_000_000, 100_000_000)
+
+
+# --------------------------- Histograms ---------------------------
+def _labels(labels):
+    if not labels:
+        return ""
+    escaped = (str(value).replace("\\", r"\\").replace("\n", r"\n").replace('"', r'\"') for value in labels.values())
+    return "{" + ",".join(f'{key}="{value}"' for key, value in zip(labels, escaped)) + "}"
+
+def _number(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+class Histogram:
+    """Cumulative-bucket histogram per label value, safe to observe from several threads."""
+
+    def __init__(self, name, help_text, label, buckets):
+        self.name, self.help, self.label, self.buckets = name, help_text, label, tuple(buckets)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, label_value, value):
+        with self._lock:
+            counts, totals = self._series.setdefault(label_value, ([0] * (len(self.buckets) + 1), [0.0, 0]))
+            counts[bisect.bisect_left(self.buckets, value)] += 1
+            totals[0] += value
+            totals[1] += 1
+
+    def totals(self, label_value):
+        """(sum, number of observations) of one label value."""
+        with self._lock:
+            _, (total, n) = self._series.get(label_value, (None, (0.0, 0)))
+        return total, n
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series = {key: (list(counts), list(totals)) for key, (counts, totals) in self._series.items()}
+        for label_value, (counts, (total, n)) in sorted(series.items()):
+            cumulative = 0
+            for bound, count in zip((*self.buckets, float("inf")), counts):
+                cumulative += count
+                lines.append(f"{self.name}_bucket{_labels({self.label: label_value, 'le': _number(bound)})} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels({self.label: label_value})} {_number(float(total))}")
+            lines.append(f"{self.name}_count{_labels({self.label: label_value})} {n}")
+        return lines
+
+
+RERUN_SECONDS = Histogram("lunar_regolith_rerun_seconds", "Rerun latency of an app section.", "section", LATENCY_BUCKETS)
+STAGE_SECONDS = Histogram("lunar_regolith_stage_seconds", "Time of an instrumented stage within a rerun.", "stage", LATENCY_BUCKETS)
+LOAD_SECONDS = Histogram(
+    "lunar_regolith_dataset_load_seconds", "Build time of a dataset or build step on a cold load.", "step", LATENCY_BUCKETS,
+)
+FILTERED_ROWS = Histogram("lunar_regolith_filtered_rows", "Rows returned by the filters in a rerun.", "section", ROW_BUCKETS)
+FIGURE_BYTES = Histogram("lunar_regolith_figure_bytes", "Figure JSON sent to the browser in a rerun.", "section", BYTE_BUCKETS)
+HISTOGRAMS = (RERUN_SECONDS, STAGE_SECONDS, LOAD_SECONDS, FILTERED_ROWS, FIGURE_BYTES)
+
+def record_rerun(rerun):
+    """perf.end() listener: the rerun's latency, stages, filtered rows and figure bytes."""
+    RERUN_SECONDS.observe(rerun.section, rerun.total)
+    for name, (seconds, _) in rerun.stages.items():
+        if name.startswith("load "):
+            LOAD_SECONDS.observe(name[len("load "):], seconds)
+        else:
+            STAGE_SECONDS.observe(name, seconds)
+    FILTERED_ROWS.observe(rerun.section, rerun.counters.get("filtered rows", 0))
+    if "figure bytes" in rerun.counters:
+        FIGURE_BYTES.observe(rerun.section, rerun.counters["figure bytes"])
+    if METRICS_FILE:
+        write_file_throttled()
+
+
+# --------------------------- Read at render time ---------------------------
+def cache_stats():
+    """{cache: (hits, misses)} of the functools caches of the package and the disk cache."""
+    stats = {}
+    for module_name, module in sorted(sys.modules.items()):
+        if not module_name.startswith(__package__ + ".") or module is None:
+            continue
+        for name, obj in vars(module).items():
+            if callable(getattr(obj, "cache_info", None)) and getattr(obj, "__module__", None) == module_name:
+                info = obj.cache_info()
+                stats[f"{module_name.rsplit('.', 1)[-1]}.{name}"] = (info.hits, info.misses)
+    diskcache = sys.modules.get(__package__ + ".diskcache")
+    if diskcache is not None and diskcache._cache is not None:
+        stats["diskcache"] = (diskcache._cache.hits, diskcache._cache.misses)
+    return stats
+
+def resident_bytes():
+    """Current resident set size of the process, None where it cannot be read."""
+    try:
+        import psutil
+
+        return psutil.Process().memory_info().rss
+    except ImportError:
+        pass
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
+
+def render():
+    """All metrics in the Prometheus text exposition format."""
+    lines = []
+    for histogram in HISTOGRAMS:
+        lines.extend(histogram.render())
+    stats = cache_stats()
+    for kind, index in (("hits", 0), ("misses", 1)):
+        name = f"lunar_regolith_cache_{kind}_total"
+        lines += [f"# HELP {name} Cache {kind} per cache.", f"# TYPE {name} counter"]
+        lines += [f"{name}{_labels({'cache': cache})} {counts[index]}" for cache, counts in stats.items()]
+    rss = resident_bytes()
+    if rss is not None:
+        lines += [
+            "# HELP lunar_regolith_process_resident_memory_bytes Resident set size of the process.",
+            "# TYPE lunar_regolith_process_resident_memory_bytes gauge",
+            f"lunar_regolith_process_resident_memory_bytes {rss}",
+        ]
+    return "\n".join(lines) + "\n"
+
+
+# --------------------------- Export ---------------------------
+def write_file(path=None):
+    """Atomically rewrite the metrics textfile."""
+    path = (path or METRICS_FILE).replace("{pid}", str(os.getpid()))
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".", suffix=".prom")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(render())
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+
+_last_write = 0.0
+_write_lock = threading.Lock()
+
+def write_file_throttled():
+    global _last_write
+    with _write_lock:
+        if time.monotonic() - _last_write < METRICS_FILE_INTERVAL:
+            return
+        _last_write = time.monotonic()
+    write_file()
+
+
+class MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0].rstrip("/") != "/metrics":
+            self.send_error(HTTPStatus.NOT_FOUND)
+            return
+        data = render().encode("utf-8")
+        self.send_response(HTTPStatus.OK)
+        self.send_header("Content-Type", CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):  # scrapes are not worth a log line each
+        pass
+
+_server = None
+_server_error = None
+_server_lock = threading.Lock()
+
+def start(port=PORT, host="127.0.0.1"):
+    """Record every rerun and, with a port, serve /metrics from a daemon thread (once per process).
+
+    When the port is taken (another worker of the app serves it) the error is logged
+    once and None returned, the reruns are recorded all the same.
+    """
+    global _server, _server_error
+    with _server_lock:
+        if record_rerun not in perf.listeners:
+            perf.listeners.append(record_rerun)
+        if port and _server is None and _server_error is None:
+            try:
+                _server = ThreadingHTTPServer((host, port), MetricsHandler)
+            except OSError as e:
+                _server_error = e
+                log.warning("metrics: not serving %s:%s from process %s (%s), reruns are still recorded", host, port, os.getpid(), e)
+                return None
+            threading.Thread(target=_server.serve_forever, name="metrics", daemon=True).start()
+        return _server
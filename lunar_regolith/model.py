@@ -0,0 +1,99 @@
+"""Normalized (star schema) model of the regolith and simulant tables.
+
+Dimension tables hold each mission/site, simulant and source once; the measurement
+fact table keeps one row per CSV row with integer keys into them:
+
+    missions      mission_id, Mission, Location, Terrain, Year, Type of mission
+    simulants     simulant_id, Simulant, Developer, Agency, Year, Type of simulant
+    sources       source_id, Source, Year of publication, DOI / URL
+    measurements  measurement_id, origin, mission_id, simulant_id, source_id,
+                  Test, Test location, <property columns>
+
+Keys are row positions in their dimension (-1 where a measurement has none, e.g.
+mission_id of a simulant row), so the wide views are rebuilt with positional takes.
+The CSV files stay the editing format; data.py builds and caches the model from them.
+"""
+import numpy as np
+import pandas as pd
+
+from . import schema
+
+MISSION_COLUMNS = ["Mission", "Location", "Terrain", "Year", "Type of mission"]
+SIMULANT_COLUMNS = ["Simulant", "Developer", "Agency", "Year", "Type of simulant"]
+SOURCE_COLUMNS = ["Source", "Year of publication", "DOI / URL"]
+MEASUREMENT_COLUMNS = ["Test", "Test location"]
+REGOLITH_PROPERTIES = schema.interval_columns("regolith")
+SIMULANT_PROPERTIES = schema.interval_columns("simulants")
+
+# Column order of the wide views, as in the CSV files
+REGOLITH_VIEW_COLUMNS = schema.table_columns("regolith")
+SIMULANT_VIEW_COLUMNS = schema.table_columns("simulants")
+
+def build_dimension(frames, columns, key):
+    """Distinct rows of `columns` over frames (first appearance order, NaN equal to NaN).
+
+    Returns (dimension table, list of key arrays, one per frame).
+    """
+    stacked = pd.concat([frame[columns] for frame in frames], ignore_index=True)
+    ids = stacked.groupby(columns, dropna=False, sort=False).ngroup().to_numpy(dtype=np.int32)
+    first = np.unique(ids, return_index=True)[1]
+    dim = stacked.iloc[first].reset_index(drop=True)
+    dim.insert(0, key, np.arange(len(dim), dtype=np.int32))
+    bounds = np.cumsum([0] + [len(frame) for frame in frames])
+    return dim, [ids[start:stop] for start, stop in zip(bounds[:-1], bounds[1:])]
+
+def build_model(regolith, simulants):
+    """Star schema tables from the raw (string) regolith and simulant frames."""
+    missions, (mission_ids,) = build_dimension([regolith], MISSION_COLUMNS, "mission_id")
+    simulant_dim, (simulant_ids,) = build_dimension([simulants], SIMULANT_COLUMNS, "simulant_id")
+    sources, (regolith_sources, simulant_sources) = build_dimension(
+        [regolith, simulants], SOURCE_COLUMNS, "source_id"
+    )
+    properties = list(dict.fromkeys(REGOLITH_PROPERTIES + SIMULANT_PROPERTIES))
+    no_key = np.int32(-1)
+    regolith_facts = pd.DataFrame({
+        "origin": "regolith",
+        "mission_id": mission_ids,
+        "simulant_id": no_key,
+        "source_id": regolith_sources,
+        **{col: regolith[col].to_numpy() for col in MEASUREMENT_COLUMNS + REGOLITH_PROPERTIES},
+    })
+    simulant_facts = pd.DataFrame({
+        "origin": "simulant",
+        "mission_id": no_key,
+        "simulant_id": simulant_ids,
+        "source_id": simulant_sources,
+        "Test": simulants["Test"].to_numpy(),
+        **{col: simulants[col].to_numpy() for col in SIMULANT_PROPERTIES},
+    })
+    measurements = pd.concat([regolith_facts, simulant_facts], ignore_index=True)
+    measurements = measurements[["origin", "mission_id", "simulant_id", "source_id", *MEASUREMENT_COLUMNS, *properties]]
+    measurements.insert(0, "measurement_id", np.arange(len(measurements), dtype=np.int32))
+    measurements["origin"] = measurements["origin"].astype("category")
+    for key in ("mission_id", "simulant_id", "source_id"):
+        measurements[key] = measurements[key].astype(np.int32)
+    return {"missions": missions, "simulants": simulant_dim, "sources": sources, "measurements": measurements}
+
+
+def join_view(model, origin, dimensions, columns):
+    """Wide frame of one origin's measurements joined with the given (table, key) dimensions."""
+    facts = model["measurements"]
+    facts = facts[(facts["origin"] == origin).to_numpy()].reset_index(drop=True)
+    parts = [facts]
+    for table, key in dimensions:
+        dim = model[table]
+        parts.append(dim.drop(columns=key).take(facts[key].to_numpy()).reset_index(drop=True))
+    wide = pd.concat(parts, axis=1)
+    return wide[columns]
+
+def regolith_view(model):
+    """The regolith table as read from Dataset_Regolith.csv."""
+    return join_view(model, "regolith", [("missions", "mission_id"), ("sources", "source_id")], REGOLITH_VIEW_COLUMNS)
+
+def simulant_view(model):
+    """The simulant table as read from Dataset_Simulants.csv."""
+    return join_view(model, "simulant", [("simulants", "simulant_id"), ("sources", "source_id")], SIMULANT_VIEW_COLUMNS)
+
+def model_memory(model):
+    """KB used by each table of the model."""
+    return {name: float(table.memory_usage(deep=True, index=False).sum()) / 1024 for name, table in model.items()}
@@ -0,0 +1,263 @@
+"""Parity suite of the query backends against the pandas reference.
+
+    python -m lunar_regolith.parity                      every installed backend
+    python -m lunar_regolith.parity --backends polars --datasets all
+
+Filter cases are generated from each dataset's registry entry and statistics (every
+facet with one and two options, every interval range, the year range, a combination
+and an option that does not exist). For each case filter, count, stream, sorted pages
+every aggregate of the facet columns and the live facet counts are compared after
+normalizing dtypes (a category and a string column holding the same values are
+equal), the column statistics of the sidebar once per dataset; the rows of filter,
+stream and pages must also have the reference's kind of dtype per column (text,
+integer, float, ...), the streamed head and every batch alike, and the stream must
+convert to Arrow record batches as the Parquet and Arrow exports do. Every dataset is
+also exported in every available format through each backend (the reference
+included) with the export panel's default columns. Exits with 1 when a backend
+differs or an export fails.
+"""
+import argparse
+import io
+import sys
+
+import numpy as np
+import pandas as pd
+
+from .backends import AGGREGATES, available_backends, get_backend
+from .data import DATASETS, column_stats, dataset_spec, facet_index, load_dataset
+from .export import DERIVED_SUFFIXES, TEXT_FORMATS, _arrow_batches, available_formats, with_derived_columns, write_chunks
+from .query import YEAR_COLUMN
+
+
+def normalize(df):
+    """Frame with text columns as objects (None for missing) and numbers as float64."""
+    out = df.reset_index(drop=True).copy()
+    for col in out.columns:
+        if pd.api.types.is_bool_dtype(out[col]):
+            continue
+        if pd.api.types.is_numeric_dtype(out[col]) and not isinstance(out[col].dtype, pd.CategoricalDtype):
+            out[col] = out[col].astype(np.float64)
+        else:
+            values = out[col].astype(object)
+            out[col] = values.where(values.notna(), None)
+    return out
+
+def same_frames(expected, actual, exact=True):
+    """None when the frames hold the same values, else the difference as text."""
+    try:
+        pd.testing.assert_frame_equal(
+            normalize(expected), normalize(actual), check_dtype=False, check_exact=exact, rtol=1e-9,
+        )
+    except AssertionError as e:
+        return str(e).strip().splitlines()[0]
+    return None
+
+def dtype_kind(dtype):
+    """'text' for categories, strings and objects, else the numpy kind ('i', 'f', 'b', 'M', ...)."""
+    if isinstance(dtype, pd.CategoricalDtype) or pd.api.types.is_string_dtype(dtype):
+        return "text"
+    return np.dtype(dtype).kind
+
+def same_dtypes(expected, actual):
+    """None when every column has the same kind of dtype in both frames, else the differences as text."""
+    differences = [
+        f"{col}: {expected[col].dtype} != {actual[col].dtype}"
+        for col in expected.columns
+        if col in actual.columns and dtype_kind(expected[col].dtype) != dtype_kind(actual[col].dtype)
+    ]
+    return "dtypes differ, " + ", ".join(differences) if differences else None
+
+def plain(value):
+    """Statistics or facet counts with NumPy scalars as Python ones and tuples as lists."""
+    if isinstance(value, dict):
+        return {key: plain(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [plain(item) for item in value]
+    return value.item() if isinstance(value, np.generic) else value
+
+def same_values(expected, actual):
+    """None when two statistics or facet counts are equal, else the first difference as text."""
+    expected, actual = plain(expected), plain(actual)
+    if expected == actual:
+        return None
+    for key in expected:
+        if expected[key] != actual.get(key):
+            return f"{key}: {expected[key]!r} != {actual.get(key)!r}"
+    return f"unexpected keys {sorted(set(actual) - set(expected))}"
+
+def arrow_rows(head, chunks):
+    """The streamed chunks converted to Arrow record batches like the exports, back as one frame."""
+    import pyarrow as pa
+
+    schema, batches = _arrow_batches(head, chunks)
+    return pa.Table.from_batches(list(batches), schema=schema).to_pandas()
+
+
+# --- Cases ---
+def middle(low, high):
+    return (low + (high - low) / 4, low + 3 * (high - low) / 4)
+
+def filter_cases(name):
+    """(label, filter keyword arguments) cases of a dataset."""
+    spec = dataset_spec(name)
+    stats = column_stats(name)
+    index = facet_index(name)
+    cases = [("no filter", {})]
+    first_facet = None
+    for key, col in spec["facets"].items():
+        options = [option for option in index[col]["options"] if not pd.isna(option)]
+        if options:
+            first_facet = first_facet or {key: options[:1]}
+            cases.append((f"{key}={options[0]}", {"facets": {key: options[:1]}}))
+            cases.append((f"{key}={'|'.join(map(str, options[:2]))}", {"facets": {key: options[:2]}}))
+    first_range = None
+    for col in spec["ranges"]:
+        low, high = stats[f"{col}_min"]["min"], stats[f"{col}_max"]["max"]
+        if low is not None and high is not None:
+            bounds = middle(low, high)
+            first_range = first_range or {col: bounds}
+            cases.append((f"{col} in {bounds[0]:g}:{bounds[1]:g}", {"ranges": {col: bounds}}))
+            cases.append((f"{col} in {bounds[0]:g}:", {"ranges": {col: (bounds[0], np.inf)}}))
+    year = None
+    if YEAR_COLUMN in stats and stats[YEAR_COLUMN].get("min") is not None:
+        year = tuple(float(bound) for bound in middle(stats[YEAR_COLUMN]["min"], stats[YEAR_COLUMN]["max"]))
+        cases.append((f"year {year[0]:g}:{year[1]:g}", {"year": year}))
+    combined = {"facets": first_facet, "ranges": first_range, "year": year}
+    cases.append(("combined", {key: value for key, value in combined.items() if value}))
+    if spec["facets"]:
+        key = next(iter(spec["facets"]))
+        cases.append((f"{key}=<missing option>", {"facets": {key: ["no such option"]}}))
+    return cases
+
+def sort_columns(name):
+    spec = dataset_spec(name)
+    columns = [None, *list(spec["facets"].values())[:1], *[f"{col}_max" for col in spec["ranges"][:1]]]
+    if YEAR_COLUMN in column_stats(name):
+        columns.append(YEAR_COLUMN)
+    return columns
+
+def aggregate_pairs(name):
+    spec = dataset_spec(name)
+    values = [f"{col}_max" for col in spec["ranges"][:2]] or [YEAR_COLUMN]
+    return [(by, value) for by in spec["facets"].values() for value in values]
+
+
+# --- Checks ---
+def check_backend(backend, reference, name):
+    """(number of checks, list of failure messages) of one backend on one dataset."""
+    checks, failures = 0, []
+
+    def compare(label, expected, actual, exact=True):
+        nonlocal checks
+        checks += 1
+        difference = same_frames(expected, actual, exact)
+        if difference:
+            failures.append(f"{backend.name} {name} {label}: {difference}")
+
+    def compare_dtypes(label, expected, *frames):
+        nonlocal checks
+        checks += 1
+        for frame in frames:
+            difference = same_dtypes(expected, frame)
+            if difference:
+                failures.append(f"{backend.name} {name} {label}: {difference}")
+                break
+
+    def compare_values(label, expected, actual):
+        nonlocal checks
+        checks += 1
+        difference = same_values(expected, actual)
+        if difference:
+            failures.append(f"{backend.name} {name} {label}: {difference}")
+
+    compare_values("column stats", reference.column_stats(name), backend.column_stats(name))
+    arrow = "arrow" in available_formats()
+    for label, filters in filter_cases(name):
+        expected = reference.filter(name, **filters)
+        actual = backend.filter(name, **filters)
+        compare(f"[{label}] filter", expected, actual)
+        compare_dtypes(f"[{label}] filter", expected, actual)
+        checks += 1
+        if backend.count(name, **filters) != len(expected):
+            failures.append(f"{backend.name} {name} [{label}] count: {backend.count(name, **filters)} != {len(expected)}")
+        head, chunks = backend.stream(name, batch_size=7, **filters)
+        chunks = list(chunks)
+        compare(f"[{label}] stream", expected, pd.concat([head, *chunks], ignore_index=True))
+        compare_dtypes(f"[{label}] stream", expected, head, *chunks)
+        if arrow:
+            head, chunks = backend.stream(name, batch_size=7, **filters)
+            try:
+                compare(f"[{label}] stream to arrow", expected, arrow_rows(head, chunks))
+            except Exception as e:
+                checks += 1
+                failures.append(f"{backend.name} {name} [{label}] stream to arrow: {type(e).__name__}: {e}")
+        for sort in sort_columns(name):
+            for descending in (False, True):
+                args = (name, 1, 5, sort, descending)
+                (page, total), (actual, actual_total) = reference.page(*args, **filters), backend.page(*args, **filters)
+                compare(f"[{label}] page sort={sort} descending={descending}", page, actual)
+                compare_dtypes(f"[{label}] page sort={sort} descending={descending}", page, actual)
+                if total != actual_total:
+                    failures.append(f"{backend.name} {name} [{label}] page total: {actual_total} != {total}")
+        compare_values(f"[{label}] facet counts", reference.facet_counts(name, **filters), backend.facet_counts(name, **filters))
+        for by, value in aggregate_pairs(name):
+            for agg in AGGREGATES:
+                args = (name, by, value, agg)
+                compare(f"[{label}] {agg}({value}) by {by}",
+                        reference.aggregate(*args, **filters), backend.aggregate(*args, **filters), exact=False)
+    return checks, failures
+
+def default_export_columns(name):
+    """Columns the export panel writes by default: the dataset's own columns plus their derived ones."""
+    derived = {f"{col}_{suffix}" for col in dataset_spec(name)["ranges"] for suffix in DERIVED_SUFFIXES}
+    return with_derived_columns(name, [col for col in load_dataset(name).columns if col not in derived])
+
+def check_exports(backend, name):
+    """(number of checks, list of failure messages) of exporting a dataset in every format."""
+    columns = default_export_columns(name)
+    checks, failures = 0, []
+    for fmt in available_formats():
+        checks += 1
+        stream = io.StringIO() if fmt in TEXT_FORMATS else io.BytesIO()
+        try:
+            head, chunks = backend.stream(name, columns=columns, batch_size=7)
+            write_chunks(head, chunks, fmt, stream)
+        except Exception as e:
+            failures.append(f"{backend.name} {name} export {fmt}: {type(e).__name__}: {e}")
+    return checks, failures
+
+def run(backends, datasets, reference="pandas"):
+    reference_backend = get_backend(reference)
+    all_failures = []
+    for backend_name in backends:
+        backend = get_backend(backend_name)
+        for name in datasets:
+            checks, failures = check_backend(backend, reference_backend, name)
+            print(f"{backend_name:8s} {name:15s} {checks - len(failures)}/{checks} checks match {reference}")
+            all_failures.extend(failures)
+    for backend_name in [reference, *backends]:
+        backend = get_backend(backend_name)
+        for name in datasets:
+            checks, failures = check_exports(backend, name)
+            print(f"{backend_name:8s} {name:15s} {checks - len(failures)}/{checks} export formats written")
+            all_failures.extend(failures)
+    return all_failures
+
+def main(argv=None):
+    others = [name for name in available_backends() if name != "pandas"]
+    parser = argparse.ArgumentParser(
+        prog="python -m lunar_regolith.parity",
+        description="Check that the query backends return the same results as the pandas path.",
+    )
+    parser.add_argument("--backends", nargs="+", choices=others, default=others, help="Backends to check (default: all installed)")
+    parser.add_argument("--datasets", nargs="+", choices=list(DATASETS), default=list(DATASETS))
+    args = parser.parse_args(argv)
+    failures = run(args.backends, args.datasets)
+    for failure in failures[:50]:
+        print(failure)
+    if len(failures) > 50:
+        print(f"... {len(failures) - 50} more")
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,201 @@
+"""Per-rerun stage timings and counters, for the developer panel and structured logs.
+
+    with perf.stage("filter"):
+        ...
+
+    @perf.timed("scatter")
+    def mission_scatter(...):
+        ...
+
+    perf.count("filtered rows", len(df))
+
+A rerun is recorded between perf.begin(section) and perf.end(), or over the block of
+perf.recording(section), which ends it however the block exits. perf.end() logs it as one
+JSON line on the "lunar_regolith.perf" logger (stderr, or LUNAR_REGOLITH_PERF_LOG, unless
+the logger is configured otherwise) and keeps the last RECENT_RERUNS in memory. Stages
+may nest and are inclusive; a stage entered several times adds up its time and calls.
+
+The recorder lives in a context variable, so outside a recorded rerun a timer costs a
+lookup and nothing else, and the instrumentation stays in place when it is off. Work
+handed to a thread pool is recorded when submitted with the caller's context (see
+data.load_datasets). Recording is on with LUNAR_REGOLITH_PERF=1; the app also records
+the reruns of a session opened with ?dev=1, which shows the panel.
+"""
+import contextlib
+import contextvars
+import datetime
+import functools
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+
+ENABLED = os.environ.get("LUNAR_REGOLITH_PERF", "0") not in ("0", "false", "no", "")
+LOG_FILE = os.environ.get("LUNAR_REGOLITH_PERF_LOG")
+RECENT_RERUNS = 50
+
+log = logging.getLogger("lunar_regolith.perf")
+
+_current = contextvars.ContextVar("lunar_regolith_rerun", default=None)
+# callables receiving every ended rerun (e.g. metrics.record_rerun)
+listeners = []
+_recent = deque(maxlen=RECENT_RERUNS)
+_NO_STAGE = contextlib.nullcontext()
+
+
+class Rerun:
+    """Stage timings {name: [seconds, calls]} and counters {name: value} of one rerun."""
+
+    def __init__(self, section):
+        self.section = section
+        self.started = datetime.datetime.now(datetime.timezone.utc)
+        self.stages, self.counters = {}, {}
+        self.total = None
+        self._start = time.perf_counter()
+        self._lock = threading.Lock()
+        self._token = None
+
+    def add(self, name, seconds):
+        with self._lock:
+            entry = self.stages.setdefault(name, [0.0, 0])
+            entry[0] += seconds
+            entry[1] += 1
+
+    def count(self, name, n=1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def as_dict(self):
+        return {
+            "event": "rerun",
+            "section": self.section,
+            "started": self.started.isoformat(timespec="milliseconds"),
+            "total_ms": None if self.total is None else round(self.total * 1000, 3),
+            "stages": {name: {"ms": round(seconds * 1000, 3), "calls": calls} for name, (seconds, calls) in self.stages.items()},
+            "counters": dict(self.counters),
+        }
+
+    def frame(self):
+        """Stages as a frame: stage, ms, calls and share of the rerun's total time."""
+        import pandas as pd
+
+        total = self.total or (time.perf_counter() - self._start)
+        rows = [(name, seconds * 1000, calls, seconds / total if total else 0.0) for name, (seconds, calls) in self.stages.items()]
+        df = pd.DataFrame(rows, columns=["stage", "ms", "calls", "share"])
+        return df.sort_values("ms", ascending=False, ignore_index=True)
+
+    def counters_frame(self):
+        import pandas as pd
+
+        return pd.DataFrame(list(self.counters.items()), columns=["counter", "value"])
+
+
+class _Stage:
+    __slots__ = ("rerun", "name", "start")
+
+    def __init__(self, rerun, name):
+        self.rerun, self.name = rerun, name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.rerun.add(self.name, time.perf_counter() - self.start)
+        return False
+
+
+# --------------------------- Recording ---------------------------
+def current():
+    """The rerun being recorded in this context, None when recording is off."""
+    return _current.get()
+
+def begin(section):
+    rerun = Rerun(section)
+    rerun._token = _current.set(rerun)
+    return rerun
+
+def end(rerun=None):
+    """Close the rerun (the current one by default), log it and keep it in recent()."""
+    rerun = rerun or _current.get()
+    if rerun is None:
+        return None
+    rerun.total = time.perf_counter() - rerun._start
+    try:
+        _current.reset(rerun._token)
+    except ValueError:  # ended from another context
+        _current.set(None)
+    _recent.append(rerun)
+    _configure_logging()
+    log.info(json.dumps(rerun.as_dict(), default=str))
+    for listener in listeners:
+        listener(rerun)
+    return rerun
+
+@contextlib.contextmanager
+def recording(section, enabled=True):
+    """Record the block as a rerun of `section` (yields it, None when not enabled).
+
+    The rerun is ended even when the block raises, e.g. when Streamlit stops the script
+    with a RerunException or StopException because a widget changed mid-run.
+    """
+    rerun = begin(section) if enabled else None
+    try:
+        yield rerun
+    finally:
+        if rerun is not None:
+            end(rerun)
+
+def recent():
+    """The last RECENT_RERUNS recorded reruns of this process, oldest first."""
+    return list(_recent)
+
+def history():
+    """Frame of the recent reruns: started (UTC time), section and ms."""
+    import pandas as pd
+
+    rows = [(r.started.strftime("%H:%M:%S"), r.section, r.total * 1000) for r in _recent]
+    return pd.DataFrame(rows, columns=["started", "section", "ms"])
+
+def stage(name):
+    """Context manager timing a stage of the current rerun (a no-op when none is recorded)."""
+    rerun = _current.get()
+    if rerun is None:
+        return _NO_STAGE
+    return _Stage(rerun, name)
+
+def timed(name):
+    """Decorator timing every call of a function as a stage."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            rerun = _current.get()
+            if rerun is None:
+                return func(*args, **kwargs)
+            with _Stage(rerun, name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+def count(name, n=1):
+    rerun = _current.get()
+    if rerun is not None:
+        rerun.count(name, n)
+
+
+_logging_configured = False
+
+def _configure_logging():
+    # a logger the host application configured keeps its handlers
+    global _logging_configured
+    if _logging_configured:
+        return
+    _logging_configured = True
+    if not log.handlers:
+        handler = logging.FileHandler(LOG_FILE) if LOG_FILE else logging.StreamHandler()
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        log.addHandler(handler)
+        log.setLevel(logging.INFO)
+        log.propagate = False
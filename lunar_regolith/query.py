@@ -0,0 +1,179 @@
+"""Filter semantics of the app as plain functions over the prepared datasets.
+
+    >>> from lunar_regolith import query
+    >>> query.filter_dataset("regolith", facets={"mission_group": ["Apollo"]},
+    ...                      ranges={"Cohesion (kPa)": (0.5, 3.0)})
+
+Facet filters keep rows whose value is one of the selected options (an empty
+selection means no filter, like an empty multiselect). Interval filters keep
+rows whose [_min, _max] bounds overlap the requested range and keep rows
+without a value visible. The publication year filter drops rows without a year.
+"""
+import numpy as np
+
+from . import perf
+from .data import dataset_spec, facet_index, load_dataset, sort_index
+
+YEAR_COLUMN = "Year of publication"
+
+
+# --- Row masks ---
+def numeric_range_mask(df, col_min, col_max, min_val, max_val):
+    """Interval overlap test keeping NaNs visible."""
+    return (
+        ((df[col_max].ge(min_val)) | (df[col_max].isna())) &
+        ((df[col_min].le(max_val)) | (df[col_min].isna()))
+    ).to_numpy()
+
+def filter_numeric_range(df, col_min, col_max, min_val, max_val):
+    """Filter keeping NaNs visible."""
+    return df[numeric_range_mask(df, col_min, col_max, min_val, max_val)]
+
+def year_mask(df, min_year, max_year, col=YEAR_COLUMN):
+    return ((df[col] >= min_year) & (df[col] <= max_year)).to_numpy()
+
+def facet_mask(facet, selected):
+    """Rows whose facet value is one of `selected`, from a facet of build_facet_index."""
+    codes = [facet["lookup"][value] for value in selected if value in facet["lookup"]]
+    return np.isin(facet["codes"], codes)
+
+def facet_column(name, key):
+    """Column behind a facet filter, given either its filter name ("terrain") or column."""
+    facets = dataset_spec(name)["facets"]
+    if key in facets:
+        return facets[key]
+    if key in facets.values():
+        return key
+    raise KeyError(f"{key!r} is not a facet of {name!r}, expected one of: {', '.join(facets)}")
+
+def filter_masks(name, facets=None, ranges=None, year=None):
+    """Row masks of the active filters, keyed by facet column / interval column / year column."""
+    df = load_dataset(name)
+    index = facet_index(name)
+    masks = {}
+    for key, selected in (facets or {}).items():
+        if selected:
+            col = facet_column(name, key)
+            masks[col] = facet_mask(index[col], selected)
+    for col, bounds in (ranges or {}).items():
+        if bounds is not None:
+            masks[col] = numeric_range_mask(df, f"{col}_min", f"{col}_max", *bounds)
+    if year is not None:
+        masks[YEAR_COLUMN] = year_mask(df, *year)
+    return masks
+
+def combine_masks(masks, n_rows):
+    mask = np.ones(n_rows, dtype=bool)
+    for m in masks.values():
+        mask &= m
+    return mask
+
+
+# --- Filter parameters as text (command line, query strings) ---
+def parse_bounds(text):
+    """'MIN:MAX' with either side optional -> (min, max)."""
+    low, sep, high = text.partition(":")
+    if not sep:
+        raise ValueError(f"expected MIN:MAX, got {text!r}")
+    try:
+        return (float(low) if low else -np.inf, float(high) if high else np.inf)
+    except ValueError:
+        raise ValueError(f"expected numbers in MIN:MAX, got {text!r}")
+
+def parse_range(text):
+    """'COLUMN=MIN:MAX' -> (column, (min, max))."""
+    column, sep, bounds = text.rpartition("=")
+    if not sep or not column.strip():
+        raise ValueError(f"expected COLUMN=MIN:MAX, got {text!r}")
+    return column.strip(), parse_bounds(bounds)
+
+
+# --- Queries ---
+def filter_dataset(name, facets=None, ranges=None, year=None, columns=None):
+    """Rows of a prepared dataset kept by the app's filters.
+
+    facets maps a filter name or facet column to the selected options, ranges maps an
+    interval column (e.g. "Cohesion (kPa)") to (min, max), year is a (min, max) range of
+    publication years and columns optionally restricts the returned columns. Without any
+    active filter or projection the cached frame itself is returned, treat it as read-only.
+    """
+    df = load_dataset(name)
+    with perf.stage("filter"):
+        masks = filter_masks(name, facets, ranges, year)
+        n_rows = len(df)
+        # project before masking so only the requested columns are copied
+        if columns is not None:
+            df = df[list(columns)]
+        if masks:
+            df = df[combine_masks(masks, n_rows)]
+    perf.count("filtered rows", len(df))
+    return df
+
+def filtered_positions(name, facets=None, ranges=None, year=None, sort=None, descending=False):
+    """Row positions kept by the filters, in dataset order or sorted by one column (NaN last)."""
+    n_rows = len(load_dataset(name))
+    masks = filter_masks(name, facets, ranges, year)
+    if sort is None:
+        return np.flatnonzero(combine_masks(masks, n_rows)) if masks else np.arange(n_rows)
+    order = sort_index(name, sort, descending)
+    return order[combine_masks(masks, n_rows)[order]] if masks else order
+
+def page_dataset(name, page=0, page_size=50, sort=None, descending=False, columns=None,
+                 facets=None, ranges=None, year=None):
+    """One page of the filtered (and optionally sorted) rows, with the total row count.
+
+    Only the rows and columns of the page are taken from the cached frame, so the cost
+    depends on the page size rather than on the size of the filtered result.
+    """
+    df = load_dataset(name)
+    positions = filtered_positions(name, facets, ranges, year, sort, descending)
+    rows = positions[page * page_size:(page + 1) * page_size]
+    if columns is None:
+        return df.iloc[rows], len(positions)
+    col_positions = df.columns.get_indexer(list(columns))
+    if (col_positions < 0).any():
+        missing = [col for col, i in zip(columns, col_positions) if i < 0]
+        raise KeyError(f"unknown column(s): {', '.join(missing)}")
+    return df.iloc[rows, col_positions], len(positions)
+
+def to_arrow(df):
+    """pyarrow Table of a (filtered) frame, categories become dictionary columns."""
+    import pyarrow as pa
+
+    return pa.Table.from_pandas(df, preserve_index=False)
+
+def query(name, facets=None, ranges=None, year=None, columns=None, as_arrow=False):
+    """filter_dataset returning either a pandas frame or, with as_arrow=True, an Arrow table."""
+    df = filter_dataset(name, facets, ranges, year, columns)
+    return to_arrow(df) if as_arrow else df
+
+
+# --- Facet counts ---
+@perf.timed("facet counts")
+def compute_facet_counts(facets, masks, n_rows):
+    """Rows each facet option would keep under all the *other* active filters."""
+    names = list(masks)
+    # prefix[i] = AND of the first i masks, suffix[i] = AND of masks i..end
+    prefix = [np.ones(n_rows, dtype=bool)]
+    for name in names:
+        prefix.append(prefix[-1] & masks[name])
+    suffix = [np.ones(n_rows, dtype=bool)]
+    for name in reversed(names):
+        suffix.append(suffix[-1] & masks[name])
+    suffix.reverse()
+    counts = {}
+    for col, facet in facets.items():
+        if col in masks:
+            i = names.index(col)
+            others = prefix[i] & suffix[i + 1]
+        else:
+            others = prefix[-1]
+        codes = facet["codes"][others]
+        option_counts = np.bincount(codes[codes >= 0], minlength=len(facet["options"]))
+        counts[col] = dict(zip(facet["options"], option_counts.tolist()))
+    return counts
+
+def facet_counts(name, facets=None, ranges=None, year=None):
+    """Per facet column, the rows each option would keep under the other filters."""
+    masks = filter_masks(name, facets, ranges, year)
+    return compute_facet_counts(facet_index(name), masks, len(load_dataset(name)))
@@ -0,0 +1,122 @@
+"""Representative values of interval columns, for the numeric plot tables.
+
+The text tables keep measurements as written ("30 - 40", "1.9*", "0.38"). Plots need one
+number per cell, chosen by a rule set per dataset:
+
+    table      source table the plot table is built from
+    key        columns identifying a row for overrides
+    default    rule used for every interval column ("max", "min" or "midpoint")
+    columns    per-column rule replacing the default
+    overrides  {key values: {column: rule, a number or None}}, where a number is the value
+               preferred from another source and None leaves the cell out of the plots
+
+The overrides are data, not code: they are read from a plot values file next to the
+CSVs (Dataset_Plot_Values.csv, see read_overrides), and each plot table is versioned
+by that file and its own table file.
+
+Single values ("0.38", "1.9*") are their own representative under every rule.
+"""
+import os
+
+import numpy as np
+import pandas as pd
+
+# number, optional estimate marker, optional "- number" upper part
+INTERVAL_PATTERN = r"^\s*([-+]?\d*\.?\d+)\s*\*?\s*(?:-\s*(\d*\.?\d+)\s*\*?)?\s*$"
+RULES = ("max", "min", "midpoint")
+
+REGOLITH_PLOT_RULES = {
+    "table": "regolith",
+    "key": ["Mission", "Test"],
+    "default": "max",
+    "columns": {},
+    "overrides": {},
+}
+
+SIMULANT_PLOT_RULES = {
+    "table": "simulants",
+    "key": ["Simulant"],
+    "default": "midpoint",
+    "columns": {},
+    "overrides": {},
+}
+
+
+def read_overrides(path):
+    """{table: {key values: {column: rule}}} of a plot values file.
+
+    Each row holds Table, Key (the key values joined by " | "), Column and Value: a
+    number, a rule name, or empty to leave the cell out of the plots.
+    """
+    df = pd.read_csv(path, dtype=str, keep_default_na=False)
+    out = {}
+    for table, key, col, value in df[["Table", "Key", "Column", "Value"]].itertuples(index=False, name=None):
+        value = value.strip()
+        if not value:
+            rule = None
+        elif value in RULES:
+            rule = value
+        else:
+            try:
+                rule = float(value)
+            except ValueError:
+                raise ValueError(
+                    f"{os.path.basename(path)}: {value!r} of {key} / {col} is neither a number nor one of: {', '.join(RULES)}"
+                ) from None
+        row_key = tuple(part.strip() for part in key.split("|"))
+        out.setdefault(table.strip(), {}).setdefault(row_key, {})[col.strip()] = rule
+    return out
+
+def with_overrides(rules, overrides):
+    """Copy of a rule set with the overrides of its table (see read_overrides)."""
+    return {**rules, "overrides": overrides.get(rules["table"], {})}
+
+
+def interval_bounds(series):
+    """(low, high) float arrays of interval text, NaN where there is no parsable value."""
+    parts = series.astype("str").str.extract(INTERVAL_PATTERN)
+    first = pd.to_numeric(parts[0], errors="coerce").to_numpy(dtype=float)
+    second = pd.to_numeric(parts[1], errors="coerce").to_numpy(dtype=float)
+    second = np.where(np.isnan(second), first, second)
+    return np.fmin(first, second), np.fmax(first, second)
+
+def apply_rule(rule, low, high):
+    if rule == "max":
+        return high
+    if rule == "min":
+        return low
+    if rule == "midpoint":
+        # rounded so that e.g. 1.32-1.5 gives 1.41 rather than 1.4100000000000001
+        return np.round((low + high) / 2, 10)
+    raise ValueError(f"Unknown representative-value rule {rule!r}, expected one of: {', '.join(RULES)}")
+
+def representative_values(df, columns, rules):
+    """Frame of one representative float per interval cell of df[columns]."""
+    keys = pd.MultiIndex.from_frame(df[rules["key"]])
+    out = {}
+    for col in columns:
+        low, high = interval_bounds(df[col])
+        values = np.array(apply_rule(rules["columns"].get(col, rules["default"]), low, high), dtype=float)
+        for key, overrides in rules["overrides"].items():
+            if col not in overrides:
+                continue
+            rows = keys.get_indexer_for([key])
+            if not len(rows) or (rows < 0).any():
+                continue
+            rule = overrides[col]
+            if rule is None:
+                values[rows] = np.nan
+            elif isinstance(rule, str):
+                values[rows] = apply_rule(rule, low[rows], high[rows])
+            else:
+                values[rows] = float(rule)
+        out[col] = values
+    return pd.DataFrame(out, index=df.index)
+
+def plot_table(df, columns, rules, numeric=()):
+    """Copy of a text table with its interval columns replaced by representative values."""
+    table = df.copy()
+    table[columns] = representative_values(df, columns, rules)
+    for col in numeric:
+        table[col] = pd.to_numeric(table[col], errors="coerce")
+    return table
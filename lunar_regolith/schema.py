@@ -0,0 +1,170 @@
+"""Schema registry: every column once, with its kind, unit and display labels.
+
+Loaders take their column names from TABLES, compaction and range derivation their
+column lists from the kinds, the app its slider headings and labels, and validate()
+checks a raw (string) table with one vectorized pass per column:
+
+    categorical  low-cardinality text, stored as a category (optionally a closed value set)
+    text         free text
+    interval     a value or a range as written ("1.5", "30 - 40", "1.9*"), with a unit
+    year         four-digit year
+    url          http(s) URL or DOI
+    location     selenographic coordinates ("2.474S 43.339W")
+"""
+import numpy as np
+import pandas as pd
+
+from .rules import INTERVAL_PATTERN
+
+KINDS = ("categorical", "text", "interval", "year", "url", "location")
+
+COLUMNS = {
+    # Missions and simulants
+    "Mission": {"kind": "categorical", "required": True},
+    "Simulant": {"kind": "text", "required": True},
+    "Mission/Simulant": {"kind": "categorical", "required": True},
+    "Location": {"kind": "location"},
+    "Moon Location/Country": {"kind": "text"},
+    "Terrain": {"kind": "categorical", "values": ["Mare", "Highland"]},
+    "Terrain type": {"kind": "categorical"},
+    "Year": {"kind": "year"},
+    "Type of mission": {"kind": "categorical", "values": ["Lander", "Rover", "Crewed"]},
+    "Developer": {"kind": "categorical"},
+    "Agency": {"kind": "categorical"},
+    "Type of simulant": {"kind": "categorical"},
+    # Measurements
+    "Test": {"kind": "categorical"},
+    "Test location": {"kind": "categorical", "values": ["In-Situ", "On Earth"]},
+    "Bulk density (g/cm^3)": {
+        "kind": "interval", "unit": "g/cm^3", "label": "Density (g/cm³)", "slider": "Select Density Range", "digits": 2,
+    },
+    "Angle of internal friction (degree)": {
+        "kind": "interval", "unit": "degree", "label": "Angle of Internal Friction (°)", "slider": "Select Angle Range", "digits": 1,
+    },
+    "Cohesion (kPa)": {
+        "kind": "interval", "unit": "kPa", "label": "Cohesion (kPa)", "slider": "Select Cohesion Range", "digits": 1,
+    },
+    "Static bearing capacity (kPa)": {
+        "kind": "interval", "unit": "kPa", "label": "Static Bearing Capacity (kPa)",
+        "slider": "Select Static Bearing Capacity Range", "digits": 1,
+    },
+    # Sources
+    "Source": {"kind": "categorical"},
+    "Year of publication": {"kind": "year", "label": "Publication Year", "slider": "Select Year of publication Range"},
+    "DOI / URL": {"kind": "url"},
+    # Derived
+    "Mission Group": {"kind": "categorical"},
+    "Soil Group": {"kind": "categorical"},
+}
+
+# Source tables: CSV file, column names in file order and the columns identifying a
+# measurement (its stable row key, see snapshot.py)
+TABLES = {
+    "regolith": {
+        "file": "Dataset_Regolith.csv",
+        "key": ["Mission", "Test", "Source"],
+        "columns": [
+            "Mission", "Location", "Terrain", "Year", "Type of mission", "Test", "Test location",
+            "Bulk density (g/cm^3)", "Angle of internal friction (degree)", "Cohesion (kPa)",
+            "Static bearing capacity (kPa)", "Source", "Year of publication", "DOI / URL",
+        ],
+    },
+    "simulants": {
+        "file": "Dataset_Simulants.csv",
+        "key": ["Simulant", "Test", "Source"],
+        "columns": [
+            "Developer", "Agency", "Simulant", "Year", "Test", "Type of simulant",
+            "Bulk density (g/cm^3)", "Angle of internal friction (degree)", "Cohesion (kPa)",
+            "Source", "Year of publication", "DOI / URL",
+        ],
+    },
+}
+
+# kind -> (full-match pattern, message) of the text checks
+PATTERNS = {
+    "interval": (INTERVAL_PATTERN, "not a value or a range such as '30 - 40'"),
+    "year": (r"\d{4}", "not a four-digit year"),
+    "url": (r"(https?://\S+|10\.\d{4,9}/\S+)", "not an http(s) URL or a DOI"),
+    "location": (r"\d+(\.\d+)?[NS]\s+\d+(\.\d+)?[EW]", "not a location such as '2.474S 43.339W'"),
+}
+YEAR_BOUNDS = (1900, 2100)
+
+
+def column_spec(column):
+    return COLUMNS[column]
+
+def table_columns(table):
+    return list(TABLES[table]["columns"])
+
+def columns_of_kind(kind, columns=None):
+    """Registry columns of a kind, in registry order or restricted to (and ordered as) `columns`."""
+    names = COLUMNS if columns is None else columns
+    return [col for col in names if col in COLUMNS and COLUMNS[col]["kind"] == kind]
+
+def interval_columns(table):
+    return columns_of_kind("interval", table_columns(table))
+
+def slider_range(stats, column, bounds=True):
+    """Full range of a year or interval column as its slider shows it, None without values.
+
+    Interval columns span their _min/_max bounds (the numeric column itself with
+    bounds=False), rounded to the column's digits; years are whole numbers.
+    """
+    spec = COLUMNS[column]
+    if spec["kind"] == "year":
+        if column not in stats or not stats[column]["count"]:
+            return None
+        return int(stats[column]["min"]), int(stats[column]["max"])
+    low_col, high_col = (f"{column}_min", f"{column}_max") if bounds else (column, column)
+    if low_col not in stats:
+        return None
+    digits = spec["digits"]
+    return round(float(stats[low_col]["min"]), digits), round(float(stats[high_col]["max"]), digits)
+
+
+def validate(df, table):
+    """Row-level error report of a raw (string) table against the registry.
+
+    Each check runs vectorized over a whole column; the report has one row per bad cell
+    with the CSV line number (header is line 1), column, kind, value and message.
+    """
+    reports = []
+    missing = [col for col in table_columns(table) if col not in df.columns]
+    if missing:
+        reports.append(pd.DataFrame({
+            "line": 1, "column": missing, "kind": [COLUMNS[col]["kind"] for col in missing],
+            "value": None, "error": "column missing",
+        }))
+    for col in table_columns(table):
+        if col not in df.columns:
+            continue
+        spec = COLUMNS[col]
+        # pandas >= 3 (requirements.txt): the "str" dtype keeps missing values as NaN
+        values = df[col].astype("str")
+        present = values.notna().to_numpy()
+        checks = []
+        if spec.get("required"):
+            checks.append((~present, "required value missing"))
+        if spec["kind"] in PATTERNS:
+            pattern, message = PATTERNS[spec["kind"]]
+            matches = values.str.strip().str.fullmatch(pattern).fillna(True).to_numpy(dtype=bool)
+            checks.append((present & ~matches, message))
+            if spec["kind"] == "year":
+                years = pd.to_numeric(values, errors="coerce").to_numpy(dtype=float)
+                low, high = YEAR_BOUNDS
+                checks.append((matches & present & ((years < low) | (years > high)), f"year outside {low}-{high}"))
+        if "values" in spec:
+            allowed = values.str.strip().isin(spec["values"]).to_numpy()
+            checks.append((present & ~allowed, f"not one of: {', '.join(spec['values'])}"))
+        for bad, message in checks:
+            rows = np.flatnonzero(bad)
+            if len(rows):
+                reports.append(pd.DataFrame({
+                    "line": rows + 2, "column": col, "kind": spec["kind"],
+                    "value": values.iloc[rows].to_numpy(), "error": message,
+                }))
+    if not reports:
+        return pd.DataFrame({"line": pd.Series(dtype=int), "column": pd.Series(dtype="str"),
+                             "kind": pd.Series(dtype="str"), "value": pd.Series(dtype="str"),
+                             "error": pd.Series(dtype="str")})
+    return pd.concat(reports, ignore_index=True).sort_values(["line", "column"], kind="stable", ignore_index=True)
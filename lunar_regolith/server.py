@@ -0,0 +1,363 @@
+"""Local JSON/HTTP query service over the prepared datasets.
+
+    python -m lunar_regolith.server --port 8765
+
+    GET /datasets                               datasets with version, rows, facets and ranges
+    GET /datasets/<name>                        filtered rows (+ columns, sort, descending, limit, offset)
+    GET /datasets/<name>/stats                  column statistics of the sidebar
+    GET /datasets/<name>/facets                 live facet counts under the filters
+    GET /datasets/<name>/aggregate?by=&value=   grouped aggregate (agg=count|mean|median|min|max|sum)
+    GET /datasets/<name>/figure?x=&y=           Plotly figure JSON of a scatter (color=, optional)
+    GET /ready                                  cache warm-up status, 503 until it is done
+    GET /metrics                                cache and memory metrics (Prometheus text format)
+
+Filters use the names of the dataset registry, repeated for several options, plus
+range=COLUMN=MIN:MAX and year=MIN:MAX, e.g.
+/datasets/regolith?mission_group=Apollo&range=Cohesion%20(kPa)=0.5:3
+
+Rows come one page at a time: limit= defaults to DEFAULT_PAGE_SIZE rows and is capped
+at MAX_PAGE_SIZE, clients page through the total with offset=.
+
+Every endpoint is answered by the configured query backend (backends.py), from the
+in-memory datasets or from Parquet files.
+
+Every response carries a strong ETag derived from the backend's dataset version (that
+of the CSVs, or of external Parquet files) and the canonical query, so pollers revalidate with If-None-Match and get 304s. Bodies are
+cached per ETag (a new data file means a new version, hence new keys) and served
+gzipped when the client accepts it.
+
+The server warms the caches in the background at start (warmup.py, --no-warmup to skip).
+"""
+import argparse
+import gzip
+import hashlib
+import json
+import threading
+import traceback
+from collections import OrderedDict
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, unquote, urlsplit
+
+import numpy as np
+
+from .backends import AGGREGATES, get_backend
+from . import metrics, warmup
+from .data import DATASETS, dataset_spec
+from .export import DEFAULT_CHUNK_SIZE
+from .query import parse_bounds, parse_range
+
+RESERVED_PARAMS = {"columns", "limit", "offset", "sort", "descending", "by", "value", "agg", "x", "y", "color"}
+MIN_GZIP_SIZE = 512
+RESPONSE_CACHE_SIZE = 256
+# rows per response of the rows endpoint, so a cached body stays bounded
+DEFAULT_PAGE_SIZE = DEFAULT_CHUNK_SIZE
+MAX_PAGE_SIZE = 50_000
+
+
+class QueryError(ValueError):
+    """Bad request parameters, answered with 400."""
+
+
+# --- Request parameters ---
+def filter_params(name, params):
+    """facets / ranges / year keyword arguments of filter_dataset from query parameters."""
+    spec = dataset_spec(name)
+    facets, ranges, year = {}, {}, None
+    for key, value in params:
+        if key in RESERVED_PARAMS:
+            continue
+        try:
+            if key == "range":
+                col, bounds = parse_range(value)
+                if col not in spec["ranges"]:
+                    raise QueryError(f"no interval column {col!r} in {name!r}")
+                ranges[col] = bounds
+            elif key == "year":
+                year = parse_bounds(value)
+            elif key in spec["facets"]:
+                facets.setdefault(key, []).append(value)
+            else:
+                raise QueryError(f"unknown parameter {key!r} for {name!r}")
+        except QueryError:
+            raise
+        except ValueError as e:
+            raise QueryError(str(e))
+    return {"facets": facets, "ranges": ranges, "year": year}
+
+def single_param(params, key, default=None):
+    values = [value for k, value in params if k == key]
+    return values[-1] if values else default
+
+def int_param(params, key, default=None):
+    value = single_param(params, key)
+    if value is None:
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        raise QueryError(f"{key} must be an integer, got {value!r}")
+
+def check_columns(available, columns):
+    missing = [col for col in columns if col not in available]
+    if missing:
+        raise QueryError(f"unknown column(s): {', '.join(missing)}")
+
+
+# --- Endpoints (return JSON-serializable payloads) ---
+def _json_default(value):
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+def records(df):
+    return json.loads(df.to_json(orient="records", force_ascii=False))
+
+def list_datasets(params):
+    backend = get_backend()
+    return [
+        {
+            "name": name,
+            "version": backend.version(name),
+            "rows": backend.count(name),
+            "columns": backend.columns(name),
+            "facets": spec["facets"],
+            "ranges": list(spec["ranges"]),
+        }
+        for name, spec in DATASETS.items()
+    ]
+
+def dataset_rows(name, params):
+    """Rows offset..offset+limit of the filtered result, optionally sorted (sort=, descending=).
+
+    limit defaults to DEFAULT_PAGE_SIZE and is capped at MAX_PAGE_SIZE, the payload says
+    which limit applied next to the total so clients can page through the rest.
+    """
+    columns = single_param(params, "columns")
+    columns = [col.strip() for col in columns.split(",")] if columns else None
+    sort = single_param(params, "sort") or None
+    descending = single_param(params, "descending", "false").lower() in ("1", "true", "yes")
+    offset = max(int_param(params, "offset", 0), 0)
+    limit = min(max(int_param(params, "limit", DEFAULT_PAGE_SIZE), 0), MAX_PAGE_SIZE)
+    try:
+        page, total = get_backend().page(
+            name, offset, limit, sort, descending, columns, **filter_params(name, params),
+        )
+    except KeyError as e:
+        raise QueryError(e.args[0])
+    return {"dataset": name, "total": total, "offset": offset, "limit": limit, "rows": records(page)}
+
+def dataset_stats(name, params):
+    return get_backend().column_stats(name)
+
+def dataset_facets(name, params):
+    return get_backend().facet_counts(name, **filter_params(name, params))
+
+def dataset_aggregate(name, params):
+    by, value = single_param(params, "by"), single_param(params, "value")
+    agg = single_param(params, "agg", "mean")
+    if not by or not value:
+        raise QueryError("aggregate needs by= and value= columns")
+    if agg not in AGGREGATES:
+        raise QueryError(f"agg must be one of: {', '.join(AGGREGATES)}")
+    backend = get_backend()
+    check_columns(backend.columns(name), [by, value])
+    if agg != "count" and value not in backend.numeric_columns(name):
+        raise QueryError(f"agg={agg} needs a numeric value column, {value!r} is not")
+    try:
+        groups = backend.aggregate(name, by, value, agg, **filter_params(name, params))
+    except KeyError as e:
+        raise QueryError(e.args[0])
+    return {"dataset": name, "by": by, "value": value, "agg": agg, "groups": records(groups)}
+
+def dataset_figure(name, params):
+    import plotly.express as px
+
+    x, y, color = single_param(params, "x"), single_param(params, "y"), single_param(params, "color")
+    if not x or not y:
+        raise QueryError("figure needs x= and y= columns")
+    backend = get_backend()
+    columns = list(dict.fromkeys(col for col in (x, y, color) if col))
+    check_columns(backend.columns(name), columns)
+    df = backend.filter(name, columns=columns, **filter_params(name, params)).dropna(subset=[x, y])
+    fig = px.scatter(df, x=x, y=y, color=color, symbol=color)
+    fig.update_traces(marker=dict(size=10, opacity=0.7))
+    return json.loads(fig.to_json())
+
+DATASET_ENDPOINTS = {
+    None: dataset_rows,
+    "stats": dataset_stats,
+    "facets": dataset_facets,
+    "aggregate": dataset_aggregate,
+    "figure": dataset_figure,
+}
+
+def route(path):
+    """(endpoint, dataset name or None) of a request path, KeyError when unknown."""
+    parts = [unquote(part) for part in path.strip("/").split("/") if part]
+    if parts == ["datasets"]:
+        return list_datasets, None
+    if len(parts) in (2, 3) and parts[0] == "datasets":
+        dataset_spec(parts[1])
+        endpoint = DATASET_ENDPOINTS[parts[2] if len(parts) == 3 else None]
+        return endpoint, parts[1]
+    raise KeyError(path)
+
+
+# --- Response cache ---
+class ResponseCache:
+    """LRU of encoded bodies keyed by ETag, shared by the handler threads."""
+
+    def __init__(self, maxsize=RESPONSE_CACHE_SIZE):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, etag):
+        with self._lock:
+            entry = self._entries.get(etag)
+            if entry is not None:
+                self._entries.move_to_end(etag)
+            return entry
+
+    def put(self, etag, entry):
+        with self._lock:
+            self._entries[etag] = entry
+            self._entries.move_to_end(etag)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+def make_etag(path, params, name):
+    """Strong ETag of the dataset version(s) and the canonical (order independent) query."""
+    backend = get_backend()
+    versions = [backend.name] + [backend.version(n) for n in ([name] if name else DATASETS)]
+    key = repr((path.rstrip("/"), sorted(params), versions))
+    return '"' + hashlib.sha256(key.encode("utf-8")).hexdigest()[:32] + '"'
+
+def encode_body(payload):
+    """(identity bytes, gzip bytes or None) of a JSON payload."""
+    body = json.dumps(payload, default=_json_default, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    return body, gzip.compress(body, compresslevel=6) if len(body) >= MIN_GZIP_SIZE else None
+
+
+class QueryHandler(BaseHTTPRequestHandler):
+    server_version = "LunarRegolith/1.0"
+    cache = ResponseCache()
+    warm = False
+
+    def do_HEAD(self):
+        self.do_GET(head=True)
+
+    def do_GET(self, head=False):
+        url = urlsplit(self.path)
+        params = parse_qsl(url.query, keep_blank_values=True)
+        if url.path.rstrip("/") == "/ready":
+            return self.send_ready(head)
+        if url.path.rstrip("/") == "/metrics":
+            return self.send_metrics(head)
+        try:
+            endpoint, name = route(url.path)
+        except KeyError:
+            return self.send_json_error(HTTPStatus.NOT_FOUND, f"no such resource: {url.path}", head)
+
+        etag = make_etag(url.path, params, name)
+        if etag in self.request_etags():
+            self.send_response(HTTPStatus.NOT_MODIFIED)
+            self.send_header("ETag", etag)
+            self.send_header("Cache-Control", "no-cache")
+            self.end_headers()
+            return
+
+        entry = self.cache.get(etag)
+        if entry is None:
+            try:
+                payload = endpoint(name, params) if name else endpoint(params)
+            except QueryError as e:
+                return self.send_json_error(HTTPStatus.BAD_REQUEST, str(e), head)
+            except Exception as e:  # the client still gets an answer, the traceback goes to the log
+                self.log_error("%s failed with %s", self.path, type(e).__name__)
+                traceback.print_exc()
+                return self.send_json_error(HTTPStatus.INTERNAL_SERVER_ERROR, f"{type(e).__name__}: {e}", head)
+            entry = encode_body(payload)
+            self.cache.put(etag, entry)
+        self.send_body(etag, *entry, head=head)
+
+    def request_etags(self):
+        header = self.headers.get("If-None-Match", "")
+        return {tag.strip() for tag in header.split(",")}
+
+    def accepts_gzip(self):
+        return "gzip" in self.headers.get("Accept-Encoding", "")
+
+    def send_body(self, etag, body, gzipped, head=False):
+        use_gzip = gzipped is not None and self.accepts_gzip()
+        data = gzipped if use_gzip else body
+        self.send_response(HTTPStatus.OK)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.send_header("ETag", etag)
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Vary", "Accept-Encoding")
+        if use_gzip:
+            self.send_header("Content-Encoding", "gzip")
+        self.end_headers()
+        if not head:
+            self.wfile.write(data)
+
+    def send_ready(self, head=False):
+        status = warmup.start().status() if self.warm else {"ready": True}
+        data = json.dumps(status).encode("utf-8")
+        self.send_response(HTTPStatus.OK if status["ready"] else HTTPStatus.SERVICE_UNAVAILABLE)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.send_header("Cache-Control", "no-store")
+        self.end_headers()
+        if not head:
+            self.wfile.write(data)
+
+    def send_metrics(self, head=False):
+        data = metrics.render().encode("utf-8")
+        self.send_response(HTTPStatus.OK)
+        self.send_header("Content-Type", metrics.CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(data)))
+        self.send_header("Cache-Control", "no-store")
+        self.end_headers()
+        if not head:
+            self.wfile.write(data)
+
+    def send_json_error(self, status, message, head=False):
+        data = json.dumps({"error": message}).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        if not head:
+            self.wfile.write(data)
+
+
+def serve(host="127.0.0.1", port=8765, warm=True):
+    if warm:
+        warmup.start()
+        QueryHandler.warm = True
+    httpd = ThreadingHTTPServer((host, port), QueryHandler)
+    print(f"Serving the Lunar Regolith Database on http://{host}:{httpd.server_address[1]}/datasets")
+    try:
+        httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        httpd.server_close()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m lunar_regolith.server",
+        description="Local JSON/HTTP query service over the Lunar Regolith Database.",
+    )
+    parser.add_argument("--host", default="127.0.0.1", help="Interface to bind (default: localhost only)")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--no-warmup", action="store_true", help="Do not warm the caches at start")
+    args = parser.parse_args(argv)
+    serve(args.host, args.port, warm=not args.no_warmup)
+
+if __name__ == "__main__":
+    main()
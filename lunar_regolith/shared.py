@@ -0,0 +1,82 @@
+"""Prepared datasets shared between processes through memory-mapped Arrow IPC files.
+
+With LUNAR_REGOLITH_SHARED_DIR set, data.load_dataset() serves each prepared dataset
+from SHARED_DIR/<dataset>-<version hash>.arrow. The first process to need a version
+writes it (through a temporary file and os.replace, so readers never see half a file)
+and every process, the writer included, maps it read-only. The page cache then holds
+one copy of the data for all Streamlit workers.
+
+Frames are built on top of the mapped buffers: float columns keep NaN as a value (no
+validity bitmap) and strings stay Arrow-backed, so neither is copied into the process;
+categorical codes and integer columns with gaps are small and are materialized.
+"""
+import hashlib
+import os
+import tempfile
+
+import pandas as pd
+
+from .data import SHARED_DIR
+
+
+def arrow_path(name, version):
+    digest = hashlib.sha256(version.encode("utf-8")).hexdigest()[:16]
+    return os.path.join(SHARED_DIR, f"{name}-{digest}.arrow")
+
+def to_shared_table(df):
+    """Arrow table of a prepared frame, with float NaN kept as values (zero-copy back)."""
+    import pyarrow as pa
+
+    arrays = [
+        pa.array(df[col].to_numpy(), from_pandas=False) if pd.api.types.is_float_dtype(df[col])
+        else pa.Array.from_pandas(df[col])
+        for col in df.columns
+    ]
+    # the pandas metadata restores the column dtypes (categories, str) on to_pandas
+    metadata = pa.Schema.from_pandas(df, preserve_index=False).metadata
+    return pa.Table.from_arrays(arrays, names=[str(col) for col in df.columns]).replace_schema_metadata(metadata)
+
+def write_shared(df, path):
+    import pyarrow as pa
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    table = to_shared_table(df)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".", suffix=".arrow")
+    try:
+        with os.fdopen(fd, "wb") as stream:
+            with pa.ipc.new_file(stream, table.schema) as writer:
+                writer.write_table(table)
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+
+def map_frame(path):
+    """Frame over a memory-mapped Arrow IPC file (the mapping lives as long as the frame)."""
+    import pyarrow as pa
+
+    table = pa.ipc.open_file(pa.memory_map(path, "r")).read_all()
+    return table.to_pandas(split_blocks=True, self_destruct=False)
+
+def remove_other_versions(name, path):
+    # processes still mapping an old version keep it until they unmap, unlinking is safe
+    prefix = f"{name}-"
+    for filename in os.listdir(os.path.dirname(path)):
+        other = os.path.join(os.path.dirname(path), filename)
+        if filename.startswith(prefix) and filename.endswith(".arrow") and other != path:
+            try:
+                os.remove(other)
+            except OSError:
+                pass
+
+def shared_frame(name, version, prepare):
+    """Mapped prepared frame of a dataset version, built with prepare(version) if missing.
+
+    prepare is the uncached builder, so the writing process does not keep a private copy.
+    """
+    path = arrow_path(name, version)
+    if not os.path.exists(path):
+        write_shared(prepare(version), path)
+        remove_other_versions(name, path)
+    return map_frame(path)
@@ -0,0 +1,185 @@
+"""Content-hashed snapshots of the source tables and row-level diffs between versions.
+
+    python -m lunar_regolith.snapshot save [table ...]
+    python -m lunar_regolith.snapshot list [table ...]
+    python -m lunar_regolith.snapshot diff regolith [OLD [NEW]]
+
+Every row gets two 64-bit hashes: a row key over the table's key columns (schema.TABLES,
+plus the occurrence number among rows sharing a key), which stays the same while the
+measurement is edited, and a content hash over all of its columns. A snapshot is the
+table (compacted CSV plus pending deltas) saved as CSV under its content id, a hash of
+all row keys and content hashes, so saving an unchanged table writes nothing.
+
+diff matches two versions by row key with a single hash join and reports the added,
+removed and changed rows, with the columns that changed. The same content hashes let
+data.py re-derive only new or changed rows; the caches keyed by a dataset version
+(statistics, facet indexes, figures, ...) do not use them and start over per version.
+"""
+import argparse
+import hashlib
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+from . import schema
+from .data import data_path, load_table, read_table_csv
+from .ingest import atomic_write, file_header
+
+SNAPSHOT_DIR = os.environ.get("LUNAR_REGOLITH_SNAPSHOT_DIR", data_path("snapshots"))
+CURRENT = "current"
+
+
+# --------------------------- Row hashes ---------------------------
+def row_hashes(df):
+    """Content hash of every row over all columns."""
+    return pd.util.hash_pandas_object(df, index=False).to_numpy()
+
+def row_keys(df, table):
+    """Stable key of every row: hash of its key columns and its occurrence among equal keys."""
+    key_columns = schema.TABLES[table]["key"]
+    keys = df[key_columns].reset_index(drop=True)
+    occurrence = keys.groupby(key_columns, dropna=False, sort=False).cumcount()
+    return pd.util.hash_pandas_object(keys.assign(occurrence=occurrence), index=False).to_numpy()
+
+def snapshot_id(df, table):
+    digest = hashlib.sha256(row_keys(df, table).tobytes() + row_hashes(df).tobytes())
+    return digest.hexdigest()[:16]
+
+
+# --------------------------- Snapshots ---------------------------
+def snapshot_dir(table):
+    return os.path.join(SNAPSHOT_DIR, table)
+
+def save_snapshot(table):
+    """Snapshot the current table, returns (snapshot id, path); a no-op if it exists."""
+    df = load_table(table)
+    sid = snapshot_id(df, table)
+    directory = snapshot_dir(table)
+    path = os.path.join(directory, f"{sid}.csv")
+    if os.path.exists(path):
+        return sid, path
+    os.makedirs(directory, exist_ok=True)
+    atomic_write(directory, path, lambda stream: df.to_csv(
+        stream, header=file_header(table), index=False, lineterminator="\n",
+    ))
+    return sid, path
+
+def list_snapshots(table):
+    """Snapshot ids of a table, oldest first."""
+    try:
+        names = [name for name in os.listdir(snapshot_dir(table)) if name.endswith(".csv")]
+    except FileNotFoundError:
+        return []
+    paths = [os.path.join(snapshot_dir(table), name) for name in names]
+    return [os.path.basename(path)[:-4] for path in sorted(paths, key=os.path.getmtime)]
+
+def resolve_snapshot(table, ref):
+    """Full snapshot id of an id prefix, "latest" or "previous"."""
+    ids = list_snapshots(table)
+    if ref in ("latest", "previous"):
+        needed = 1 if ref == "latest" else 2
+        if len(ids) < needed:
+            raise KeyError(f"{table!r} has {len(ids)} snapshot(s), no {ref} one")
+        return ids[-needed]
+    matches = [sid for sid in ids if sid.startswith(ref)]
+    if len(matches) != 1:
+        raise KeyError(f"{ref!r} matches {len(matches)} snapshot(s) of {table!r}")
+    return matches[0]
+
+def load_snapshot(table, ref):
+    """Table of a snapshot (id, id prefix, "latest", "previous"), or the current table."""
+    if ref == CURRENT:
+        return load_table(table)
+    path = os.path.join(snapshot_dir(table), f"{resolve_snapshot(table, ref)}.csv")
+    return read_table_csv(path, table)
+
+
+# --------------------------- Diff ---------------------------
+def _changed_columns(old, new, old_rows, new_rows):
+    """Comma separated changed columns of each (old row, new row) pair."""
+    changed = []
+    for col in new.columns:
+        a = old[col].to_numpy(dtype=object)[old_rows]
+        b = new[col].to_numpy(dtype=object)[new_rows]
+        changed.append(~((a == b) | (pd.isna(a) & pd.isna(b))))
+    flags = np.column_stack(changed) if changed else np.zeros((len(new_rows), 0), dtype=bool)
+    return [", ".join(new.columns[row]) for row in flags]
+
+def diff_frames(old, new, table):
+    """Added, removed and changed rows between two versions of a table.
+
+    One row per difference: change, the key values, the row positions in the old and
+    new table and, for changed rows, the columns whose values differ.
+    """
+    positions = pd.Index(row_keys(old, table)).get_indexer(row_keys(new, table))
+    matched = positions >= 0
+    new_rows, old_rows = np.flatnonzero(matched), positions[matched]
+    edited = row_hashes(old)[old_rows] != row_hashes(new)[new_rows]
+    old_changed, new_changed = old_rows[edited], new_rows[edited]
+    added = np.flatnonzero(~matched)
+    removed = np.setdiff1d(np.arange(len(old)), old_rows)
+
+    key_columns = schema.TABLES[table]["key"]
+    parts = [
+        ("added", None, added, new, added, None),
+        ("removed", removed, None, old, removed, None),
+        ("changed", old_changed, new_changed, new, new_changed, _changed_columns(old, new, old_changed, new_changed)),
+    ]
+    frames = []
+    for change, old_pos, new_pos, source, rows, columns in parts:
+        frame = source[key_columns].iloc[rows].reset_index(drop=True)
+        frame.insert(0, "change", change)
+        frame["old_row"] = pd.array(old_pos if old_pos is not None else [pd.NA] * len(rows), dtype="Int64")
+        frame["new_row"] = pd.array(new_pos if new_pos is not None else [pd.NA] * len(rows), dtype="Int64")
+        frame["columns"] = columns if columns is not None else ""
+        frames.append(frame)
+    return pd.concat(frames, ignore_index=True)
+
+def diff(table, old="latest", new=CURRENT):
+    """diff_frames between two snapshots, by default the latest one and the current table."""
+    return diff_frames(load_snapshot(table, old), load_snapshot(table, new), table)
+
+
+# --------------------------- Command line ---------------------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m lunar_regolith.snapshot",
+        description="Save content-hashed snapshots of the dataset tables and diff versions row by row.",
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+    for command, help_text in (("save", "Snapshot the current tables"), ("list", "List the snapshots")):
+        sub = commands.add_parser(command, help=help_text)
+        sub.add_argument("tables", nargs="*", metavar="table", help=f"Tables (default: all of {', '.join(schema.TABLES)})")
+    diff_cmd = commands.add_parser("diff", help="Row-level diff between two versions of a table")
+    diff_cmd.add_argument("table", choices=list(schema.TABLES))
+    diff_cmd.add_argument("old", nargs="?", default="latest", help='Snapshot id (prefix), "latest" (default) or "previous"')
+    diff_cmd.add_argument("new", nargs="?", default=CURRENT, help=f'Snapshot id (prefix) or "{CURRENT}" (default)')
+    args = parser.parse_args(argv)
+
+    if args.command == "diff":
+        try:
+            report = diff(args.table, args.old, args.new)
+        except KeyError as e:
+            parser.error(e.args[0])
+        counts = report["change"].value_counts()
+        print(", ".join(f"{counts.get(change, 0)} {change}" for change in ("added", "removed", "changed")))
+        if not report.empty:
+            print(report.to_string(index=False))
+        return 0
+
+    unknown = [table for table in args.tables if table not in schema.TABLES]
+    if unknown:
+        parser.error(f"unknown table(s): {', '.join(unknown)}, expected {', '.join(schema.TABLES)}")
+    for table in args.tables or list(schema.TABLES):
+        if args.command == "save":
+            sid, path = save_snapshot(table)
+            print(f"{table}: {sid} ({path})")
+        else:
+            for sid in list_snapshots(table):
+                print(f"{table}  {sid}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,265 @@
+"""Synthetic datasets shaped like the real tables, for measuring the app at scale.
+
+    python -m lunar_regolith.synthetic /tmp/lunar-1e6 --rows 1e6
+    LUNAR_REGOLITH_DATA_DIR=/tmp/lunar-1e6 streamlit run Combined_Lunar_Database.py
+
+Writes Dataset_Regolith.csv and Dataset_Simulants.csv (the tables the app loads, with
+the header of the real files; the combined "all" dataset is derived from them through
+build.ALL_SCHEMA when loaded) and copies the plot values file (data.PLOT_VALUES_FILE)
+of the repository. The output depends only on the seed and the row counts:
+rows are generated in chunks of CHUNK_ROWS, each from its own seeded generator, and
+streamed to disk, so 10^7 rows never sit in memory at once.
+
+Distributions follow the real tables in the repository: categorical values and NA
+rates are sampled from their value counts, missions and simulants come from a
+catalogue giving each name one location, terrain, year and type (or developer and
+agency) and covering every branch of categorize_mission (a few rows have no mission at
+all, which validation_report lists), and interval cells are single values, ranges
+written "30 - 40" or "30-40", and estimates marked with "*".
+"""
+import argparse
+import csv
+import os
+import shutil
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from . import schema
+from .data import PLOT_VALUES_FILE, read_table_csv
+
+TEMPLATE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CHUNK_ROWS = 250_000
+
+# One mission name per categorize_mission branch and more, with the program's mission type
+MISSION_PROGRAMS = [
+    ("Apollo {}", range(11, 18), "Crewed"),
+    ("Luna {}", (9, 13, 16, 17, 20, 21, 24), "Lander"),
+    ("Surveyor {}", ("I", "III", "V", "VI", "VII"), "Lander"),
+    ("Chang'e {}", range(3, 7), "Lander"),
+    ("Change-{} rover", range(3, 5), "Rover"),
+    ("Chandrayaan {}", range(1, 4), "Lander"),
+    ("Lunokhod {}", range(1, 3), "Rover"),
+    ("{}", ("SLIM", "Intuitive Machines IM-1", "Peregrine", "Beresheet"), "Lander"),
+]
+# (mean, standard deviation, lowest, highest, digits, lognormal) of the interval columns
+INTERVALS = {
+    "Bulk density (g/cm^3)": (1.55, 0.22, 0.7, 2.3, 2, False),
+    "Angle of internal friction (degree)": (37.0, 5.5, 18.0, 55.0, 1, False),
+    "Cohesion (kPa)": (0.0, 1.1, 0.01, 30.0, 2, True),
+    "Static bearing capacity (kPa)": (3.4, 0.9, 1.0, 500.0, 0, True),
+}
+RANGE_RATE = 0.35
+ESTIMATE_RATE = 0.05
+MISSING_MISSION_RATE = 0.001
+
+
+# --------------------------- Templates ---------------------------
+def template(table):
+    """The real table of the repository the distributions are taken from."""
+    return read_table_csv(os.path.join(TEMPLATE_DIR, schema.TABLES[table]["file"]), table)
+
+def template_header(filename, columns):
+    path = os.path.join(TEMPLATE_DIR, filename)
+    if not os.path.exists(path):
+        return list(columns)
+    with open(path, newline="", encoding="utf-8") as stream:
+        return next(csv.reader(stream))
+
+def distribution(series):
+    """(values, probabilities) of a column, NaN included."""
+    counts = series.value_counts(dropna=False, normalize=True)
+    return counts.index.to_numpy(dtype=object), counts.to_numpy(dtype=float)
+
+def sample(rng, series, n):
+    values, p = distribution(series)
+    return values[rng.choice(len(values), size=n, p=p)]
+
+def na_rate(series):
+    return float(series.isna().mean())
+
+
+# --------------------------- Cells ---------------------------
+def locations(rng, n):
+    """Selenographic coordinates as written in the tables, e.g. "2.474S 43.339W"."""
+    lat, lon = rng.uniform(-85, 85, n), rng.uniform(-180, 180, n)
+    lat_text = pd.Series(np.abs(lat)).round(3).astype(str).to_numpy(dtype=object)
+    lon_text = pd.Series(np.abs(lon)).round(3).astype(str).to_numpy(dtype=object)
+    precise = rng.random(n) < 0.25
+    lat_text[precise] = pd.Series(np.abs(lat[precise])).round(5).astype(str).to_numpy(dtype=object)
+    lon_text[precise] = pd.Series(np.abs(lon[precise])).round(5).astype(str).to_numpy(dtype=object)
+    return lat_text + np.where(lat < 0, "S", "N").astype(object) + " " + lon_text + np.where(lon < 0, "W", "E").astype(object)
+
+def numbers(values, digits):
+    if digits == 0:
+        return np.round(values).astype(np.int64).astype(str).astype(object)
+    return pd.Series(np.round(values, digits)).astype(str).to_numpy(dtype=object)
+
+def interval_cells(rng, n, column, missing):
+    """Interval strings of a column: values, ranges, "*" estimates and NA at rate `missing`."""
+    mean, std, low, high, digits, lognormal = INTERVALS[column]
+    centre = rng.lognormal(mean, std, n) if lognormal else rng.normal(mean, std, n)
+    centre = np.clip(centre, low, high)
+    spread = np.abs(rng.normal(0, 0.15, n)) * centre
+    cells = numbers(centre, digits)
+    ranged = rng.random(n) < RANGE_RATE
+    separator = np.where(rng.random(n) < 0.7, " - ", "-").astype(object)
+    lower = numbers(np.clip(centre - spread, low, high), digits)
+    upper = numbers(np.clip(centre + spread, low, high), digits)
+    cells[ranged] = lower[ranged] + separator[ranged] + upper[ranged]
+    estimated = rng.random(n) < ESTIMATE_RATE
+    cells[estimated] = cells[estimated] + "*"
+    cells[rng.random(n) < missing] = np.nan
+    return cells
+
+def sources(rng, n, names, years, n_sources):
+    """Source citation and DOI / URL, about one source per n_sources rows."""
+    ids = rng.integers(0, max(1, n_sources), n)
+    names = pd.Series(names, dtype=object).fillna("Unknown").to_numpy(dtype=object)
+    source = names + " synthetic measurement report " + ids.astype(str).astype(object) + ", " + years.astype(str).astype(object)
+    url = np.where(
+        ids % 3 == 0,
+        "https://example.org/lunar-regolith/" + ids.astype(str).astype(object),
+        "10.5555/lrdb." + ids.astype(str).astype(object),
+    )
+    return source, url
+
+
+# --------------------------- Regolith ---------------------------
+def mission_catalogue(rng, n_missions, terrain):
+    """Missions with one location, terrain, landing year and mission type each."""
+    names, types = [], []
+    for pattern, numbers_, mission_type in MISSION_PROGRAMS:
+        for number in numbers_:
+            names.append(pattern.format(number))
+            types.append(mission_type)
+    # further missions of the same programs, for larger catalogues
+    programs = [(pattern, mission_type) for pattern, _, mission_type in MISSION_PROGRAMS[:-1]]
+    while len(names) < n_missions:
+        pattern, mission_type = programs[len(names) % len(programs)]
+        names.append(pattern.format(f"{100 + len(names)}"))
+        types.append(mission_type)
+    n = len(names)
+    return pd.DataFrame({
+        "Mission": names,
+        "Location": locations(rng, n),
+        "Terrain": sample(rng, terrain, n),
+        "Year": rng.integers(1959, 2026, n),
+        "Type of mission": types,
+    })
+
+def regolith_chunk(rng, n, catalogue, real, n_sources):
+    rows = catalogue.iloc[rng.integers(0, len(catalogue), n)].reset_index(drop=True)
+    mission = rows["Mission"].to_numpy(dtype=object)
+    mission[rng.random(n) < MISSING_MISSION_RATE] = np.nan
+    published = np.minimum(rows["Year"].to_numpy() + rng.integers(0, 40, n), 2025)
+    source, url = sources(rng, n, mission, published, n_sources)
+    df = pd.DataFrame({
+        "Mission": mission,
+        "Location": rows["Location"].to_numpy(dtype=object),
+        "Terrain": rows["Terrain"].to_numpy(dtype=object),
+        "Year": rows["Year"].astype(str).to_numpy(dtype=object),
+        "Type of mission": rows["Type of mission"].to_numpy(dtype=object),
+        "Test": sample(rng, real["Test"], n),
+        "Test location": sample(rng, real["Test location"], n),
+        **{col: interval_cells(rng, n, col, na_rate(real[col])) for col in schema.interval_columns("regolith")},
+        "Source": source,
+        "Year of publication": published.astype(str).astype(object),
+        "DOI / URL": url,
+    })
+    return df[schema.table_columns("regolith")]
+
+
+# --------------------------- Simulants ---------------------------
+SIMULANT_PREFIXES = ("JSC", "LHS", "LMS", "CAS", "CUG", "NU-LHT", "FJS", "KLS", "DNA", "TUBS", "LSS", "EAC", "OPRH", "OPRFLT")
+
+def simulant_catalogue(rng, n_simulants, real):
+    """Simulants with one developer, agency, type and year each (developer and agency as in the real pairs)."""
+    pairs = real[["Developer", "Agency"]].drop_duplicates().reset_index(drop=True)
+    pick = rng.integers(0, len(pairs), n_simulants)
+    prefixes = np.array(SIMULANT_PREFIXES, dtype=object)[rng.integers(0, len(SIMULANT_PREFIXES), n_simulants)]
+    return pd.DataFrame({
+        "Developer": pairs["Developer"].to_numpy(dtype=object)[pick],
+        "Agency": pairs["Agency"].to_numpy(dtype=object)[pick],
+        "Simulant": prefixes + "-" + np.arange(1, n_simulants + 1).astype(str).astype(object),
+        "Year": rng.integers(1990, 2026, n_simulants),
+        "Type of simulant": sample(rng, real["Type of simulant"], n_simulants),
+    })
+
+def simulant_chunk(rng, n, catalogue, real, n_sources):
+    rows = catalogue.iloc[rng.integers(0, len(catalogue), n)].reset_index(drop=True)
+    published = np.minimum(rows["Year"].to_numpy() + rng.integers(0, 5, n), 2025)
+    source, url = sources(rng, n, rows["Simulant"].to_numpy(dtype=object), published, n_sources)
+    df = pd.DataFrame({
+        "Developer": rows["Developer"].to_numpy(dtype=object),
+        "Agency": rows["Agency"].to_numpy(dtype=object),
+        "Simulant": rows["Simulant"].to_numpy(dtype=object),
+        "Year": rows["Year"].astype(str).to_numpy(dtype=object),
+        "Test": sample(rng, real["Test"], n),
+        "Type of simulant": rows["Type of simulant"].to_numpy(dtype=object),
+        **{col: interval_cells(rng, n, col, na_rate(real[col])) for col in schema.interval_columns("simulants")},
+        "Source": source,
+        "Year of publication": published.astype(str).astype(object),
+        "DOI / URL": url,
+    })
+    return df[schema.table_columns("simulants")]
+
+
+# --------------------------- Generation ---------------------------
+def chunk_sizes(rows):
+    return [min(CHUNK_ROWS, rows - start) for start in range(0, rows, CHUNK_ROWS)]
+
+def write_chunk(df, path, header):
+    first = header is not None
+    df.to_csv(path, mode="w" if first else "a", header=header if first else False, index=False, lineterminator="\n")
+
+def generate(out_dir, rows, simulant_rows=None, seed=0):
+    """Write the synthetic tables to out_dir, returns {file name: rows written}."""
+    simulant_rows = rows if simulant_rows is None else simulant_rows
+    os.makedirs(out_dir, exist_ok=True)
+    real_regolith, real_simulants = template("regolith"), template("simulants")
+    missions = mission_catalogue(np.random.default_rng([seed, 0]), max(50, rows // 2_000), real_regolith["Terrain"])
+    simulants = simulant_catalogue(np.random.default_rng([seed, 1]), max(24, simulant_rows // 200), real_simulants)
+    written = {}
+    for table, n_rows, catalogue, real, make in (
+        ("regolith", rows, missions, real_regolith, regolith_chunk),
+        ("simulants", simulant_rows, simulants, real_simulants, simulant_chunk),
+    ):
+        filename = schema.TABLES[table]["file"]
+        path = os.path.join(out_dir, filename)
+        header = template_header(filename, schema.table_columns(table))
+        for index, size in enumerate(chunk_sizes(n_rows)):
+            df = make(np.random.default_rng([seed, 2 if table == "regolith" else 3, index]), size, catalogue, real, n_rows // 4)
+            write_chunk(df, path, header if index == 0 else None)
+        written[filename] = n_rows
+    shutil.copyfile(os.path.join(TEMPLATE_DIR, PLOT_VALUES_FILE), os.path.join(out_dir, PLOT_VALUES_FILE))
+    return written
+
+def parse_rows(text):
+    """Row count from "1000", "1e6" or "10_000"."""
+    rows = int(float(text.replace("_", "")))
+    if rows < 1:
+        raise argparse.ArgumentTypeError("row counts must be positive")
+    return rows
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m lunar_regolith.synthetic",
+        description="Generate synthetic regolith and simulant tables shaped like the real ones.",
+    )
+    parser.add_argument("out_dir", help="Directory to write the CSV files to (use it as LUNAR_REGOLITH_DATA_DIR)")
+    parser.add_argument("--rows", type=parse_rows, default=parse_rows("1e4"), help="Regolith rows, e.g. 1e3 to 1e7 (default: 1e4)")
+    parser.add_argument("--simulant-rows", type=parse_rows, help="Simulant rows (default: as many as --rows)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+    start = time.perf_counter()
+    written = generate(args.out_dir, args.rows, args.simulant_rows, args.seed)
+    for filename, n_rows in written.items():
+        print(f"{os.path.join(args.out_dir, filename)}: {n_rows} rows")
+    print(f"{time.perf_counter() - start:.1f}s")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
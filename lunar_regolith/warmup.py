@@ -0,0 +1,155 @@
+"""Boot-time warm-up of the caches, so the first visitor after a deploy pays nothing.
+
+    python -m lunar_regolith.warmup              warm every cache once and exit
+    python -m lunar_regolith.warmup --workers 4
+
+start() runs the same tasks on a thread pool in the background of a server process (the
+app and server.py start it once per process) and sets a readiness flag when they are
+done. The datasets are loaded first, concurrently along their build steps
+(data.load_datasets), then each one's statistics sidecar (and the statistics of the
+configured query backend), facet index and memory report are built, the source tables
+are validated, and the moon map with its image and the default views of the scatter
+plots go into the shared disk cache. CSV parsing, NumPy
+and pandas release the GIL for most of that work, so threads overlap it.
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from . import figures, schema
+from .backends import get_backend
+from .data import (
+    DATASETS, column_stats, dataset_spec, facet_index, load_dataset, load_datasets, memory_report, validation_report,
+)
+from .query import filter_dataset
+
+WORKERS = int(os.environ.get("LUNAR_REGOLITH_WARMUP_WORKERS", min(8, os.cpu_count() or 1)))
+
+
+# --------------------------- Tasks ---------------------------
+def warm_dataset(name):
+    column_stats(name)
+    get_backend().column_stats(name)  # the same with pandas, read from Parquet otherwise
+    facet_index(name)
+    memory_report(name)
+
+# The default views of the app sections: no facet selected, sliders at their full
+# range and the first options of the axis selectboxes.
+DEFAULT_MISSION_AXES = ("Mission", "Bulk density (g/cm^3)")
+DEFAULT_SIMULANT_AXES = ("Developer", "Bulk density (g/cm^3)")
+
+def default_filters(name, bounds=True):
+    """filter_dataset keyword arguments of a dataset's sliders at their full range."""
+    stats = column_stats(name)
+    ranges = {col: schema.slider_range(stats, col, bounds) for col in dataset_spec(name)["ranges"]}
+    return {
+        "ranges": {col: bounds for col, bounds in ranges.items() if bounds is not None},
+        "year": schema.slider_range(stats, "Year of publication"),
+    }
+
+def warm_mission_scatter():
+    x_axis, y_axis = DEFAULT_MISSION_AXES
+    figures.mission_scatter(load_dataset("regolith_plots").dropna(subset=[x_axis, y_axis]), x_axis, y_axis)
+
+def warm_simulant_scatter():
+    x_axis, y_axis = DEFAULT_SIMULANT_AXES
+    plot_df = filter_dataset("simulants", **default_filters("simulants", bounds=False)).dropna(subset=[x_axis, y_axis])
+    figures.simulant_scatter(plot_df, x_axis, y_axis)
+
+def dataset_tasks():
+    tasks = [(f"sidecars {name}", warm_dataset, name) for name in DATASETS]
+    tasks += [(f"validation {table}", validation_report, table) for table in schema.TABLES]
+    return tasks
+
+def figure_tasks():
+    return [
+        ("figure moon_map", figures.moon_map),
+        ("figure mission_scatter", warm_mission_scatter),
+        ("figure simulant_scatter", warm_simulant_scatter),
+    ]
+
+
+# --------------------------- Warm-up ---------------------------
+class Warmup:
+    """One warm-up run: per-task timings and errors, and the `ready` flag set at its end."""
+
+    def __init__(self, workers=WORKERS):
+        self.workers = workers
+        self.ready = threading.Event()
+        self.timings, self.errors = {}, {}
+        self.elapsed = None
+        self._thread = None
+
+    def _run_task(self, label, func, *args):
+        start = time.perf_counter()
+        try:
+            func(*args)
+        except Exception as e:  # a failing task only leaves its cache cold
+            self.errors[label] = f"{type(e).__name__}: {e}"
+        self.timings[label] = time.perf_counter() - start
+
+    def run(self):
+        start = time.perf_counter()
+        try:
+            with ThreadPoolExecutor(self.workers, thread_name_prefix="warmup") as pool:
+                # the build steps run on the pool, the sidecars and figures read their results
+                self._run_task("load datasets", load_datasets, list(DATASETS), pool)
+                for stage in (dataset_tasks(), figure_tasks()):
+                    for future in [pool.submit(self._run_task, *task) for task in stage]:
+                        future.result()
+        finally:
+            self.elapsed = time.perf_counter() - start
+            self.ready.set()
+        return self
+
+    def start(self):
+        """Run in a daemon thread, returns self at once."""
+        self._thread = threading.Thread(target=self.run, name="warmup", daemon=True)
+        self._thread.start()
+        return self
+
+    def is_ready(self):
+        return self.ready.is_set()
+
+    def wait(self, timeout=None):
+        return self.ready.wait(timeout)
+
+    def status(self):
+        return {
+            "ready": self.is_ready(),
+            "elapsed": self.elapsed,
+            "tasks": len(self.timings),
+            "errors": dict(self.errors),
+        }
+
+_warmup = None
+_warmup_lock = threading.Lock()
+
+def start(workers=WORKERS):
+    """The process' warm-up, started on the first call."""
+    global _warmup
+    with _warmup_lock:
+        if _warmup is None:
+            _warmup = Warmup(workers).start()
+        return _warmup
+
+
+# --------------------------- Command line ---------------------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m lunar_regolith.warmup",
+        description="Prepare every dataset, statistics sidecar and default figure ahead of the first request.",
+    )
+    parser.add_argument("--workers", type=int, default=WORKERS, help=f"Thread pool size (default: {WORKERS})")
+    args = parser.parse_args(argv)
+    warmup = Warmup(args.workers).run()
+    for label, seconds in sorted(warmup.timings.items(), key=lambda item: -item[1]):
+        print(f"{seconds:8.3f}s  {label}{'  FAILED: ' + warmup.errors[label] if label in warmup.errors else ''}")
+    print(f"{warmup.elapsed:8.3f}s  total ({args.workers} workers)")
+    return 1 if warmup.errors else 0
+
+if __name__ == "__main__":
+    sys.exit(main())